@@ -0,0 +1,200 @@
+# benchmarks/bench_mapper.py
+"""
+Micro-benchmarks for providers/topstepx/mapper.py.
+
+Every mapper function that sits on the stream or REST path is timed against
+synthetic TopStepX payloads (see payloads.py). For each case the suite
+reports:
+
+  events/sec   - mapped events (or REST rows) per second
+  ns/event     - mean wall time per event
+  allocs/event - memory blocks still allocated per mapped event, i.e. the
+                 objects that make up one mapped result
+  peak B/event - peak traced memory per event while mapping a batch
+
+Usage:
+    python benchmarks/bench_mapper.py
+    python benchmarks/bench_mapper.py --filter depth --min-time 2
+    python benchmarks/bench_mapper.py --json results.json
+    python benchmarks/bench_mapper.py --baseline results.json --max-regression 0.15
+
+With --baseline the script exits with status 1 if any case got slower (in
+ns/event) by more than --max-regression compared to the saved results.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(script_dir, '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import payloads
+from tradeforgepy.core.order_book import OrderBook
+from tradeforgepy.providers.topstepx import mapper
+from tradeforgepy.utils.tick_utils import TickScale
+
+PROVIDER = "TopStepX"
+STREAM_BATCH = 2000
+REST_ROWS = 500
+
+
+@dataclass
+class BenchCase:
+    name: str
+    run: Callable[[], Any]
+    events_per_run: int
+
+
+@dataclass
+class BenchResult:
+    name: str
+    events_per_sec: float
+    ns_per_event: float
+    allocs_per_event: float
+    peak_bytes_per_event: float
+
+
+def _stream_case(name: str, func: Callable[[Any], Any], messages: List[Any]) -> BenchCase:
+    def run():
+        return [func(m) for m in messages]
+    return BenchCase(name, run, len(messages))
+
+
+def build_cases() -> List[BenchCase]:
+    cid = payloads.CONTRACT_ID
+    quotes = payloads.gateway_quotes(STREAM_BATCH)
+    trades = payloads.gateway_trades(STREAM_BATCH)
+    depth = payloads.gateway_depth(STREAM_BATCH // 4)
+    orders = payloads.rest_orders(REST_ROWS)
+    positions = payloads.rest_positions(REST_ROWS)
+    fills = payloads.rest_trades(REST_ROWS)
+    book = OrderBook(cid, TickScale(payloads.TICK_SIZE))
+
+    return [
+        _stream_case("GatewayQuote", lambda q: mapper.map_ts_quote_to_generic_event(cid, q, PROVIDER), quotes),
+        _stream_case("GatewayTrade", lambda t: mapper.map_ts_market_trade_to_generic_event(cid, t, PROVIDER), trades),
+        _stream_case("GatewayDepth[20 levels]", lambda d: mapper.map_ts_depth_to_generic_event(cid, d, PROVIDER), depth),
+        _stream_case("GatewayDepth -> OrderBook", lambda d: mapper.apply_ts_depth_to_order_book(book, d, PROVIDER), depth),
+        _stream_case("GatewayUserOrder", lambda p: mapper.map_ts_order_update_to_generic_event(p, PROVIDER), payloads.user_orders(STREAM_BATCH)),
+        _stream_case("GatewayUserPosition", lambda p: mapper.map_ts_position_update_to_generic_event(p, PROVIDER), payloads.user_positions(STREAM_BATCH)),
+        _stream_case("GatewayUserTrade", lambda p: mapper.map_ts_user_trade_to_generic_event(p, PROVIDER), payloads.user_trades(STREAM_BATCH)),
+        _stream_case("GatewayUserAccount", lambda p: mapper.map_ts_account_update_to_generic_event(p, PROVIDER), payloads.user_accounts(STREAM_BATCH)),
+        BenchCase("REST orders (all rows)", lambda: mapper.map_ts_orders_to_generic(orders, PROVIDER).materialize(), REST_ROWS),
+        BenchCase("REST orders (first 10)", lambda: mapper.map_ts_orders_to_generic(orders, PROVIDER)[:10].materialize(), REST_ROWS),
+        BenchCase("REST positions (all rows)", lambda: mapper.map_ts_positions_to_generic(positions, PROVIDER).materialize(), REST_ROWS),
+        BenchCase("REST trades (all rows)", lambda: mapper.map_ts_trades_to_generic(fills, PROVIDER).materialize(), REST_ROWS),
+    ]
+
+
+def _time_case(case: BenchCase, min_time: float) -> float:
+    """Returns the mean ns/event, repeating the case until at least `min_time` seconds have elapsed."""
+    case.run()  # Warm up imports, validators and caches.
+    runs, elapsed_ns = 0, 0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while elapsed_ns < min_time * 1e9:
+            start = time.perf_counter_ns()
+            case.run()
+            elapsed_ns += time.perf_counter_ns() - start
+            runs += 1
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return elapsed_ns / (runs * case.events_per_run)
+
+
+def _measure_memory(case: BenchCase) -> Dict[str, float]:
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    result = case.run()
+    blocks_after = sys.getallocatedblocks()
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        result = case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {
+        "allocs_per_event": (blocks_after - blocks_before) / case.events_per_run,
+        "peak_bytes_per_event": peak / case.events_per_run,
+    }
+
+
+def run_benchmarks(name_filter: Optional[str], min_time: float) -> List[BenchResult]:
+    results = []
+    for case in build_cases():
+        if name_filter and name_filter.lower() not in case.name.lower():
+            continue
+        ns_per_event = _time_case(case, min_time)
+        memory = _measure_memory(case)
+        results.append(BenchResult(
+            name=case.name, events_per_sec=1e9 / ns_per_event, ns_per_event=ns_per_event, **memory
+        ))
+    return results
+
+
+def print_results(results: List[BenchResult]) -> None:
+    header = f"{'case':<28}{'events/sec':>14}{'ns/event':>12}{'allocs/event':>14}{'peak B/event':>14}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r.name:<28}{r.events_per_sec:>14,.0f}{r.ns_per_event:>12,.0f}{r.allocs_per_event:>14.1f}{r.peak_bytes_per_event:>14,.0f}")
+
+
+def check_regressions(results: List[BenchResult], baseline_path: str, max_regression: float) -> List[str]:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)}
+    failures = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base:
+            continue
+        change = r.ns_per_event / base["ns_per_event"] - 1.0
+        if change > max_regression:
+            failures.append(f"{r.name}: {base['ns_per_event']:,.0f} -> {r.ns_per_event:,.0f} ns/event (+{change:.0%})")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the TopStepX mapper functions.")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Minimum timed seconds per case.")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against results previously written with --json.")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Allowed ns/event increase versus the baseline (0.15 = 15%%).")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.min_time)
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+    if args.baseline:
+        failures = check_regressions(results, args.baseline, args.max_regression)
+        if failures:
+            print("\nRegressions beyond threshold:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print(f"\nNo regressions beyond {args.max_regression:.0%} against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
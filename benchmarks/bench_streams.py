@@ -0,0 +1,209 @@
+# benchmarks/bench_streams.py
+"""
+End-to-end stream throughput benchmark against the local TopStepX test hub
+(tradeforgepy.testing.topstepx_hub).
+
+A TopStepXProvider is connected to the test hub exactly as it would be to the
+real service, and the hub's message rate is stepped up until the provider no
+longer keeps up. For each step the suite reports:
+
+  offered/sec   - messages the hub was asked to generate per second
+  sent/sec      - messages the hub actually wrote to the socket per second
+  delivered/sec - events that reached the provider's on_event callback per second
+  queue hw      - high watermark of the market dispatch queue during the step
+
+A step is sustainable when at least --min-delivery of the offered messages
+were delivered and the dispatch queue drained by the end of the step. The
+highest sustainable rate is printed at the end.
+
+Usage:
+    python benchmarks/bench_streams.py
+    python benchmarks/bench_streams.py --feed depth --contracts 4 --start-rate 1000
+    python benchmarks/bench_streams.py --feed user --accounts 2 --json results.json
+
+Requires aiohttp (for the test hub) in addition to the provider dependencies.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(script_dir, '..', 'src'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from tradeforgepy.core.enums import MarketDataType, UserDataType, StreamConnectionStatus
+from tradeforgepy.core.models_generic import GenericStreamEvent
+from tradeforgepy.providers.topstepx import TopStepXProvider
+from tradeforgepy.testing import TopStepXTestHub, HubTraffic
+
+_MARKET_FEEDS = {
+    "quote": MarketDataType.QUOTE,
+    "trade": MarketDataType.TRADE,
+    "depth": MarketDataType.DEPTH,
+}
+# Order, position and trade events are generated per account; account updates are not.
+_USER_FEEDS_PER_ACCOUNT = 3
+
+
+@dataclass
+class StepResult:
+    offered_per_sec: float
+    sent_per_sec: float
+    delivered_per_sec: float
+    queue_high_watermark: int
+    queue_depth_after: int
+    sustainable: bool
+
+
+class _Counter:
+    def __init__(self):
+        self.delivered = 0
+
+    async def on_event(self, event: GenericStreamEvent):
+        self.delivered += 1
+
+
+def _set_rate(traffic: HubTraffic, feed: str, per_feed_rate: float) -> None:
+    traffic.quotes_per_sec = per_feed_rate if feed == "quote" else 0.0
+    traffic.trades_per_sec = per_feed_rate if feed == "trade" else 0.0
+    traffic.depth_per_sec = per_feed_rate if feed == "depth" else 0.0
+    traffic.user_events_per_sec = per_feed_rate if feed == "user" else 0.0
+
+
+async def _wait_connected(provider: TopStepXProvider, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while provider.get_status() != StreamConnectionStatus.CONNECTED:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Provider did not connect to the test hub within {timeout}s: {provider.get_stream_statuses()}")
+        await asyncio.sleep(0.05)
+
+
+def _queue_metrics(provider: TopStepXProvider, feed: str) -> dict:
+    return provider.get_stream_queue_metrics().get("user" if feed == "user" else "market", {})
+
+
+async def _run_step(hub: TopStepXTestHub, provider: TopStepXProvider, counter: _Counter,
+                    feed: str, feeds: int, total_rate: float, duration: float, settle: float,
+                    min_delivery: float) -> StepResult:
+    _set_rate(hub.traffic, feed, total_rate / feeds)
+    await asyncio.sleep(settle)  # Let the previous step's backlog and rate change work through.
+
+    high_watermark = 0
+    sent_before, delivered_before = sum(hub.messages_sent.values()), counter.delivered
+    start = time.monotonic()
+    while time.monotonic() - start < duration:
+        await asyncio.sleep(0.05)
+        high_watermark = max(high_watermark, _queue_metrics(provider, feed).get("depth", 0))
+    elapsed = time.monotonic() - start
+    sent = sum(hub.messages_sent.values()) - sent_before
+    delivered = counter.delivered - delivered_before
+
+    _set_rate(hub.traffic, feed, 0.0)
+    await asyncio.sleep(settle)
+    depth_after = _queue_metrics(provider, feed).get("depth", 0)
+    delivered_per_sec = delivered / elapsed
+    return StepResult(
+        offered_per_sec=total_rate, sent_per_sec=sent / elapsed, delivered_per_sec=delivered_per_sec,
+        queue_high_watermark=high_watermark, queue_depth_after=depth_after,
+        sustainable=delivered_per_sec >= total_rate * min_delivery and depth_after == 0,
+    )
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[StepResult]:
+    hub = await TopStepXTestHub(HubTraffic(depth_levels=args.depth_levels)).start()
+    provider = TopStepXProvider(
+        hub.provider_settings(), market_queue_size=args.queue_size, market_shards=args.shards,
+        track_latency=not args.no_latency, resync_user_data=False, watch_feed_staleness=False,
+        stream_thread=args.stream_thread,
+    )
+    counter = _Counter()
+    provider.on_event(counter.on_event)
+    runner: Optional[asyncio.Task] = None
+    results: List[StepResult] = []
+    try:
+        await provider.connect()
+        runner = asyncio.create_task(provider.run_forever())
+        await _wait_connected(provider, timeout=10.0)
+
+        if args.feed == "user":
+            account_ids = [str(7000000 + i) for i in range(args.accounts)]
+            await provider.subscribe_user_data(account_ids, [UserDataType.ORDER_UPDATE, UserDataType.POSITION_UPDATE, UserDataType.USER_TRADE])
+            feeds = args.accounts * _USER_FEEDS_PER_ACCOUNT
+        else:
+            contract_ids = [f"CON.F.US.BENCH{i}.M25" for i in range(args.contracts)]
+            await provider.subscribe_market_data(contract_ids, [_MARKET_FEEDS[args.feed]])
+            feeds = args.contracts
+
+        rate = args.start_rate
+        while rate <= args.max_rate:
+            step = await _run_step(hub, provider, counter, args.feed, feeds, rate,
+                                   args.step_seconds, args.settle_seconds, args.min_delivery)
+            results.append(step)
+            print_step(step)
+            if not step.sustainable:
+                break
+            rate *= args.growth
+    finally:
+        await provider.disconnect()
+        if runner:
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+        await hub.stop()
+    return results
+
+
+def print_header() -> None:
+    header = f"{'offered/sec':>14}{'sent/sec':>14}{'delivered/sec':>16}{'queue hw':>10}{'sustained':>11}"
+    print(header)
+    print("-" * len(header))
+
+
+def print_step(r: StepResult) -> None:
+    print(f"{r.offered_per_sec:>14,.0f}{r.sent_per_sec:>14,.0f}{r.delivered_per_sec:>16,.0f}"
+          f"{r.queue_high_watermark:>10,}{'yes' if r.sustainable else 'no':>11}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Find the highest message rate the TopStepX streams sustain against the local test hub.")
+    parser.add_argument("--feed", choices=["quote", "trade", "depth", "user"], default="quote")
+    parser.add_argument("--contracts", type=int, default=10, help="Contracts subscribed for market feeds.")
+    parser.add_argument("--accounts", type=int, default=1, help="Accounts subscribed for the user feed.")
+    parser.add_argument("--depth-levels", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=1, help="Market hub connections.")
+    parser.add_argument("--queue-size", type=int, default=10000, help="Market dispatch queue size.")
+    parser.add_argument("--no-latency", action="store_true", help="Turn latency tracking off.")
+    parser.add_argument("--stream-thread", action="store_true", help="Decode and map on a dedicated stream thread.")
+    parser.add_argument("--start-rate", type=float, default=500.0, help="Total messages/sec of the first step.")
+    parser.add_argument("--max-rate", type=float, default=1_000_000.0)
+    parser.add_argument("--growth", type=float, default=1.5, help="Rate multiplier between steps.")
+    parser.add_argument("--step-seconds", type=float, default=3.0)
+    parser.add_argument("--settle-seconds", type=float, default=1.0)
+    parser.add_argument("--min-delivery", type=float, default=0.97, help="Delivered/offered ratio a step needs to count as sustained.")
+    parser.add_argument("--json", dest="json_path", help="Write the step results to this JSON file.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    print_header()
+    results = asyncio.run(run_benchmark(args))
+
+    sustained = [r for r in results if r.sustainable]
+    if sustained:
+        print(f"\nMax sustainable rate: {sustained[-1].delivered_per_sec:,.0f} msgs/sec ({args.feed})")
+    else:
+        print("\nNo step was sustained; try a lower --start-rate.")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    return 0 if sustained else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
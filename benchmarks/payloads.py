@@ -0,0 +1,131 @@
+# benchmarks/payloads.py
+"""
+Synthetic TopStepX payloads used by the benchmarks.
+
+The shapes mirror what the market and user hubs deliver (GatewayQuote,
+GatewayTrade, GatewayDepth, GatewayUser*) and what the REST search
+endpoints return, with values varied per message so that caches and
+branch predictors are not flattered by identical inputs.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+CONTRACT_ID = "CON.F.US.EP.M25"
+ACCOUNT_ID = 7001234
+TICK_SIZE = 0.25
+BASE_PRICE = 5400.0
+
+_EPOCH = datetime(2025, 6, 2, 13, 30, tzinfo=timezone.utc)
+
+
+def _ts(offset_ms: int) -> str:
+    return (_EPOCH + timedelta(milliseconds=offset_ms)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _price(rng: random.Random, spread_ticks: int = 40) -> float:
+    return BASE_PRICE + rng.randint(-spread_ticks, spread_ticks) * TICK_SIZE
+
+
+def gateway_quotes(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    quotes = []
+    for i in range(count):
+        bid = _price(rng)
+        quotes.append({
+            "symbol": "F.US.EP", "symbolName": "/ES", "lastPrice": bid + TICK_SIZE,
+            "bestBid": bid, "bestAsk": bid + TICK_SIZE, "change": 12.5, "changePercent": 0.23,
+            "open": 5390.0, "high": 5412.25, "low": 5385.5, "volume": 100000 + i,
+            "lastUpdated": _ts(i), "timestamp": _ts(i),
+        })
+    return quotes
+
+
+def gateway_trades(count: int, seed: int = 2) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {"symbolId": "F.US.EP", "price": _price(rng), "timestamp": _ts(i), "type": rng.randint(0, 1), "volume": rng.randint(1, 25)}
+        for i in range(count)
+    ]
+
+
+def gateway_depth(count: int, levels: int = 10, seed: int = 3) -> List[List[Dict[str, Any]]]:
+    """Each message carries `levels` bid and `levels` ask updates, shuffled as they arrive on the wire."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        mid = _price(rng, spread_ticks=8)
+        updates = []
+        for n in range(1, levels + 1):
+            updates.append({"timestamp": _ts(i), "type": 4, "price": mid - n * TICK_SIZE, "volume": rng.randint(1, 200), "currentVolume": 0})
+            updates.append({"timestamp": _ts(i), "type": 3, "price": mid + n * TICK_SIZE, "volume": rng.randint(1, 200), "currentVolume": 0})
+        rng.shuffle(updates)
+        messages.append(updates)
+    return messages
+
+
+def _order_row(i: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": 900000 + i, "accountId": ACCOUNT_ID, "contractId": CONTRACT_ID if i % 3 else "CON.F.US.NQ.M25",
+        "creationTimestamp": _ts(i * 1000), "updateTimestamp": _ts(i * 1000 + 250),
+        "status": rng.choice([1, 2, 3]), "type": rng.choice([1, 2, 4]), "side": rng.randint(0, 1),
+        "size": rng.randint(1, 5), "limitPrice": _price(rng), "stopPrice": None, "fillVolume": 0,
+    }
+
+
+def _position_row(i: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": 500000 + i, "accountId": ACCOUNT_ID, "contractId": f"CON.F.US.C{i}.M25",
+        "creationTimestamp": _ts(i * 1000), "type": rng.choice([1, 2]), "size": rng.randint(1, 10),
+        "averagePrice": _price(rng),
+    }
+
+
+def _trade_row(i: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": 700000 + i, "accountId": ACCOUNT_ID, "contractId": CONTRACT_ID if i % 3 else "CON.F.US.NQ.M25",
+        "creationTimestamp": _ts(i * 1000), "price": _price(rng), "profitAndLoss": rng.choice([None, 12.5, -25.0]),
+        "fees": 1.24, "side": rng.randint(0, 1), "size": rng.randint(1, 5), "voided": False, "orderId": 900000 + i,
+    }
+
+
+def _account_data(i: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": ACCOUNT_ID, "name": "50KTC-V2-123456-7890", "balance": 50000 + rng.randint(-2000, 2000),
+        "canTrade": True, "isVisible": True, "simulated": True, "lastUpdated": _ts(i),
+    }
+
+
+def user_orders(count: int, seed: int = 4) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{"action": 1, "data": _order_row(i, rng)} for i in range(count)]
+
+
+def user_positions(count: int, seed: int = 5) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{"action": 1, "data": _position_row(i, rng)} for i in range(count)]
+
+
+def user_trades(count: int, seed: int = 6) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{"action": 0, "data": _trade_row(i, rng)} for i in range(count)]
+
+
+def user_accounts(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{"action": 1, "data": _account_data(i, rng)} for i in range(count)]
+
+
+def rest_orders(count: int, seed: int = 8) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [_order_row(i, rng) for i in range(count)]
+
+
+def rest_positions(count: int, seed: int = 9) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [_position_row(i, rng) for i in range(count)]
+
+
+def rest_trades(count: int, seed: int = 10) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [_trade_row(i, rng) for i in range(count)]
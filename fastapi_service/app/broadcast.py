@@ -1,48 +1,47 @@
 # fastapi_service/app/broadcast.py
 import asyncio
 import logging
-from typing import Set
+from typing import Dict, List, Optional, Set
 
 from tradeforgepy.core.models_generic import GenericStreamEvent
+from tradeforgepy.providers.topstepx import TopStepXProvider
+from tradeforgepy.streaming.dispatcher import EventSubscription, EventType
 
 logger = logging.getLogger(__name__)
 
 class Broadcast:
     """
-    A simple broadcast utility that distributes events to multiple asyncio Queues.
+    Distributes provider events to per-client asyncio Queues.
+    Each queue is registered as a listener on the provider's event dispatcher with
+    its own filters, so a client only receives the events it asked for.
     It also manages which provider contracts are currently being subscribed to.
     """
-    def __init__(self):
-        self._client_queues: Set[asyncio.Queue] = set()
+    def __init__(self, provider: TopStepXProvider):
+        self._provider = provider
+        self._client_subscriptions: Dict[asyncio.Queue, EventSubscription] = {}
         self.subscribed_contracts: Set[str] = set()
         logger.info("Broadcast instance created.")
 
-    async def _cleanup_queue(self, queue: asyncio.Queue):
-        """Removes a queue from the set of active clients."""
-        if queue in self._client_queues:
-            self._client_queues.remove(queue)
-
-    async def subscribe(self, queue: asyncio.Queue):
-        """A new client subscribes to receive events."""
-        self._client_queues.add(queue)
-        logger.info(f"New client subscribed. Total clients: {len(self._client_queues)}")
-
-    async def unsubscribe(self, queue: asyncio.Queue):
-        """A client unsubscribes from events."""
-        await self._cleanup_queue(queue)
-        logger.info(f"Client unsubscribed. Total clients: {len(self._client_queues)}")
-
-    async def publish(self, event: GenericStreamEvent):
-        """
-        Receives an event from the provider and puts it into each client's queue.
-        This method will be the main callback for the provider's `on_event`.
-        """
-        # We iterate over a copy of the set in case the set is modified
-        # during iteration (e.g., a client disconnects).
-        for queue in list(self._client_queues):
+    async def subscribe(self, queue: asyncio.Queue,
+                        event_types: Optional[List[EventType]] = None,
+                        provider_contract_ids: Optional[List[str]] = None,
+                        provider_account_ids: Optional[List[str]] = None):
+        """A new client subscribes to receive the events matching the given filters."""
+        async def _enqueue(event: GenericStreamEvent):
             try:
                 queue.put_nowait(event)
             except asyncio.QueueFull:
                 logger.warning("A client's queue was full. Event dropped for that client.")
-            except Exception as e:
-                logger.error(f"Error putting event into a client's queue: {e}")
\ No newline at end of file
+
+        await self.unsubscribe(queue)
+        self._client_subscriptions[queue] = self._provider.add_event_listener(
+            _enqueue, event_types, provider_contract_ids, provider_account_ids
+        )
+        logger.info(f"New client subscribed. Total clients: {len(self._client_subscriptions)}")
+
+    async def unsubscribe(self, queue: asyncio.Queue):
+        """A client unsubscribes from events."""
+        subscription = self._client_subscriptions.pop(queue, None)
+        if subscription is not None:
+            self._provider.remove_event_listener(subscription)
+            logger.info(f"Client unsubscribed. Total clients: {len(self._client_subscriptions)}")
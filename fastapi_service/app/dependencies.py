@@ -15,7 +15,7 @@ from tradeforgepy.providers.topstepx import TopStepXProvider
 from tradeforgepy.core.interfaces import TradingPlatformAPI
 from tradeforgepy.exceptions import TradeForgeError, ConnectionError as TradeForgeConnectionError
 from tradeforgepy.config import settings
-from .broadcast import Broadcast  # <-- IMPORT THE NEW BROADCASTER
+from .broadcast import Broadcast
 
 logger = logging.getLogger(__name__)
 
@@ -57,10 +57,7 @@ async def initialize_singletons():
         if _provider_instance is not None:
             return # Already initialized
 
-        # Create the broadcaster first
-        _broadcast_instance = Broadcast()
-        
-        # Now, initialize the provider with retry logic
+        # Initialize the provider with retry logic
         max_retries = 5
         retry_delay = 20
         for attempt in range(max_retries):
@@ -69,12 +66,13 @@ async def initialize_singletons():
                 provider = TopStepXProvider(
                     username=settings.TS_USERNAME,
                     api_key=settings.TS_API_KEY,
-                    environment=settings.TS_ENVIRONMENT
+                    environment=settings.TS_ENVIRONMENT,
+                    track_latency=settings.SERVICE_TRACK_LATENCY
                 )
                 await provider.connect()
 
-                # CRITICAL: Set the provider's event callback to the broadcaster's publish method
-                provider.on_event(_broadcast_instance.publish)
+                # The broadcaster registers one filtered event listener per websocket client.
+                _broadcast_instance = Broadcast(provider)
                 
                 # Start the provider's background tasks
                 asyncio.create_task(provider.run_forever())
@@ -16,7 +16,7 @@ if _src_path not in sys.path:
 # --- Application Imports ---
 # get_provider is still used by the endpoints, but initialize_singletons is for startup
 from .dependencies import get_provider, initialize_singletons
-from .routers import accounts, history, contracts, orders, positions, trades
+from .routers import accounts, history, contracts, orders, positions, trades, metrics
 from .websockets import market_data
 from tradeforgepy.core.interfaces import TradingPlatformAPI
 
@@ -73,6 +73,7 @@ app.include_router(contracts.router, prefix="/contracts", tags=["Contracts"])
 app.include_router(orders.router, prefix="/orders", tags=["Order Management"])
 app.include_router(positions.router, prefix="/positions", tags=["Position Management"])
 app.include_router(trades.router, prefix="/trades", tags=["Trade History"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
 
 # Include the WebSocket routers
 app.include_router(market_data.router, prefix="/ws", tags=["Market Data Streams"])
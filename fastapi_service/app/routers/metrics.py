@@ -0,0 +1,49 @@
+# fastapi_service/app/routers/metrics.py
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict
+import logging
+
+from tradeforgepy.core.interfaces import TradingPlatformAPI
+from ..dependencies import get_provider
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get(
+    "/latency",
+    summary="Get Stream Latency Statistics",
+    description="Rolling latency percentiles per stream, event type and pipeline stage, plus the estimated provider clock offset."
+)
+async def get_latency_stats(
+    provider: TradingPlatformAPI = Depends(get_provider)
+) -> Dict[str, Any]:
+    if getattr(provider, "latency_tracker", None) is None:
+        raise HTTPException(status_code=501, detail="The provider does not track stream latency.")
+    return provider.get_latency_stats()
+
+@router.get(
+    "/prometheus",
+    response_class=PlainTextResponse,
+    summary="Scrape Stream Metrics",
+    description="Stream latency summaries in the Prometheus text exposition format."
+)
+async def get_prometheus_metrics(
+    provider: TradingPlatformAPI = Depends(get_provider)
+):
+    tracker = getattr(provider, "latency_tracker", None)
+    if tracker is None:
+        raise HTTPException(status_code=501, detail="The provider does not track stream latency.")
+    return PlainTextResponse(tracker.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get(
+    "/cache",
+    summary="Get Read Cache Statistics",
+    description="Read cache size, evictions and hit/miss/stale/negative counts per lookup kind, plus contract master state."
+)
+async def get_cache_stats(
+    provider: TradingPlatformAPI = Depends(get_provider)
+) -> Dict[str, Any]:
+    if not hasattr(provider, "get_cache_stats"):
+        raise HTTPException(status_code=501, detail="The provider does not expose cache statistics.")
+    return provider.get_cache_stats()
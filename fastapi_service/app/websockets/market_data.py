@@ -6,6 +6,7 @@ import asyncio
 from tradeforgepy.core.interfaces import TradingPlatformAPI
 from tradeforgepy.core.models_generic import GenericStreamEvent
 from tradeforgepy.core.enums import MarketDataType, UserDataType
+from tradeforgepy.config import settings
 from ..dependencies import get_provider, get_broadcaster
 from ..broadcast import Broadcast
 
@@ -22,12 +23,19 @@ async def websocket_market_data_endpoint(
     """
     WebSocket endpoint for streaming live market data for a specific contract.
     Connect to this endpoint with a URL like: ws://127.0.0.1:8000/ws/CON.F.US.EP.M25
+
+    A client receives every event for its contract, including order, position and fill
+    updates on that contract, plus every user event (account updates included) for
+    TS_CAPTURE_ACCOUNT_ID. User events for other contracts and accounts are not sent.
     """
     await websocket.accept()
     logger.info(f"WebSocket connection accepted for contract: {contract_id}")
     
+    account_ids = [settings.TS_CAPTURE_ACCOUNT_ID] if settings.TS_CAPTURE_ACCOUNT_ID else []
+
     queue: asyncio.Queue[GenericStreamEvent] = asyncio.Queue()
-    await broadcaster.subscribe(queue)
+    # Only events for this contract, or user events for the capture account, are routed to this client.
+    await broadcaster.subscribe(queue, provider_contract_ids=[contract_id], provider_account_ids=account_ids)
     
     # Check if this is the first client subscribing to this contract
     is_new_subscription = contract_id not in broadcaster.subscribed_contracts
@@ -40,7 +48,6 @@ async def websocket_market_data_endpoint(
             )
             # Also subscribe to user data for the primary account to get all events
             # This part can be refined later if needed
-            from tradeforgepy.config import settings
             if settings.TS_CAPTURE_ACCOUNT_ID:
                 await provider.subscribe_user_data(
                     provider_account_ids=[settings.TS_CAPTURE_ACCOUNT_ID],
@@ -50,17 +57,14 @@ async def websocket_market_data_endpoint(
         except Exception as e:
             logger.error(f"Failed to subscribe to provider for {contract_id}: {e}", exc_info=True)
             await websocket.close(code=1011, reason="Failed to subscribe to backend data stream.")
+            await broadcaster.unsubscribe(queue)
             return
 
     try:
         while True:
-            # Wait for an event to arrive from the broadcaster's queue
+            # Wait for an event to arrive from the broadcaster's queue; it is already filtered for this client.
             event = await queue.get()
-            
-            # Filter to only send events relevant to this specific websocket connection
-            if event.provider_contract_id == contract_id or event.event_type in [UserDataType.ORDER_UPDATE, UserDataType.POSITION_UPDATE, UserDataType.USER_TRADE]:
-                # Send the event data to the client as JSON
-                await websocket.send_json(event.model_dump(mode='json'))
+            await websocket.send_json(event.model_dump(mode='json'))
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket client for {contract_id} disconnected.")
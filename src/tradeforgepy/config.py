@@ -60,6 +60,9 @@ class Settings(BaseSettings):
     DEFAULT_CAPTURE_CONTRACT_ID: Optional[str] = None
     DEFAULT_CAPTURE_ACCOUNT_ID: Optional[str] = None
 
+    # FastAPI service: track stream latency for its /metrics/latency and /metrics/prometheus endpoints.
+    SERVICE_TRACK_LATENCY: bool = True
+
 def _load_provider_settings_from_env() -> Dict[str, ProviderSettings]:
     """
     Explicitly loads, parses, and validates provider settings from environment variables.
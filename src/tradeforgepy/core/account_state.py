@@ -0,0 +1,216 @@
+# tradeforgepy/core/account_state.py
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .enums import OrderStatus
+from .models_generic import (
+    Account, Order, Position, Trade, GenericStreamEvent,
+    AccountUpdateEvent, OrderUpdateEvent, PositionUpdateEvent, UserTradeEvent
+)
+
+# Orders in these states can still change; any other status is final.
+OPEN_ORDER_STATUSES = frozenset({
+    OrderStatus.PENDING_SUBMIT, OrderStatus.PENDING_NEW, OrderStatus.NEW,
+    OrderStatus.WORKING, OrderStatus.PARTIALLY_FILLED, OrderStatus.PENDING_CANCEL,
+})
+
+# Seedable state kinds. Accounts are a single global set, keyed by account id None.
+ORDERS = "orders"
+POSITIONS = "positions"
+ACCOUNTS = "accounts"
+
+_StateKey = Tuple[str, Optional[str]]
+
+
+class StateSeed:
+    """Handle for a REST snapshot in flight; see `AccountStateStore.begin_seed()`."""
+    __slots__ = ("key", "generation")
+
+    def __init__(self, key: _StateKey, generation: int):
+        self.key = key
+        self.generation = generation
+
+
+class AccountStateStore:
+    """
+    In-memory open orders, positions, recent fills and account records, kept
+    current from user stream events and seeded from one REST snapshot each.
+
+    Every event is applied with `apply()`. A (kind, account) pair becomes fresh
+    when a snapshot is seeded with `begin_seed()` / `complete_seed()`; events that
+    arrive while the snapshot is being fetched are applied again on top of it, in
+    arrival order, so the snapshot never rolls back a newer update. It stays fresh
+    until `invalidate()` (e.g. on a stream disconnect or unsubscribe) or until the
+    snapshot is older than `max_age` seconds, so a missed event can only be served
+    for a bounded time. `max_age=None` trusts the stream indefinitely.
+
+    The last known state is also the baseline `UserStateResync` compares against
+    after a reconnect; invalidation only affects freshness, never the contents.
+
+    The store does not know whether the stream is connected; callers combine
+    `is_fresh()` with their own view of the stream before trusting it.
+    """
+
+    def __init__(self, max_age: Optional[float] = 300.0, max_fills_per_account: int = 1000):
+        self.max_age = max_age
+        self.max_fills_per_account = max_fills_per_account
+        self._orders: Dict[str, Dict[str, Order]] = {}
+        self._positions: Dict[str, Dict[str, Position]] = {}
+        self._accounts: Dict[str, Account] = {}
+        self._fills: Dict[str, Deque[Trade]] = {}
+        # (kind, account) -> monotonic time of the snapshot it was seeded from.
+        self._seeded_at: Dict[_StateKey, float] = {}
+        # (kind, account) -> [snapshots in flight, events applied since the first one began].
+        self._seeding: Dict[_StateKey, List[Any]] = {}
+        self._generation = 0
+
+        # --- Metrics ---
+        self.events_applied = 0
+        self.seeds = 0
+        self.invalidations = 0
+
+    # --- Stream events ---
+
+    def apply(self, event: GenericStreamEvent) -> None:
+        """Updates the state from a user event (live or synthetic). Other events are ignored."""
+        if isinstance(event, OrderUpdateEvent):
+            key = (ORDERS, event.order_data.provider_account_id)
+            self._apply_order(event.order_data)
+        elif isinstance(event, PositionUpdateEvent):
+            key = (POSITIONS, event.position_data.provider_account_id)
+            self._apply_position(event.position_data)
+        elif isinstance(event, AccountUpdateEvent):
+            key = (ACCOUNTS, None)
+            self._apply_account(event.account_data)
+        elif isinstance(event, UserTradeEvent):
+            trade = event.trade_data
+            fills = self._fills.get(trade.provider_account_id)
+            if fills is None:
+                fills = self._fills[trade.provider_account_id] = deque(maxlen=self.max_fills_per_account)
+            fills.append(trade)
+            self.events_applied += 1
+            return
+        else:
+            return
+        self.events_applied += 1
+        pending = self._seeding.get(key)
+        if pending is not None:
+            pending[1].append(event)
+
+    def _apply_order(self, order: Order) -> None:
+        orders = self._orders.setdefault(order.provider_account_id, {})
+        if order.status in OPEN_ORDER_STATUSES:
+            orders[order.provider_order_id] = order
+        else:
+            orders.pop(order.provider_order_id, None)
+
+    def _apply_position(self, position: Position) -> None:
+        positions = self._positions.setdefault(position.provider_account_id, {})
+        if position.quantity:
+            positions[position.provider_contract_id] = position
+        else:
+            positions.pop(position.provider_contract_id, None)
+
+    def _apply_account(self, account: Account) -> None:
+        if account.is_active is False:
+            self._accounts.pop(account.provider_account_id, None)
+        else:
+            self._accounts[account.provider_account_id] = account
+
+    # --- Seeding ---
+
+    def begin_seed(self, kind: str, account_id: Optional[str] = None) -> StateSeed:
+        """Call before fetching a REST snapshot; events from here on are replayed over it."""
+        key = (kind, account_id)
+        pending = self._seeding.get(key)
+        if pending is None:
+            self._seeding[key] = [1, []]
+        else:
+            pending[0] += 1
+        return StateSeed(key, self._generation)
+
+    def complete_seed(self, seed: StateSeed, items: Iterable[Any]) -> None:
+        """Replaces the (kind, account) state with the snapshot `items` and marks it fresh."""
+        kind, account_id = seed.key
+        events = self._release(seed)
+        if kind == ORDERS:
+            self._orders[account_id] = {}
+            for order in items:
+                self._apply_order(order)
+            for event in events:
+                self._apply_order(event.order_data)
+        elif kind == POSITIONS:
+            self._positions[account_id] = {}
+            for position in items:
+                self._apply_position(position)
+            for event in events:
+                self._apply_position(event.position_data)
+        elif kind == ACCOUNTS:
+            self._accounts = {}
+            for account in items:
+                self._apply_account(account)
+            for event in events:
+                self._apply_account(event.account_data)
+        else:
+            raise ValueError(f"Unknown account state kind '{kind}'.")
+        self.seeds += 1
+        # An invalidation while the snapshot was in flight means events may have been missed.
+        if seed.generation == self._generation:
+            self._seeded_at[seed.key] = time.monotonic()
+
+    def cancel_seed(self, seed: StateSeed) -> None:
+        """Releases a seed whose snapshot could not be fetched."""
+        self._release(seed)
+
+    def _release(self, seed: StateSeed) -> List[GenericStreamEvent]:
+        pending = self._seeding.get(seed.key)
+        if pending is None:
+            return []
+        pending[0] -= 1
+        if pending[0] <= 0:
+            del self._seeding[seed.key]
+        return list(pending[1])
+
+    def is_fresh(self, kind: str, account_id: Optional[str] = None) -> bool:
+        seeded_at = self._seeded_at.get((kind, account_id))
+        if seeded_at is None:
+            return False
+        return self.max_age is None or time.monotonic() - seeded_at <= self.max_age
+
+    def invalidate(self, account_id: Optional[str] = None) -> None:
+        """Marks one account's orders and positions, or (without an account) everything, as stale."""
+        self.invalidations += 1
+        if account_id is None:
+            self._seeded_at.clear()
+            self._generation += 1
+            return
+        for kind in (ORDERS, POSITIONS):
+            self._seeded_at.pop((kind, account_id), None)
+        self._generation += 1
+
+    # --- Reads ---
+
+    def open_orders(self, account_id: str, provider_contract_id: Optional[str] = None) -> List[Order]:
+        orders = self._orders.get(account_id, {}).values()
+        if provider_contract_id:
+            return [o for o in orders if o.provider_contract_id == provider_contract_id]
+        return list(orders)
+
+    def positions(self, account_id: str) -> List[Position]:
+        return list(self._positions.get(account_id, {}).values())
+
+    def accounts(self) -> List[Account]:
+        return list(self._accounts.values())
+
+    def recent_fills(self, account_id: str) -> List[Trade]:
+        """Fills received on the stream for an account, oldest first, up to `max_fills_per_account`."""
+        return list(self._fills.get(account_id, ()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fresh": sorted(f"{kind}:{account_id or '*'}" for kind, account_id in self._seeded_at if self.is_fresh(kind, account_id)),
+            "events_applied": self.events_applied,
+            "seeds": self.seeds,
+            "invalidations": self.invalidations,
+        }
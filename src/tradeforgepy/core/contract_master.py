@@ -0,0 +1,258 @@
+# tradeforgepy/core/contract_master.py
+import asyncio
+import bisect
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .enums import AssetClass
+from .models_generic import Contract
+
+logger = logging.getLogger(__name__)
+
+ContractLoader = Callable[[], Awaitable[List[Contract]]]
+
+# Futures month code and one- or two-digit year, e.g. the "Z5" in "NQZ5".
+_EXPIRY_SUFFIX = re.compile(r"^(?P<root>[A-Z0-9]+?)[FGHJKMNQUVXZ]\d{1,2}$")
+
+
+def symbol_root(symbol: str) -> str:
+    """The underlying root of a futures symbol ("NQZ5" -> "NQ"), or the symbol itself."""
+    match = _EXPIRY_SUFFIX.match(symbol.upper())
+    return match.group("root") if match else symbol.upper()
+
+
+class ContractMaster:
+    """
+    The provider's contract universe in memory, indexed by contract id, symbol and
+    underlying, with a sorted symbol list for prefix search.
+
+    The universe is loaded with `refresh()` through `loader` (one request for every
+    available contract) and, if `path` is set, persisted as JSON so the next start
+    can serve lookups from the snapshot before its first refresh completes; see
+    `ensure_loaded()`. `start()` keeps it current with a background refresh every
+    `refresh_interval` seconds. Contracts seen elsewhere, e.g. in search results,
+    are added with `put()`.
+
+    All lookups are dictionary or bisect operations and never await.
+    """
+
+    def __init__(self, loader: ContractLoader, path: Optional[str] = None, refresh_interval: Optional[float] = 3600.0,
+                 name: str = "ContractMaster"):
+        self.loader = loader
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.name = name
+        self._by_id: Dict[str, Contract] = {}
+        self._by_symbol: Dict[str, List[Contract]] = {}
+        self._by_underlying: Dict[str, List[Contract]] = {}
+        self._sorted_symbols: List[str] = []
+        # Wall-clock time of the contract list currently served, from a refresh or the snapshot.
+        self.loaded_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # --- Metrics ---
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the served contract list was fetched, or None before the first load."""
+        return time.time() - self.loaded_at if self.loaded_at is not None else None
+
+    # --- Indexing ---
+
+    def _replace(self, contracts: List[Contract], loaded_at: float) -> None:
+        self._by_id, self._by_symbol, self._by_underlying = {}, {}, {}
+        for contract in contracts:
+            self._index(contract)
+        self._sorted_symbols = sorted(self._by_symbol)
+        self.loaded_at = loaded_at
+
+    def _index(self, contract: Contract) -> bool:
+        """Adds or replaces one contract; returns True if its symbol was not indexed before."""
+        old = self._by_id.get(contract.provider_contract_id)
+        if old is not None:
+            self._unindex(old)
+        self._by_id[contract.provider_contract_id] = contract
+        symbol = contract.symbol.upper()
+        new_symbol = symbol not in self._by_symbol
+        self._by_symbol.setdefault(symbol, []).append(contract)
+        underlying = (contract.underlying_symbol or symbol_root(contract.symbol)).upper()
+        self._by_underlying.setdefault(underlying, []).append(contract)
+        return new_symbol
+
+    def _unindex(self, contract: Contract) -> None:
+        for index, key in ((self._by_symbol, contract.symbol.upper()),
+                           (self._by_underlying, (contract.underlying_symbol or symbol_root(contract.symbol)).upper())):
+            entries = [c for c in index.get(key, ()) if c.provider_contract_id != contract.provider_contract_id]
+            if entries:
+                index[key] = entries
+            else:
+                index.pop(key, None)
+                if index is self._by_symbol:
+                    i = bisect.bisect_left(self._sorted_symbols, key)
+                    if i < len(self._sorted_symbols) and self._sorted_symbols[i] == key:
+                        del self._sorted_symbols[i]
+
+    def put(self, contract: Contract) -> None:
+        """Adds a contract learned outside a refresh; it is kept until the next refresh replaces the universe."""
+        if self._index(contract):
+            bisect.insort(self._sorted_symbols, contract.symbol.upper())
+
+    # --- Lookups ---
+
+    def get(self, provider_contract_id: str) -> Optional[Contract]:
+        return self._by_id.get(provider_contract_id)
+
+    def by_symbol(self, symbol: str) -> List[Contract]:
+        """Contracts whose symbol equals `symbol`, case-insensitively."""
+        return list(self._by_symbol.get(symbol.upper(), ()))
+
+    def by_underlying(self, underlying: str) -> List[Contract]:
+        """All listed expiries of an underlying, e.g. "NQ"."""
+        return list(self._by_underlying.get(underlying.upper(), ()))
+
+    def search(self, text: str, limit: Optional[int] = None, asset_class: Optional[AssetClass] = None) -> List[Contract]:
+        """
+        Contracts whose symbol starts with `text`, then any further contracts of an
+        underlying that starts with it, without duplicates. With `asset_class`, only
+        contracts of that class.
+        """
+        prefix = text.strip().upper()
+        if not prefix:
+            return []
+        results: List[Contract] = []
+        seen = set()
+        i = bisect.bisect_left(self._sorted_symbols, prefix)
+        while i < len(self._sorted_symbols) and self._sorted_symbols[i].startswith(prefix):
+            for contract in self._by_symbol[self._sorted_symbols[i]]:
+                seen.add(contract.provider_contract_id)
+                results.append(contract)
+            i += 1
+        for underlying, contracts in self._by_underlying.items():
+            if underlying.startswith(prefix):
+                results.extend(c for c in contracts if c.provider_contract_id not in seen)
+        if asset_class is not None:
+            results = [c for c in results if c.asset_class == asset_class]
+        return results[:limit] if limit else results
+
+    def match_text(self, text: str, limit: Optional[int] = None, asset_class: Optional[AssetClass] = None) -> List[Contract]:
+        """Contracts whose symbol or description contains `text`, case-insensitively. Scans the universe."""
+        needle = text.strip().upper()
+        if not needle:
+            return []
+        results = [
+            c for c in self._by_id.values()
+            if (needle in c.symbol.upper() or (c.description and needle in c.description.upper()))
+            and (asset_class is None or c.asset_class == asset_class)
+        ]
+        return results[:limit] if limit else results
+
+    # --- Loading ---
+
+    async def refresh(self) -> int:
+        """Reloads the full universe through the loader and persists it. Concurrent calls share one load."""
+        if self._refresh_lock.locked():
+            async with self._refresh_lock:
+                return len(self._by_id)
+        async with self._refresh_lock:
+            contracts = await self.loader()
+            loaded_at = time.time()
+            self._replace(contracts, loaded_at)
+            self.refreshes += 1
+            logger.info(f"{self.name}: loaded {len(contracts)} contracts.")
+            if self.path:
+                try:
+                    await asyncio.to_thread(self._write_snapshot, contracts, loaded_at)
+                except OSError as e:
+                    logger.warning(f"{self.name}: could not persist contract snapshot to '{self.path}': {e}")
+            return len(contracts)
+
+    async def ensure_loaded(self) -> None:
+        """
+        Loads the universe on first use, from the persisted snapshot when there is one
+        (a warm start, refreshed in the background if it is stale) or else through the
+        loader, and starts the background refresh.
+        """
+        if not self.is_loaded:
+            async with self._load_lock:
+                if not self.is_loaded:
+                    snapshot = await asyncio.to_thread(self._read_snapshot) if self.path else None
+                    if snapshot is not None:
+                        contracts, loaded_at = snapshot
+                        self._replace(contracts, loaded_at)
+                        logger.info(f"{self.name}: warm start with {len(contracts)} contracts from '{self.path}'.")
+                    else:
+                        await self.refresh()
+        self.start()
+
+    def _read_snapshot(self) -> Optional[Tuple[List[Contract], float]]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            return [Contract.model_validate(c) for c in snapshot["contracts"]], float(snapshot["loaded_at"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"{self.name}: ignoring unreadable contract snapshot '{self.path}': {e}")
+            return None
+
+    def _write_snapshot(self, contracts: List[Contract], loaded_at: float) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"loaded_at": loaded_at, "contracts": [c.model_dump(mode="json") for c in contracts]}, f)
+        os.replace(tmp_path, self.path)
+
+    # --- Background refresh ---
+
+    def start(self) -> None:
+        """Starts the periodic background refresh, if an interval is set. Must be called from the event loop."""
+        if self.refresh_interval is None or (self._refresh_task and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop(), name=f"{self.name}_Refresh")
+
+    async def stop(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+        self._refresh_task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            age = self.age()
+            delay = self.refresh_interval - age if age is not None else 0.0
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning(f"{self.name}: background refresh failed, serving the previous contracts: {e}")
+                await asyncio.sleep(min(self.refresh_interval, 60.0))
+
+    def stats(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            "contracts": len(self._by_id),
+            "symbols": len(self._sorted_symbols),
+            "underlyings": len(self._by_underlying),
+            "age_seconds": round(age, 3) if age is not None else None,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
@@ -68,9 +68,21 @@ class MarketDataType(str, Enum):
     TRADE = "TRADE"
     DEPTH = "DEPTH"
     CANDLE = "CANDLE"
+    ORDER_BOOK = "ORDER_BOOK"
 
 class UserDataType(str, Enum):
     ORDER_UPDATE = "ORDER_UPDATE"
     POSITION_UPDATE = "POSITION_UPDATE"
     ACCOUNT_UPDATE = "ACCOUNT_UPDATE"
-    USER_TRADE = "USER_TRADE"
\ No newline at end of file
+    USER_TRADE = "USER_TRADE"
+
+class ConflationMode(str, Enum):
+    NONE = "NONE"            # Deliver every event
+    LATEST = "LATEST"        # Latest value wins while the consumer is busy
+    INTERVAL = "INTERVAL"    # At most one event per interval, carrying the latest value
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "BLOCK"              # Producer waits for space (backpressure onto the socket reader)
+    DROP_OLDEST = "DROP_OLDEST"  # Discard the oldest queued event to make room
+    DROP_NEWEST = "DROP_NEWEST"  # Discard the incoming event
+    CONFLATE = "CONFLATE"        # Replace a queued event with the same key; otherwise wait for space
@@ -1,14 +1,18 @@
 # ==============================================================================
 # tradeforgepy/tradeforgepy/core/models_generic.py
 # ==============================================================================
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List, Dict, Any, Union, Literal as typing_Literal # Renamed Literal to avoid conflict
+from array import array
+from collections.abc import Sequence
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict, GetCoreSchemaHandler
+from pydantic_core import core_schema
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Union, Literal as typing_Literal # Renamed Literal to avoid conflict
 from datetime import datetime
 from .enums import (
     AssetClass, OrderSide, OrderType, OrderTimeInForce, OrderStatus,
     BarTimeframeUnit, MarketDataType, UserDataType
 )
 from tradeforgepy.utils.time_utils import ensure_utc
+from tradeforgepy.utils.tick_utils import TickScale
 
 class GenericBaseModel(BaseModel):
     provider_name: Optional[str] = Field(None, description="Name of the trading platform provider")
@@ -50,6 +54,10 @@ class Contract(GenericBaseModel):
 
     _ensure_expiration_utc = field_validator('expiration_date_utc', mode='before')(ensure_utc)
 
+    def tick_scale(self) -> Optional[TickScale]:
+        """Returns the integer-tick scale for this contract, or None if its tick size is unknown."""
+        return TickScale(self.tick_size) if self.tick_size else None
+
 class BarData(GenericBaseModel):
     timestamp_utc: datetime = Field(..., description="Start timestamp of the bar (UTC)")
     open: float
@@ -105,6 +113,16 @@ class PlaceOrderRequest(BaseModel):
     stop_price: Optional[float] = Field(None, gt=0)
     time_in_force: OrderTimeInForce = OrderTimeInForce.DAY
     client_order_id: Optional[str] = None
+    limit_price_ticks: Optional[int] = Field(None, gt=0, description="Limit price as an integer number of contract ticks")
+    stop_price_ticks: Optional[int] = Field(None, gt=0, description="Stop price as an integer number of contract ticks")
+
+    @model_validator(mode='after')
+    def _check_single_price_form(self):
+        if self.limit_price is not None and self.limit_price_ticks is not None:
+            raise ValueError("Provide either limit_price or limit_price_ticks, not both.")
+        if self.stop_price is not None and self.stop_price_ticks is not None:
+            raise ValueError("Provide either stop_price or stop_price_ticks, not both.")
+        return self
 
 class OrderPlacementResponse(GenericBaseModel):
     order_id_acknowledged: bool
@@ -115,9 +133,20 @@ class OrderPlacementResponse(GenericBaseModel):
 class ModifyOrderRequest(BaseModel):
     provider_account_id: str
     provider_order_id: str
+    provider_contract_id: Optional[str] = Field(None, description="Contract of the order; required when using tick prices")
     new_size: Optional[float] = Field(None, gt=0)
     new_limit_price: Optional[float] = Field(None, gt=0)
     new_stop_price: Optional[float] = Field(None, gt=0)
+    new_limit_price_ticks: Optional[int] = Field(None, gt=0, description="New limit price as an integer number of contract ticks")
+    new_stop_price_ticks: Optional[int] = Field(None, gt=0, description="New stop price as an integer number of contract ticks")
+
+    @model_validator(mode='after')
+    def _check_single_price_form(self):
+        if self.new_limit_price is not None and self.new_limit_price_ticks is not None:
+            raise ValueError("Provide either new_limit_price or new_limit_price_ticks, not both.")
+        if self.new_stop_price is not None and self.new_stop_price_ticks is not None:
+            raise ValueError("Provide either new_stop_price or new_stop_price_ticks, not both.")
+        return self
 
 class GenericModificationResponse(GenericBaseModel):
     success: bool
@@ -126,6 +155,7 @@ class GenericModificationResponse(GenericBaseModel):
 
 class GenericCancellationResponse(GenericBaseModel):
     success: bool
+    provider_order_id: Optional[str] = None
     message: Optional[str] = None
 
 class Position(GenericBaseModel):
@@ -155,6 +185,7 @@ class GenericStreamEvent(GenericBaseModel):
     timestamp_event_utc: datetime = Field(..., alias="timestamp_utc", description="Timestamp of the event occurrence (UTC)")
     provider_contract_id: Optional[str] = None
     provider_account_id: Optional[str] = None
+    is_synthetic: bool = Field(False, description="True if generated by a post-reconnect resync rather than received from the stream")
 
     _ensure_event_dt_utc = field_validator('timestamp_event_utc', mode='before')(ensure_utc)
 
@@ -178,12 +209,159 @@ class DepthLevel(BaseModel):
     size: float
     side: OrderSide
 
+class DepthLevels(Sequence):
+    """
+    A compact, column-oriented container for one side of an order book.
+
+    Prices and sizes are held in two parallel `array('d')` columns rather than
+    one `DepthLevel` model per level. Levels are kept sorted best-first (bids
+    descending, asks ascending). `DepthLevel` objects are only created when an
+    item is accessed, iterated or serialized, so the container can be passed
+    around at high update rates without allocating a model per level.
+    """
+    __slots__ = ("side", "_prices", "_sizes")
+
+    def __init__(self, side: OrderSide, prices: Iterable[float] = (), sizes: Iterable[float] = (),
+                 presorted: bool = False):
+        if side is None:
+            raise ValueError("DepthLevels requires a side.")
+        self.side = side
+        self._prices = prices if isinstance(prices, array) else array('d', prices)
+        self._sizes = sizes if isinstance(sizes, array) else array('d', sizes)
+        if len(self._prices) != len(self._sizes):
+            raise ValueError(f"DepthLevels columns differ in length: {len(self._prices)} prices vs {len(self._sizes)} sizes.")
+        if not presorted:
+            self._sort()
+
+    @classmethod
+    def from_levels(cls, levels: Iterable[DepthLevel], side: Optional[OrderSide] = None) -> "DepthLevels":
+        """
+        Builds a container from `DepthLevel` objects. The side is taken from the levels if not
+        given, so it must be given for an empty sequence.
+        """
+        prices, sizes = array('d'), array('d')
+        for level in levels:
+            if side is None:
+                side = level.side
+            elif level.side != side:
+                raise ValueError(f"Cannot mix {level.side.value} and {side.value} levels in one DepthLevels container.")
+            prices.append(level.price)
+            sizes.append(level.size)
+        if side is None:
+            raise ValueError("Cannot infer the side of an empty DepthLevels; pass side explicitly.")
+        return cls(side, prices, sizes)
+
+    def _sort(self) -> None:
+        prices = self._prices
+        if len(prices) < 2:
+            return
+        # Argsort over the price column, then gather both columns in one pass each.
+        order = sorted(range(len(prices)), key=prices.__getitem__, reverse=self.side == OrderSide.BUY)
+        self._prices = array('d', map(prices.__getitem__, order))
+        self._sizes = array('d', map(self._sizes.__getitem__, order))
+
+    @property
+    def prices(self) -> memoryview:
+        """A read-only view over the price column, best level first."""
+        return memoryview(self._prices).toreadonly()
+
+    @property
+    def sizes(self) -> memoryview:
+        """A read-only view over the size column, aligned with `prices`."""
+        return memoryview(self._sizes).toreadonly()
+
+    @property
+    def best_price(self) -> Optional[float]:
+        return self._prices[0] if self._prices else None
+
+    @property
+    def best(self) -> Optional[DepthLevel]:
+        return self[0] if self._prices else None
+
+    def top(self, n: int) -> "DepthLevels":
+        """Returns a new container holding only the best `n` levels."""
+        return DepthLevels(self.side, self._prices[:n], self._sizes[:n], presorted=True)
+
+    def total_size(self, n: Optional[int] = None) -> float:
+        """Sums the size of the best `n` levels (all levels if `n` is None)."""
+        return sum(self._sizes if n is None else self._sizes[:n])
+
+    def to_levels(self) -> List[DepthLevel]:
+        side = self.side
+        return [DepthLevel(price=p, size=s, side=side) for p, s in zip(self._prices, self._sizes)]
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DepthLevels(self.side, self._prices[index], self._sizes[index], presorted=True)
+        return DepthLevel(price=self._prices[index], size=self._sizes[index], side=self.side)
+
+    def __iter__(self) -> Iterator[DepthLevel]:
+        side = self.side
+        for p, s in zip(self._prices, self._sizes):
+            yield DepthLevel(price=p, size=s, side=side)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, DepthLevels):
+            return self.side == other.side and self._prices == other._prices and self._sizes == other._sizes
+        if isinstance(other, (list, tuple)):
+            return self.to_levels() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"DepthLevels(side={self.side.value}, levels={len(self)}, best={self.best_price})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        levels_schema = handler.generate_schema(List[DepthLevel])
+
+        def _validate(value: Any, validate_levels: core_schema.ValidatorFunctionWrapHandler) -> "DepthLevels":
+            # Containers (e.g. built by a model's before-validator) pass through in both modes.
+            return value if isinstance(value, cls) else cls.from_levels(validate_levels(value))
+        return core_schema.no_info_wrap_validator_function(
+            _validate, levels_schema,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda v: v.to_levels(), return_schema=levels_schema
+            ),
+        )
+
 class DepthSnapshotEvent(GenericStreamEvent):
     event_type: typing_Literal[MarketDataType.DEPTH] = MarketDataType.DEPTH
-    bids: List[DepthLevel] = Field(default_factory=list)
-    asks: List[DepthLevel] = Field(default_factory=list)
+    bids: DepthLevels = Field(default_factory=lambda: DepthLevels(OrderSide.BUY))
+    asks: DepthLevels = Field(default_factory=lambda: DepthLevels(OrderSide.SELL))
     is_snapshot: bool = True
 
+    @field_validator('bids', 'asks', mode='before')
+    @classmethod
+    def _levels_with_side(cls, value: Any, info) -> Any:
+        # A serialized side is a plain list of levels; the field says which side an empty one is.
+        if isinstance(value, (list, tuple)):
+            side = OrderSide.BUY if info.field_name == 'bids' else OrderSide.SELL
+            return DepthLevels.from_levels((DepthLevel.model_validate(level) for level in value), side=side)
+        return value
+
+    @model_validator(mode='after')
+    def _check_sides(self):
+        if self.bids.side != OrderSide.BUY or self.asks.side != OrderSide.SELL:
+            raise ValueError("bids must hold BUY levels and asks SELL levels.")
+        return self
+
+class OrderBookUpdateEvent(GenericStreamEvent):
+    """
+    A compact notification that a maintained order book changed. It carries the top of
+    book only; use the provider's `get_order_book()` to read deeper levels.
+    """
+    event_type: typing_Literal[MarketDataType.ORDER_BOOK] = MarketDataType.ORDER_BOOK
+    sequence: int = Field(..., description="Book sequence number, incremented once per applied provider message")
+    best_bid_price: Optional[float] = None
+    best_bid_size: Optional[float] = None
+    best_ask_price: Optional[float] = None
+    best_ask_size: Optional[float] = None
+    levels_changed: int = Field(0, description="Number of price levels added, resized or removed by this update")
+    is_reset: bool = Field(False, description="True if the provider cleared the book before applying this update")
+
 class OrderUpdateEvent(GenericStreamEvent):
     event_type: typing_Literal[UserDataType.ORDER_UPDATE] = UserDataType.ORDER_UPDATE
     order_data: Order
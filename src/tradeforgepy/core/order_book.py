@@ -0,0 +1,154 @@
+# ==============================================================================
+# tradeforgepy/tradeforgepy/core/order_book.py
+# ==============================================================================
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple, Union
+
+from .enums import OrderSide
+from .models_generic import DepthLevels, DepthSnapshotEvent
+from tradeforgepy.utils.tick_utils import TickScale
+
+PriceKey = Union[int, float]
+
+
+class OrderBook:
+    """
+    An incrementally maintained L2 order book for a single contract.
+
+    Each side keeps a dict of price key -> size plus an ascending list of the
+    keys, so applying a delta is a dict update and (for new or removed levels)
+    a bisect. When a `TickScale` is supplied, price keys are integer ticks, so
+    level lookups, comparisons and hashing are exact integer operations; prices
+    are converted back to floats only when levels are read out.
+
+    The book does not emit anything by itself. Stream handlers apply a batch
+    of level changes and then call `commit()`, which advances `sequence`.
+    """
+
+    def __init__(self, provider_contract_id: str, tick_scale: Optional[TickScale] = None):
+        self.provider_contract_id = provider_contract_id
+        self.tick_scale = tick_scale
+        self.sequence = 0
+        self.last_update_utc: Optional[datetime] = None
+        self._bid_sizes: Dict[PriceKey, float] = {}
+        self._bid_keys: List[PriceKey] = []
+        self._ask_sizes: Dict[PriceKey, float] = {}
+        self._ask_keys: List[PriceKey] = []
+
+    # --- Mutation ---
+
+    def _key(self, price: float) -> PriceKey:
+        return self.tick_scale.to_ticks(price, strict=False) if self.tick_scale else price
+
+    def _price(self, key: PriceKey) -> float:
+        return self.tick_scale.to_price(key) if self.tick_scale else key
+
+    def apply_level(self, side: OrderSide, price: float, size: float) -> bool:
+        """
+        Sets the size of one price level. A size of zero (or less) removes the level.
+        Returns True if the book changed.
+        """
+        if side == OrderSide.BUY:
+            sizes, keys = self._bid_sizes, self._bid_keys
+        else:
+            sizes, keys = self._ask_sizes, self._ask_keys
+        key = self._key(price)
+
+        if size <= 0:
+            if key not in sizes:
+                return False
+            del sizes[key]
+            del keys[bisect_left(keys, key)]
+            return True
+
+        previous = sizes.get(key)
+        if previous is None:
+            insort(keys, key)
+        elif previous == size:
+            return False
+        sizes[key] = size
+        return True
+
+    def clear(self) -> None:
+        """Removes every level from both sides (e.g. on a provider reset message)."""
+        self._bid_sizes.clear()
+        self._bid_keys.clear()
+        self._ask_sizes.clear()
+        self._ask_keys.clear()
+
+    def commit(self, timestamp_utc: Optional[datetime] = None) -> int:
+        """Marks the end of one batch of changes and returns the new sequence number."""
+        self.sequence += 1
+        if timestamp_utc is not None:
+            self.last_update_utc = timestamp_utc
+        return self.sequence
+
+    # --- Queries ---
+
+    @property
+    def bid_depth(self) -> int:
+        return len(self._bid_keys)
+
+    @property
+    def ask_depth(self) -> int:
+        return len(self._ask_keys)
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """Returns the best bid as (price, size), or None if there are no bids."""
+        if not self._bid_keys:
+            return None
+        key = self._bid_keys[-1]
+        return self._price(key), self._bid_sizes[key]
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """Returns the best ask as (price, size), or None if there are no asks."""
+        if not self._ask_keys:
+            return None
+        key = self._ask_keys[0]
+        return self._price(key), self._ask_sizes[key]
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask[0] - bid[0] if bid and ask else None
+
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        return (bid[0] + ask[0]) / 2 if bid and ask else None
+
+    def _best_keys(self, side: OrderSide, n: Optional[int]) -> Tuple[List[PriceKey], Dict[PriceKey, float]]:
+        if side == OrderSide.BUY:
+            keys = self._bid_keys[::-1] if n is None else self._bid_keys[:-n - 1:-1] if n > 0 else []
+            return keys, self._bid_sizes
+        keys = self._ask_keys[:] if n is None else self._ask_keys[:max(n, 0)]
+        return keys, self._ask_sizes
+
+    def top(self, side: OrderSide, n: Optional[int] = None) -> DepthLevels:
+        """Returns the best `n` levels of one side (all levels if `n` is None), best first."""
+        keys, sizes = self._best_keys(side, n)
+        return DepthLevels(side, [self._price(k) for k in keys], [sizes[k] for k in keys], presorted=True)
+
+    def cumulative_depth(self, side: OrderSide, n: Optional[int] = None) -> DepthLevels:
+        """Like `top()`, but each level's size is the running total from the best level outwards."""
+        keys, sizes = self._best_keys(side, n)
+        return DepthLevels(side, [self._price(k) for k in keys], accumulate(sizes[k] for k in keys), presorted=True)
+
+    def total_size(self, side: OrderSide, n: Optional[int] = None) -> float:
+        """Sums the size of the best `n` levels of one side (all levels if `n` is None)."""
+        keys, sizes = self._best_keys(side, n)
+        return sum(sizes[k] for k in keys)
+
+    def to_snapshot_event(self, n: Optional[int] = None, provider_name: Optional[str] = None) -> Optional[DepthSnapshotEvent]:
+        """Materializes the current book as a `DepthSnapshotEvent`, or None if it has never been updated."""
+        if self.last_update_utc is None:
+            return None
+        return DepthSnapshotEvent(
+            provider_name=provider_name, provider_contract_id=self.provider_contract_id,
+            timestamp_utc=self.last_update_utc, bids=self.top(OrderSide.BUY, n), asks=self.top(OrderSide.SELL, n),
+            is_snapshot=True
+        )
+
+    def __repr__(self) -> str:
+        return (f"OrderBook({self.provider_contract_id}, seq={self.sequence}, "
+                f"bid={self.best_bid()}, ask={self.best_ask()}, depth={self.bid_depth}x{self.ask_depth})")
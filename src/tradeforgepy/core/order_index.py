@@ -0,0 +1,121 @@
+# tradeforgepy/core/order_index.py
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .account_state import OPEN_ORDER_STATUSES
+from .models_generic import Order
+
+_OrderKey = Tuple[str, str]
+# An order, or a zero-argument loader that maps it on first read (e.g. a row of a lazy REST list).
+_OrderSource = Union[Order, Callable[[], Optional[Order]]]
+
+
+class _IndexEntry:
+    __slots__ = ("source", "client_order_id", "placed_at")
+
+    def __init__(self):
+        self.source: Optional[_OrderSource] = None
+        self.client_order_id: Optional[str] = None
+        self.placed_at: Optional[datetime] = None
+
+
+class OrderIndex:
+    """
+    Orders by (account, order id), plus client order id -> order id, for
+    constant-time lookups without scanning order history.
+
+    Entries come from placement acknowledgements (`record_placement()`, which
+    only knows the ids and the placement time), stream updates (`put()`) and
+    REST results (`put_lazy()`, which keeps a loader so history rows are only
+    mapped when they are looked up). The last write for an order wins.
+
+    The index holds at most `max_orders` orders and evicts the least recently
+    written ones first.
+    """
+
+    def __init__(self, max_orders: int = 100_000):
+        self.max_orders = max_orders
+        self._entries: "OrderedDict[_OrderKey, _IndexEntry]" = OrderedDict()
+        self._client_ids: Dict[_OrderKey, str] = {}
+
+        # --- Metrics ---
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, account_id: str, order_id: str) -> _IndexEntry:
+        key = (account_id, order_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _IndexEntry()
+            if len(self._entries) > self.max_orders:
+                (old_account, _), old = self._entries.popitem(last=False)
+                if old.client_order_id is not None:
+                    self._client_ids.pop((old_account, old.client_order_id), None)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    # --- Writes ---
+
+    def record_placement(self, account_id: str, order_id: str, client_order_id: Optional[str], placed_at: datetime) -> None:
+        """Records an acknowledged placement before any order details are known."""
+        entry = self._entry(account_id, order_id)
+        entry.placed_at = placed_at
+        if client_order_id:
+            entry.client_order_id = client_order_id
+            self._client_ids[(account_id, client_order_id)] = order_id
+
+    def put(self, order: Order) -> None:
+        entry = self._entry(order.provider_account_id, order.provider_order_id)
+        entry.source = order
+        if order.client_order_id:
+            entry.client_order_id = order.client_order_id
+            self._client_ids[(order.provider_account_id, order.client_order_id)] = order.provider_order_id
+
+    def put_lazy(self, account_id: str, order_id: str, loader: Callable[[], Optional[Order]]) -> None:
+        self._entry(account_id, order_id).source = loader
+
+    # --- Reads ---
+
+    def get(self, account_id: str, order_id: str) -> Optional[Order]:
+        """Returns the indexed order, or None if only its placement (or nothing) is known."""
+        entry = self._entries.get((account_id, order_id))
+        source = entry.source if entry is not None else None
+        if source is None:
+            self.misses += 1
+            return None
+        if not isinstance(source, Order):
+            source = source()
+            if source is None:
+                self.misses += 1
+                return None
+            entry.source = source
+        if entry.client_order_id and not source.client_order_id:
+            # Placement acks know the client id; provider order records may not carry it.
+            source = entry.source = source.model_copy(update={"client_order_id": entry.client_order_id})
+        self.hits += 1
+        return source
+
+    def resolve_client_order_id(self, account_id: str, client_order_id: str) -> Optional[str]:
+        return self._client_ids.get((account_id, client_order_id))
+
+    def placed_at(self, account_id: str, order_id: str) -> Optional[datetime]:
+        """When the order was placed or created, if known without mapping anything."""
+        entry = self._entries.get((account_id, order_id))
+        if entry is None:
+            return None
+        if entry.placed_at is not None:
+            return entry.placed_at
+        return entry.source.created_at_utc if isinstance(entry.source, Order) else None
+
+    @staticmethod
+    def is_final(order: Order) -> bool:
+        """True if the order can no longer change."""
+        return order.status not in OPEN_ORDER_STATUSES
+
+    def stats(self) -> Dict[str, Any]:
+        return {"orders": len(self._entries), "client_ids": len(self._client_ids), "hits": self.hits, "misses": self.misses}
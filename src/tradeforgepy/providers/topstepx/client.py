@@ -2,24 +2,25 @@
 import httpx
 import asyncio
 import json
+from functools import lru_cache
 from typing import Optional, Dict, Any, Union
 from datetime import datetime, timedelta
 import logging
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from .schemas_ts import (
     TSLoginApiKeyRequest, TSLoginResponse, TSValidateResponse,
     TSSearchAccountRequest, TSSearchAccountResponse,
-    TSSearchContractRequest, TSSearchContractByIdRequest, TSSearchContractResponse, TSSearchContractByIdResponse,
+    TSSearchContractRequest, TSAvailableContractRequest, TSSearchContractByIdRequest, TSSearchContractResponse, TSSearchContractByIdResponse,
     TSRetrieveBarRequest, TSRetrieveBarResponse,
     TSPlaceOrderRequest, TSPlaceOrderResponse,
     TSCancelOrderRequest, TSCancelOrderResponse,
     TSModifyOrderRequest, TSModifyOrderResponse,
-    TSSearchOrderRequest, TSSearchOrderResponse, TSSearchOpenOrderRequest,
+    TSSearchOrderRequest, TSSearchOrderRowsResponse, TSSearchOpenOrderRequest,
     TSCloseContractPositionRequest, TSPartialCloseContractPositionRequest, TSClosePositionResponse, TSPartialClosePositionResponse,
-    TSSearchPositionRequest, TSSearchPositionResponse,
-    TSSearchTradeRequest, TSSearchHalfTradeResponse
+    TSSearchPositionRequest, TSSearchPositionRowsResponse,
+    TSSearchTradeRequest, TSSearchHalfTradeRowsResponse
 )
 from tradeforgepy.exceptions import AuthenticationError, ConnectionError as TradeForgeConnectionError, OperationFailedError, InvalidParameterError, NotFoundError
 from tradeforgepy.utils.time_utils import UTC_TZ
@@ -31,6 +32,11 @@ logger = logging.getLogger(__name__)
 TS_TOKEN_LIFETIME_HOURS = 23.5
 TS_TOKEN_SAFETY_MARGIN_MINUTES = 30
 
+@lru_cache(maxsize=None)
+def _response_adapter(model: type) -> TypeAdapter:
+    """Returns a TypeAdapter for a response model, built once per model and reused for every request."""
+    return TypeAdapter(model)
+
 class TopStepXHttpClient:
     """
     An async HTTP client dedicated to interacting with the TopStepX REST API.
@@ -120,6 +126,33 @@ class TopStepXHttpClient:
             if not await self._validate_token():
                 await self._authenticate()
 
+    async def get_stream_token(self, rejected_token: Optional[str] = None) -> str:
+        """
+        Returns a current token for opening a hub connection, renewing it first if it is due.
+
+        Streams call this before every (re)connect instead of holding on to the token they
+        were created with. Passing the token a hub just rejected forces a fresh login, unless
+        another caller already replaced it, so several streams rejected at once share one login.
+        """
+        if rejected_token is not None and rejected_token == self._token:
+            logger.info("Stream token was rejected by a hub; re-authenticating.")
+            # Marks the token stale; _authenticate re-checks under its lock, so concurrent callers log in once.
+            self._token_acquired_at = None
+            await self._authenticate()
+        else:
+            await self._ensure_valid_token()
+        if not self._token:
+            raise AuthenticationError("No TopStepX token available for the stream connection.")
+        return self._token
+
+    @staticmethod
+    def _retry_after_sec(response: httpx.Response) -> Optional[float]:
+        """Seconds from a numeric Retry-After header, if the server sent one."""
+        try:
+            return max(float(response.headers.get("Retry-After", "")), 0.0)
+        except ValueError:
+            return None
+
     async def _request(self, method: str, endpoint: str,
                        content_payload: Optional[str] = None,
                        expected_response_model: Optional[type[BaseModel]] = None
@@ -157,20 +190,24 @@ class TopStepXHttpClient:
                     logger.error(f"TopStepX API reported failure at {endpoint}: {err_msg} (Code: {err_code})")
                     raise OperationFailedError(err_msg, provider_error_code=err_code, provider_error_message=err_msg)
 
-                return expected_response_model.model_validate(response_data) if expected_response_model else response_data
+                return _response_adapter(expected_response_model).validate_python(response_data) if expected_response_model else response_data
 
             except (httpx.HTTPStatusError, httpx.RequestError) as e:
-                # Check if it's a server error (5xx) or a transient request error
+                # Check if it's a server error (5xx), a rate limit (429) or a transient request error
                 is_server_error = isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500
+                is_rate_limited = isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429
                 is_transient_error = isinstance(e, httpx.RequestError)
 
-                if is_server_error or is_transient_error:
+                if is_server_error or is_rate_limited or is_transient_error:
                     last_exception = e
+                    # A rate-limited request was not processed, so it is safe to send again once allowed.
+                    delay_sec = self._retry_after_sec(e.response) if is_rate_limited else None
+                    delay_sec = backoff_sec if delay_sec is None else delay_sec
                     logger.warning(
                         f"Retryable HTTP error on attempt {attempt + 1}/{self._MAX_RETRIES} for {endpoint}: {e}. "
-                        f"Retrying in {backoff_sec:.1f}s..."
+                        f"Retrying in {delay_sec:.1f}s..."
                     )
-                    await asyncio.sleep(backoff_sec)
+                    await asyncio.sleep(delay_sec)
                     backoff_sec *= 2  # Exponential backoff
                     continue
                 else:
@@ -197,6 +234,10 @@ class TopStepXHttpClient:
         payload = TSSearchContractRequest(searchText=search_text, live=live).model_dump_json()
         return await self._request("POST", "/api/Contract/search", content_payload=payload, expected_response_model=TSSearchContractResponse)
 
+    async def ts_get_available_contracts(self, live: bool = False) -> TSSearchContractResponse:
+        payload = TSAvailableContractRequest(live=live).model_dump_json()
+        return await self._request("POST", "/api/Contract/available", content_payload=payload, expected_response_model=TSSearchContractResponse)
+
     async def ts_get_contract_by_id(self, contract_id: str) -> TSSearchContractByIdResponse:
         payload = TSSearchContractByIdRequest(contractId=contract_id).model_dump_json()
         return await self._request("POST", "/api/Contract/searchById", content_payload=payload, expected_response_model=TSSearchContractByIdResponse)
@@ -217,17 +258,17 @@ class TopStepXHttpClient:
         payload = modify_request.model_dump_json(by_alias=True, exclude_none=True)
         return await self._request("POST", "/api/Order/modify", content_payload=payload, expected_response_model=TSModifyOrderResponse)
 
-    async def ts_search_orders(self, search_request: TSSearchOrderRequest) -> TSSearchOrderResponse:
+    async def ts_search_orders(self, search_request: TSSearchOrderRequest) -> TSSearchOrderRowsResponse:
         payload = search_request.model_dump_json(by_alias=True, exclude_none=True)
-        return await self._request("POST", "/api/Order/search", content_payload=payload, expected_response_model=TSSearchOrderResponse)
+        return await self._request("POST", "/api/Order/search", content_payload=payload, expected_response_model=TSSearchOrderRowsResponse)
 
-    async def ts_search_open_orders(self, search_open_request: TSSearchOpenOrderRequest) -> TSSearchOrderResponse:
+    async def ts_search_open_orders(self, search_open_request: TSSearchOpenOrderRequest) -> TSSearchOrderRowsResponse:
         payload = search_open_request.model_dump_json()
-        return await self._request("POST", "/api/Order/searchOpen", content_payload=payload, expected_response_model=TSSearchOrderResponse)
+        return await self._request("POST", "/api/Order/searchOpen", content_payload=payload, expected_response_model=TSSearchOrderRowsResponse)
 
-    async def ts_search_open_positions(self, account_id: int) -> TSSearchPositionResponse:
+    async def ts_search_open_positions(self, account_id: int) -> TSSearchPositionRowsResponse:
         payload = TSSearchPositionRequest(accountId=account_id).model_dump_json()
-        return await self._request("POST", "/api/Position/searchOpen", content_payload=payload, expected_response_model=TSSearchPositionResponse)
+        return await self._request("POST", "/api/Position/searchOpen", content_payload=payload, expected_response_model=TSSearchPositionRowsResponse)
 
     async def ts_close_contract_position(self, account_id: int, contract_id: str) -> TSClosePositionResponse:
         payload = TSCloseContractPositionRequest(accountId=account_id, contractId=contract_id).model_dump_json()
@@ -237,9 +278,9 @@ class TopStepXHttpClient:
         payload = TSPartialCloseContractPositionRequest(accountId=account_id, contractId=contract_id, size=size).model_dump_json()
         return await self._request("POST", "/api/Position/partialCloseContract", content_payload=payload, expected_response_model=TSPartialClosePositionResponse)
 
-    async def ts_search_trades(self, search_request: TSSearchTradeRequest) -> TSSearchHalfTradeResponse:
+    async def ts_search_trades(self, search_request: TSSearchTradeRequest) -> TSSearchHalfTradeRowsResponse:
         payload = search_request.model_dump_json(by_alias=True, exclude_none=True)
-        return await self._request("POST", "/api/Trade/search", content_payload=payload, expected_response_model=TSSearchHalfTradeResponse)
+        return await self._request("POST", "/api/Trade/search", content_payload=payload, expected_response_model=TSSearchHalfTradeRowsResponse)
 
     async def close_http_client(self):
         """Closes the underlying httpx.AsyncClient session."""
@@ -1,28 +1,36 @@
 # tradeforgepy/providers/topstepx/mapper.py
 import logging
-from typing import List, Optional, Any, Dict
+from array import array
+from typing import Callable, List, Optional, Any, Dict, Sequence, TypeVar, Union
 from datetime import datetime
 from decimal import Decimal
 
+from pydantic import BaseModel, TypeAdapter
+
 from tradeforgepy.utils.time_utils import ensure_utc, UTC_TZ
+from tradeforgepy.utils.lazy_sequence import LazyMappedList
+from tradeforgepy.exceptions import ConnectionError as TradeForgeConnectionError
 
 from .schemas_ts import (
     TSTradingAccountModel, TSContractModel, TSAggregateBarModel, TSOrderModel,
     TSPositionModel, TSHalfTradeModel, TSPositionType,
-    TSOrderStatus, TSTraderOrderType, TSOrderSide, TSAggregateBarUnit
+    TSOrderStatus, TSTraderOrderType, TSOrderSide, TSAggregateBarUnit, TSDomType
 )
 from tradeforgepy.core.models_generic import (
     Account as GenericAccount, Contract as GenericContract, BarData as GenericBarData,
     Order as GenericOrder, Position as GenericPosition, Trade as GenericTrade,
-    QuoteEvent, MarketTradeEvent, DepthSnapshotEvent, DepthLevel,
+    QuoteEvent, MarketTradeEvent, DepthSnapshotEvent, DepthLevels, OrderBookUpdateEvent,
     OrderUpdateEvent, PositionUpdateEvent, AccountUpdateEvent, UserTradeEvent
 )
 from tradeforgepy.core.enums import (
     AssetClass, OrderSide, OrderType, OrderStatus, OrderTimeInForce, BarTimeframeUnit
 )
+from tradeforgepy.core.order_book import OrderBook
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # --- Enum Mappers ---
 def map_ts_order_status_to_generic(ts_status: TSOrderStatus) -> OrderStatus:
     mapping = {
@@ -77,6 +85,19 @@ def map_generic_bar_unit_to_ts(g_unit: BarTimeframeUnit) -> TSAggregateBarUnit:
     return ts_unit
 
 # --- REST API Model Mappers ---
+# List responses keep their rows raw; these adapters validate a single row on demand.
+# Rows that are already TopStepX models pass through without re-validation.
+_TS_ORDER_ADAPTER = TypeAdapter(TSOrderModel)
+_TS_POSITION_ADAPTER = TypeAdapter(TSPositionModel)
+_TS_TRADE_ADAPTER = TypeAdapter(TSHalfTradeModel)
+_MAPPABLE_TS_ORDER_TYPES = frozenset(
+    t.value for t in TSTraderOrderType if map_ts_order_type_to_generic(t) is not None
+)
+
+def ts_row_field(row: Union[BaseModel, Dict[str, Any]], field_name: str) -> Any:
+    """Reads a field from a raw REST row, which is either a dict or an already-validated TopStepX model."""
+    return row.get(field_name) if isinstance(row, dict) else getattr(row, field_name, None)
+
 def map_ts_account_to_generic(ts_account: TSTradingAccountModel, provider_name: str) -> GenericAccount:
     return GenericAccount(
         provider_account_id=str(ts_account.id), account_name=ts_account.name,
@@ -122,14 +143,31 @@ def map_ts_order_details_to_generic(ts_order: TSOrderModel, provider_name: str)
         provider_name=provider_name, provider_specific_data=ts_order.model_dump()
     )
 
-def map_ts_orders_to_generic(ts_orders: List[TSOrderModel], provider_name: str) -> List[GenericOrder]:
-    generic_orders = []
-    for o in ts_orders:
-        if o:
-            mapped_order = map_ts_order_details_to_generic(o, provider_name)
-            if mapped_order:
-                generic_orders.append(mapped_order)
-    return generic_orders
+def map_ts_order_row_to_generic(ts_order_row: Union[TSOrderModel, Dict[str, Any]], provider_name: str) -> Optional[GenericOrder]:
+    return map_ts_order_details_to_generic(_TS_ORDER_ADAPTER.validate_python(ts_order_row), provider_name)
+
+def _lazy_rows(rows: List[Any], map_row: Callable[[Any], T], what: str) -> LazyMappedList[T]:
+    """
+    A lazy list of REST rows. Rows are validated when they are read, after the HTTP client
+    has returned, so a malformed row is raised as the same `TradeForgeConnectionError` a
+    malformed response envelope would be.
+    """
+    def _map(row: Any) -> T:
+        try:
+            return map_row(row)
+        except Exception as e:
+            raise TradeForgeConnectionError(f"Malformed {what} in TopStepX response: {e}") from e
+    return LazyMappedList(rows, _map)
+
+def map_ts_orders_to_generic(ts_orders: Sequence[Union[TSOrderModel, Dict[str, Any]]], provider_name: str) -> LazyMappedList[GenericOrder]:
+    """
+    Returns the orders as a lazy list. Rows with order types that have no generic
+    equivalent are dropped up front using the raw `type` field, so every remaining
+    row maps to an order when it is accessed. Public provider methods filter on the
+    raw rows and then `materialize()` the result, so their callers get a plain list.
+    """
+    rows = [o for o in ts_orders if o and ts_row_field(o, "type") in _MAPPABLE_TS_ORDER_TYPES]
+    return _lazy_rows(rows, lambda row: map_ts_order_row_to_generic(row, provider_name), "order")
 
 def map_ts_position_to_generic(ts_pos: TSPositionModel, provider_name: str) -> GenericPosition:
     if ts_pos.type == TSPositionType.LONG:
@@ -150,8 +188,11 @@ def map_ts_position_to_generic(ts_pos: TSPositionModel, provider_name: str) -> G
         provider_name=provider_name, provider_specific_data=ts_pos.model_dump()
     )
 
-def map_ts_positions_to_generic(ts_positions: List[TSPositionModel], provider_name: str) -> List[GenericPosition]:
-    return [map_ts_position_to_generic(p, provider_name) for p in ts_positions if p]
+def map_ts_positions_to_generic(ts_positions: Sequence[Union[TSPositionModel, Dict[str, Any]]], provider_name: str) -> LazyMappedList[GenericPosition]:
+    return _lazy_rows(
+        [p for p in ts_positions if p],
+        lambda row: map_ts_position_to_generic(_TS_POSITION_ADAPTER.validate_python(row), provider_name), "position"
+    )
 
 def map_ts_trade_to_generic(ts_trade: TSHalfTradeModel, provider_name: str) -> GenericTrade:
     return GenericTrade(
@@ -163,8 +204,11 @@ def map_ts_trade_to_generic(ts_trade: TSHalfTradeModel, provider_name: str) -> G
         provider_name=provider_name, provider_specific_data=ts_trade.model_dump()
     )
 
-def map_ts_trades_to_generic(ts_trades: List[TSHalfTradeModel], provider_name: str) -> List[GenericTrade]:
-    return [map_ts_trade_to_generic(t, provider_name) for t in ts_trades if t]
+def map_ts_trades_to_generic(ts_trades: Sequence[Union[TSHalfTradeModel, Dict[str, Any]]], provider_name: str) -> LazyMappedList[GenericTrade]:
+    return _lazy_rows(
+        [t for t in ts_trades if t],
+        lambda row: map_ts_trade_to_generic(_TS_TRADE_ADAPTER.validate_python(row), provider_name), "trade"
+    )
 
 # --- Stream Event Mappers ---
 def _parse_ts_stream_timestamp(ts_payload: Dict[str, Any]) -> Optional[datetime]:
@@ -192,12 +236,14 @@ def map_ts_quote_to_generic_event(provider_contract_id: str, ts_quote_data: Dict
 
 def map_ts_depth_to_generic_event(provider_contract_id: str, ts_depth_updates: List[Optional[Dict[str, Any]]], provider_name: str) -> Optional[DepthSnapshotEvent]:
     try:
-        bids, asks = [], []
+        bid_prices, bid_sizes = array('d'), array('d')
+        ask_prices, ask_sizes = array('d'), array('d')
         latest_timestamp = None
-        
-        valid_updates = [u for u in ts_depth_updates if isinstance(u, dict) and 'timestamp' in u]
-        if valid_updates:
-            latest_timestamp = max(ensure_utc(u['timestamp']) for u in valid_updates)
+
+        # Levels in one message usually share a timestamp, so only parse each distinct value once.
+        raw_timestamps = {u['timestamp'] for u in ts_depth_updates if isinstance(u, dict) and 'timestamp' in u}
+        if raw_timestamps:
+            latest_timestamp = max(ensure_utc(t) for t in raw_timestamps)
 
         if not latest_timestamp:
             logger.warning(f"Skipping depth event for {provider_contract_id} due to missing timestamps in all levels. Payload: {ts_depth_updates}")
@@ -207,26 +253,77 @@ def map_ts_depth_to_generic_event(provider_contract_id: str, ts_depth_updates: L
             if not isinstance(level_update, dict): continue
             price, size, type_code = level_update.get("price"), level_update.get("volume"), level_update.get("type")
             if price is None or size is None or type_code is None: continue
-            side = None
-            if type_code == 3: side = OrderSide.SELL
-            elif type_code == 4: side = OrderSide.BUY
-            if side:
-                level = DepthLevel(price=float(price), size=float(size), side=side)
-                (bids if side == OrderSide.BUY else asks).append(level)
-        
-        if not bids and not asks: return None
-        bids.sort(key=lambda x: x.price, reverse=True)
-        asks.sort(key=lambda x: x.price)
-        
+            if type_code == TSDomType.BEST_ASK:
+                ask_prices.append(float(price)); ask_sizes.append(float(size))
+            elif type_code == TSDomType.BEST_BID:
+                bid_prices.append(float(price)); bid_sizes.append(float(size))
+
+        if not bid_prices and not ask_prices: return None
+
         return DepthSnapshotEvent(
             provider_name=provider_name, provider_contract_id=provider_contract_id,
-            timestamp_utc=latest_timestamp, bids=bids, asks=asks, is_snapshot=False,
-            provider_specific_data={"raw_updates": ts_depth_updates}
+            timestamp_utc=latest_timestamp,
+            bids=DepthLevels(OrderSide.BUY, bid_prices, bid_sizes),
+            asks=DepthLevels(OrderSide.SELL, ask_prices, ask_sizes),
+            is_snapshot=False, provider_specific_data={"raw_updates": ts_depth_updates}
         )
     except Exception as e:
         logger.error(f"Error mapping TS depth stream: {e}", exc_info=True)
         return None
 
+_TS_DOM_BID_TYPES = frozenset({TSDomType.BID, TSDomType.BEST_BID, TSDomType.NEW_BEST_BID})
+_TS_DOM_ASK_TYPES = frozenset({TSDomType.ASK, TSDomType.BEST_ASK, TSDomType.NEW_BEST_ASK})
+
+def apply_ts_depth_to_order_book(book: OrderBook, ts_depth_updates: List[Optional[Dict[str, Any]]], provider_name: str) -> Optional[OrderBookUpdateEvent]:
+    """
+    Applies one GatewayDepth message to a maintained order book in place.
+
+    Bid/ask level updates set the level size (a size of zero removes the level) and a
+    RESET update clears the book. Returns a compact update event, or None if the book
+    did not change or the message carried no timestamp.
+    """
+    try:
+        levels_changed = 0
+        is_reset = False
+        raw_timestamps = set()
+
+        for level_update in ts_depth_updates:
+            if not isinstance(level_update, dict): continue
+            type_code = level_update.get("type")
+            if type_code == TSDomType.RESET:
+                book.clear()
+                is_reset = True
+            elif type_code in _TS_DOM_BID_TYPES or type_code in _TS_DOM_ASK_TYPES:
+                price, size = level_update.get("price"), level_update.get("volume")
+                if price is None or size is None: continue
+                side = OrderSide.BUY if type_code in _TS_DOM_BID_TYPES else OrderSide.SELL
+                levels_changed += book.apply_level(side, float(price), float(size))
+            else:
+                continue
+            if level_update.get("timestamp"):
+                raw_timestamps.add(level_update["timestamp"])
+
+        if not levels_changed and not is_reset:
+            return None
+
+        latest_timestamp = max(ensure_utc(t) for t in raw_timestamps) if raw_timestamps else None
+        sequence = book.commit(latest_timestamp)
+        if latest_timestamp is None:
+            logger.warning(f"Order book for {book.provider_contract_id} updated (seq {sequence}) but the depth message had no timestamps; no event emitted.")
+            return None
+
+        best_bid, best_ask = book.best_bid(), book.best_ask()
+        return OrderBookUpdateEvent(
+            provider_name=provider_name, provider_contract_id=book.provider_contract_id,
+            timestamp_utc=latest_timestamp, sequence=sequence,
+            best_bid_price=best_bid[0] if best_bid else None, best_bid_size=best_bid[1] if best_bid else None,
+            best_ask_price=best_ask[0] if best_ask else None, best_ask_size=best_ask[1] if best_ask else None,
+            levels_changed=levels_changed, is_reset=is_reset
+        )
+    except Exception as e:
+        logger.error(f"Error applying TS depth stream to order book: {e}", exc_info=True)
+        return None
+
 def map_ts_market_trade_to_generic_event(provider_contract_id: str, ts_trade_data: Dict[str, Any], provider_name: str) -> Optional[MarketTradeEvent]:
     try:
         event_timestamp = _parse_ts_stream_timestamp(ts_trade_data)
@@ -2,7 +2,9 @@
 import logging
 import os
 import asyncio
-from typing import List, Optional, Dict, Any, Union
+from contextlib import contextmanager
+from functools import partial
+from typing import List, Optional, Dict, Any, Union, Callable, Awaitable
 from datetime import datetime, timedelta
 from decimal import Decimal
 
@@ -19,12 +21,27 @@ from tradeforgepy.core.models_generic import (
     GenericModificationResponse, GenericCancellationResponse,
     Position as GenericPosition, Trade as GenericTrade, GenericStreamEvent, OrderStatus
 )
-from tradeforgepy.core.enums import AssetClass, StreamConnectionStatus, MarketDataType, UserDataType
+from tradeforgepy.core.enums import AssetClass, StreamConnectionStatus, MarketDataType, UserDataType, ConflationMode, OverflowPolicy
+from tradeforgepy.core.order_book import OrderBook
+from tradeforgepy.core.account_state import AccountStateStore, StateSeed, ORDERS, POSITIONS, ACCOUNTS
+from tradeforgepy.core.order_index import OrderIndex
+from tradeforgepy.core.contract_master import ContractMaster
 from tradeforgepy.exceptions import (
     ConfigurationError, AuthenticationError, ConnectionError as TradeForgeConnectionError,
-    OperationFailedError, NotFoundError, InvalidParameterError
+    OperationFailedError, NotFoundError, InvalidParameterError, TradeForgeError
 )
-from tradeforgepy.utils.time_utils import UTC_TZ
+from tradeforgepy.utils.time_utils import UTC_TZ, ensure_utc
+from tradeforgepy.utils.tick_utils import TickScale
+from tradeforgepy.utils.lazy_sequence import LazyMappedList
+from tradeforgepy.utils.cache import TTLCache, CachePolicy
+from tradeforgepy.streaming.conflation import EventConflator
+from tradeforgepy.streaming.capture import CaptureRecorder
+from tradeforgepy.streaming.replay import ReplaySource
+from tradeforgepy.streaming.latency import LatencyTracker
+from tradeforgepy.streaming.watchdog import StalenessWatchdog, FeedStaleness
+from tradeforgepy.streaming.dispatcher import EventDispatcher, EventSubscription, EventType, EventHandler
+from tradeforgepy.streaming.loop_thread import StreamLoopThread
+from tradeforgepy.storage.history_store import HistoryStore, ORDERS as HISTORY_ORDERS, TRADES as HISTORY_TRADES
 from tradeforgepy.config import ProviderSettings
 
 from .client import TopStepXHttpClient
@@ -36,6 +53,8 @@ from .schemas_ts import (
     TSPlaceOrderRequest
 )
 from .streams import TopStepXMarketStreamInternal, TopStepXUserStreamInternal
+from .sharding import ShardedMarketStream
+from .resync import UserStateResync
 
 logger = logging.getLogger(__name__)
 
@@ -43,10 +62,46 @@ logger = logging.getLogger(__name__)
 
 class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
     provider_name: str = "TopStepX"
+    # Order history windows searched, narrowest first, when an order id is not in the index.
+    _ORDER_LOOKUP_WINDOWS = (timedelta(hours=1), timedelta(days=1))
+    # Slack before a known placement time, for clock skew between us and the provider.
+    _ORDER_LOOKUP_MARGIN = timedelta(minutes=5)
+    # Incremental history syncs re-fetch this much before the last sync, for records published late.
+    _HISTORY_SYNC_OVERLAP = timedelta(minutes=5)
+    # Fixed reconnect offsets, so the user stream and each market shard retry at different moments.
+    _USER_STREAM_RECONNECT_STAGGER_SEC = 0.75
+    _SHARD_RECONNECT_STAGGER_SEC = 0.25
+    # Read cache kinds.
+    _CACHE_ACCOUNTS = "accounts"
+    _CACHE_CONTRACT = "contract"
+    _CACHE_BARS = "bars"
 
     def __init__(self, settings: ProviderSettings,
                  connect_timeout: float = 10.0, read_timeout: float = 30.0,
-                 cache_ttl_seconds: int = 300):
+                 cache_ttl_seconds: int = 300,
+                 cache_max_entries: int = 10000,
+                 cache_max_records: Optional[int] = 1_000_000,
+                 cache_stale_seconds: float = 0.0,
+                 cache_negative_ttl_seconds: Optional[float] = None,
+                 market_queue_size: int = 10000,
+                 market_overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 market_shards: int = 1,
+                 capture_dir: Optional[str] = None,
+                 capture_max_bytes: int = 256 * 1024 * 1024,
+                 capture_rotate_seconds: Optional[float] = 3600.0,
+                 replay_source: Optional[ReplaySource] = None,
+                 track_latency: bool = False,
+                 resync_user_data: bool = False,
+                 watch_feed_staleness: bool = False,
+                 resubscribe_stale_feeds: bool = False,
+                 stream_thread: bool = False,
+                 track_account_state: bool = False,
+                 account_state_max_age: Optional[float] = 300.0,
+                 history_db_path: Optional[str] = None,
+                 use_contract_master: bool = False,
+                 contract_master_path: Optional[str] = None,
+                 contract_refresh_seconds: Optional[float] = 3600.0,
+                 max_concurrent_order_requests: int = 16):
         
         self.settings = settings
         self.environment = self.settings.ENVIRONMENT
@@ -64,23 +119,117 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
         )
         self._is_connected_http = False
         
-        self.market_stream_handler: Optional[TopStepXMarketStreamInternal] = None
+        self.market_stream_handler: Optional[Union[TopStepXMarketStreamInternal, ShardedMarketStream]] = None
         self.user_stream_handler: Optional[TopStepXUserStreamInternal] = None
         
         self._user_event_callback: Optional[GenericStreamEventCallback] = None
         self._user_status_callback: Optional[StreamStatusCallback] = None
         self._user_error_callback: Optional[StreamErrorCallback] = None
+        self._user_feed_stale_callback: Optional[Callable[[FeedStaleness], Awaitable[None]]] = None
+        # Topic-routed listeners registered through add_event_listener(), in addition to on_event.
+        self.event_dispatcher = EventDispatcher(on_subscriber_error=self._internal_listener_error_handler)
         
         self._run_forever_task: Optional[asyncio.Task] = None
+        # Bounded queue between the market hub reader and event callbacks. User events always use
+        # OverflowPolicy.BLOCK, since order and position updates must never be dropped.
+        self._market_queue_size = market_queue_size
+        self._market_overflow_policy = OverflowPolicy(market_overflow_policy)
+        # With more than one shard, contracts are spread over several market hub connections.
+        if market_shards < 1:
+            raise ConfigurationError("market_shards must be at least 1.")
+        self._market_shards = market_shards
+        # With stream_thread, hub connections, decoding and mapping run on a dedicated thread and
+        # loop; events, status changes and errors are handed back to this loop for the callbacks.
+        self._stream_thread: Optional[StreamLoopThread] = (
+            StreamLoopThread(name="TopStepXStreams", handoff_maxsize=market_queue_size) if stream_thread else None
+        )
+        # Raw hub traffic capture for both streams, written off the event loop.
+        self.capture_recorder: Optional[CaptureRecorder] = None
+        if capture_dir:
+            self.capture_recorder = CaptureRecorder(
+                capture_dir, prefix=f"topstepx_{self.environment.lower()}",
+                max_bytes=capture_max_bytes, max_seconds=capture_rotate_seconds
+            )
+        # When set, both streams are fed from recorded captures instead of the live hubs.
+        self._replay_source = replay_source
+        # Rolling receive/mapping/queue/callback latency histograms shared by all streams.
+        self.latency_tracker: Optional[LatencyTracker] = LatencyTracker() if track_latency else None
+        # Open orders, positions and accounts kept current from the user stream. It is the one
+        # record of user state: the getters read it (with track_account_state) instead of REST
+        # while the stream is live, seeded on first use from one REST snapshot, and the resync
+        # compares against it after a reconnect.
+        user_state = (
+            AccountStateStore(max_age=account_state_max_age)
+            if (track_account_state or resync_user_data) and replay_source is None else None
+        )
+        self._user_state: Optional[AccountStateStore] = user_state
+        self.account_state: Optional[AccountStateStore] = user_state if track_account_state else None
+        # After a user stream reconnect, emits synthetic events for order/position/fill changes
+        # missed during the gap. A replay has no gaps to fill, so it never resyncs.
+        self.user_state_resync: Optional[UserStateResync] = (
+            UserStateResync(self, self.provider_name, user_state,
+                            fetch_open_orders=self._fetch_open_orders, fetch_positions=self._fetch_positions)
+            if resync_user_data and user_state is not None else None
+        )
+        # Flags subscribed (contract, feed) pairs that fall silent while the market connection stays up.
+        # Replays run at their own pace, so their gaps say nothing about the feed.
+        self.feed_watchdog: Optional[StalenessWatchdog] = (
+            StalenessWatchdog(self._on_main_loop(self._internal_feed_stale_handler), name="MarketFeedWatchdog")
+            if watch_feed_staleness and replay_source is None else None
+        )
+        self._resubscribe_stale_feeds = resubscribe_stale_feeds
+        # Shared by all batch order calls, so concurrent batches together stay within this many requests in flight.
+        if max_concurrent_order_requests < 1:
+            raise ConfigurationError("max_concurrent_order_requests must be at least 1.")
+        self.max_concurrent_order_requests = max_concurrent_order_requests
+        # Created on first use, inside the running event loop.
+        self._order_request_slots: Optional[asyncio.Semaphore] = None
+        # Orders by id and client order id, fed by placements, user stream updates and order lists.
+        self.order_index = OrderIndex()
+        # Local SQLite copy of order and trade history; history queries then only fetch
+        # what has not been synced yet and are answered from the database.
+        self.history_store: Optional[HistoryStore] = HistoryStore(history_db_path) if history_db_path else None
+        self._history_sync_locks: Dict[Any, asyncio.Lock] = {}
+        # Every available contract, loaded once (or warm-started from contract_master_path) and
+        # refreshed in the background, so symbol and id lookups are answered locally.
+        self.contract_master: Optional[ContractMaster] = (
+            ContractMaster(self._load_contract_universe, path=contract_master_path,
+                           refresh_interval=contract_refresh_seconds, name="TopStepXContracts")
+            if use_contract_master else None
+        )
 
-        # Caching mechanism
-        self.cache_ttl = timedelta(seconds=cache_ttl_seconds)
-        self._accounts_cache: Dict[str, Any] = {}
-        self._contract_details_cache: Dict[str, Any] = {}
+        # Read-through cache for REST lookups. With cache_stale_seconds, expired accounts and
+        # contracts are served that much longer while they reload in the background; with
+        # cache_negative_ttl_seconds, unknown contract ids are remembered that long.
+        # Bars are only cached for ranges that have already closed.
+        self.read_cache = TTLCache(
+            policies={
+                self._CACHE_ACCOUNTS: CachePolicy(ttl=cache_ttl_seconds, stale_ttl=cache_stale_seconds),
+                self._CACHE_CONTRACT: CachePolicy(ttl=cache_ttl_seconds, stale_ttl=cache_stale_seconds,
+                                                  negative_ttl=cache_negative_ttl_seconds),
+                self._CACHE_BARS: CachePolicy(ttl=24 * 3600.0),
+            },
+            default_policy=CachePolicy(ttl=cache_ttl_seconds),
+            max_entries=cache_max_entries, max_weight=cache_max_records,
+            weigher=self._cached_record_count, name="TopStepXReadCache"
+        )
+        # Integer-tick scales for every contract seen, used for exact price conversion.
+        self._tick_scales: Dict[str, TickScale] = {}
+        # Owned by the provider so conflation can be configured before the market stream exists.
+        self._market_conflator = EventConflator(
+            self._on_main_loop(self._internal_event_handler),
+            on_error=self._on_main_loop(lambda e: self._internal_error_handler("MarketStream", e)),
+            name="MarketStream_Conflator"
+        )
 
         logger.info(f"TopStepXProvider initialized for environment: {self.environment}")
 
     async def connect(self) -> None:
+        if self._replay_source is not None:
+            # Offline replay: the streams are fed from the capture, so no authentication is needed.
+            await self._init_stream_handlers_if_needed()
+            logger.info("Stream handlers initialized for replay.")
+            return
         if not self._is_connected_http:
             try:
                 await self.http_client._authenticate()
@@ -103,72 +252,139 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             except asyncio.CancelledError:
                 logger.info("Provider's main run_forever task was cancelled.")
         
-        disconnect_tasks = []
-        if self.market_stream_handler:
-            disconnect_tasks.append(self.market_stream_handler.disconnect())
-        if self.user_stream_handler:
-            disconnect_tasks.append(self.user_stream_handler.disconnect())
-        
-        if disconnect_tasks:
-            results = await asyncio.gather(*disconnect_tasks, return_exceptions=True)
-            for i, result in enumerate(results):
+        handlers = [h for h in (self.market_stream_handler, self.user_stream_handler) if h]
+        if handlers:
+            results = await asyncio.gather(*(self._in_stream_loop(h.disconnect()) for h in handlers), return_exceptions=True)
+            for handler, result in zip(handlers, results):
                 if isinstance(result, Exception):
-                    stream_name = disconnect_tasks[i].__self__.stream_name
-                    logger.warning(f"Error while disconnecting stream '{stream_name}': {result}")
+                    logger.warning(f"Error while disconnecting stream '{handler.stream_name}': {result}")
+
+        if self.feed_watchdog:
+            await self._in_stream_loop(self.feed_watchdog.close())
+        if self.contract_master:
+            await self.contract_master.stop()
+        await self.read_cache.close()
+        if self.account_state is not None:
+            self.account_state.invalidate()
+        if self._stream_thread:
+            await self._stream_thread.stop()
+        if self.capture_recorder:
+            await asyncio.to_thread(self.capture_recorder.close)
+        if self.history_store:
+            await asyncio.to_thread(self.history_store.close)
 
         await self.http_client.close_http_client()
         self._is_connected_http = False
         logger.info("TopStepXProvider disconnected.")
 
+    @staticmethod
+    def _cached_record_count(value: Any) -> int:
+        if isinstance(value, GenericHistoricalBarsResponse):
+            return max(len(value.bars), 1)
+        return max(len(value), 1) if isinstance(value, list) else 1
+
     async def get_accounts(self) -> List[GenericAccount]:
-        cache_key = "all_accounts"
-        cached_item = self._accounts_cache.get(cache_key)
-        
-        if cached_item and (datetime.now(UTC_TZ) < cached_item['timestamp'] + self.cache_ttl):
-            logger.debug("Returning accounts from cache.")
-            return cached_item['data']
+        if self._account_state_fresh(ACCOUNTS, UserDataType.ACCOUNT_UPDATE):
+            return self.account_state.accounts()
+        # While the account feed is live the store needs a real snapshot, not a cached one.
+        if self.account_state is not None and self._user_feed_live(UserDataType.ACCOUNT_UPDATE):
+            accounts = await self._fetch_accounts(seed_state=True)
+            self.read_cache.put(self._CACHE_ACCOUNTS, None, accounts)
+            return accounts
+        return await self.read_cache.get_or_load(self._CACHE_ACCOUNTS, None, self._fetch_accounts)
 
+    async def _fetch_accounts(self, seed_state: bool = False) -> List[GenericAccount]:
         if not self._is_connected_http: await self.connect()
-        ts_response = await self.http_client.ts_get_accounts(only_active=True)
-        
-        accounts = mapper.map_ts_accounts_to_generic(ts_response.accounts, self.provider_name)
-        
-        self._accounts_cache[cache_key] = {'data': accounts, 'timestamp': datetime.now(UTC_TZ)}
-        logger.debug("Fetched and cached accounts.")
-        
+        with self._account_state_seed(ACCOUNTS, UserDataType.ACCOUNT_UPDATE, enabled=seed_state) as seed:
+            ts_response = await self.http_client.ts_get_accounts(only_active=True)
+            accounts = mapper.map_ts_accounts_to_generic(ts_response.accounts, self.provider_name)
+            if seed: self.account_state.complete_seed(seed, accounts)
+        logger.debug("Fetched accounts.")
         return accounts
 
+    async def _load_contract_universe(self) -> List[GenericContract]:
+        if not self._is_connected_http: await self.connect()
+        ts_response = await self.http_client.ts_get_available_contracts(live=False)
+        contracts = mapper.map_ts_contracts_to_generic(ts_response.contracts, self.provider_name)
+        for contract in contracts:
+            self._remember_tick_scale(contract)
+        return contracts
+
+    async def _contract_master_ready(self) -> bool:
+        """Loads the contract master on first use; False if it is disabled or could not be loaded."""
+        if self.contract_master is None:
+            return False
+        try:
+            await self.contract_master.ensure_loaded()
+        except TradeForgeError as e:
+            logger.warning(f"Contract master unavailable, falling back to contract searches: {e}")
+            return False
+        return True
+
     async def search_contracts(self, search_text: str, asset_class: Optional[AssetClass] = None) -> List[GenericContract]:
+        """
+        Searches contracts by symbol, name or description. A symbol or underlying prefix is
+        answered from the contract master when it is enabled; any other text goes to the
+        provider's own search, merged with the contract master's text matches.
+        """
+        local_matches: List[GenericContract] = []
+        if await self._contract_master_ready():
+            contracts = self.contract_master.search(search_text, asset_class=asset_class)
+            if contracts:
+                return contracts
+            local_matches = self.contract_master.match_text(search_text, asset_class=asset_class)
+        contracts = [
+            c for c in await self._search_contracts_remote(search_text)
+            if asset_class is None or c.asset_class == asset_class
+        ]
+        remote_ids = {c.provider_contract_id for c in contracts}
+        return contracts + [c for c in local_matches if c.provider_contract_id not in remote_ids]
+
+    async def _search_contracts_remote(self, search_text: str) -> List[GenericContract]:
         if not self._is_connected_http: await self.connect()
         ts_response = await self.http_client.ts_search_contracts(search_text=search_text, live=False)
-        return mapper.map_ts_contracts_to_generic(ts_response.contracts, self.provider_name)
+        contracts = mapper.map_ts_contracts_to_generic(ts_response.contracts, self.provider_name)
+        for contract in contracts:
+            self._remember_tick_scale(contract)
+            if self.contract_master is not None:
+                self.contract_master.put(contract)
+        return contracts
 
     async def get_contract_details(self, provider_contract_id: str) -> Optional[GenericContract]:
-        cached_item = self._contract_details_cache.get(provider_contract_id)
-        
-        if cached_item and (datetime.now(UTC_TZ) < cached_item['timestamp'] + self.cache_ttl):
-            logger.debug(f"Returning contract details for '{provider_contract_id}' from cache.")
-            return cached_item['data']
+        if await self._contract_master_ready():
+            contract = self.contract_master.get(provider_contract_id)
+            if contract is not None:
+                return contract
 
+        return await self.read_cache.get_or_load(
+            self._CACHE_CONTRACT, provider_contract_id, partial(self._fetch_contract_details, provider_contract_id)
+        )
+
+    async def _fetch_contract_details(self, provider_contract_id: str) -> GenericContract:
         if not self._is_connected_http: await self.connect()
         ts_response = await self.http_client.ts_get_contract_by_id(contract_id=provider_contract_id)
         
         if ts_response.contract:
             contract = mapper.map_ts_contract_to_generic(ts_response.contract, self.provider_name)
-            self._contract_details_cache[provider_contract_id] = {'data': contract, 'timestamp': datetime.now(UTC_TZ)}
-            logger.debug(f"Fetched and cached contract details for '{provider_contract_id}'.")
+            self._remember_tick_scale(contract)
+            if self.contract_master is not None:
+                self.contract_master.put(contract)
+            logger.debug(f"Fetched contract details for '{provider_contract_id}'.")
             return contract
             
         raise NotFoundError(f"Contract with provider_id '{provider_contract_id}' not found on TopStepX.")
 
     async def get_contract_by_symbol(self, symbol: str) -> Optional[GenericContract]:
-        if not self._is_connected_http: await self.connect()
-        
-        search_results = await self.search_contracts(search_text=symbol)
-        
-        exact_matches = [
-            c for c in search_results if c.symbol.upper() == symbol.upper()
-        ]
+        if await self._contract_master_ready():
+            exact_matches = self.contract_master.by_symbol(symbol)
+        else:
+            exact_matches = []
+        if not exact_matches:
+            # Not in the universe (or no universe): the symbol may have been listed since the last refresh.
+            search_results = await self._search_contracts_remote(symbol)
+            exact_matches = [
+                c for c in search_results if c.symbol.upper() == symbol.upper()
+            ]
         
         if len(exact_matches) == 1:
             # Found one unique match, get its full details (which will use the cache)
@@ -180,7 +396,71 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             logger.info(f"Could not find an exact match for symbol '{symbol}'.")
             return None
 
+    def _remember_tick_scale(self, contract: GenericContract) -> None:
+        scale = contract.tick_scale()
+        if scale:
+            self._tick_scales[contract.provider_contract_id] = scale
+
+    async def get_tick_scale(self, provider_contract_id: str) -> TickScale:
+        """
+        Returns the integer-tick scale for a contract, derived from its cached `tick_size`.
+        Only fetches contract details if the contract has not been seen before.
+        """
+        scale = self._tick_scales.get(provider_contract_id)
+        if scale is None:
+            contract = await self.get_contract_details(provider_contract_id)
+            scale = contract.tick_scale() if contract else None
+            if scale is None:
+                raise InvalidParameterError(f"Contract '{provider_contract_id}' has no tick size; cannot convert its prices.")
+            self._tick_scales[provider_contract_id] = scale
+        return scale
+
+    async def warm_tick_scales(self, provider_contract_ids: List[str]) -> None:
+        """
+        Resolves the tick scales of contracts about to be traded, so their float prices are
+        validated locally from the first order. Contracts without a tick size are skipped.
+        """
+        async def _warm(contract_id: str) -> None:
+            try:
+                await self.get_tick_scale(contract_id)
+            except TradeForgeError as e:
+                logger.warning(f"Could not resolve the tick scale of {contract_id}: {e}")
+        await asyncio.gather(*(_warm(c) for c in provider_contract_ids if c not in self._tick_scales))
+
+    async def _to_ts_price(self, provider_contract_id: Optional[str], price: Optional[float], ticks: Optional[int]) -> Optional[Decimal]:
+        """
+        Converts a generic price to the exact Decimal sent to TopStepX.
+
+        Integer ticks are converted through the contract's tick scale, resolving it if needed.
+        Float prices are validated against the scale when it is already known (off-tick prices
+        raise InvalidParameterError) and sent as the exact tick multiple. Order placement never
+        waits for a contract lookup: while the scale is unknown, or without a contract id, a
+        float price is sent as its shortest decimal representation and the server validates it.
+        `warm_tick_scales()` resolves scales up front.
+        """
+        if ticks is not None:
+            if not provider_contract_id:
+                raise InvalidParameterError("provider_contract_id is required to convert tick prices.")
+            return (await self.get_tick_scale(provider_contract_id)).to_decimal(ticks)
+        if price is None:
+            return None
+        scale = self._tick_scales.get(provider_contract_id) if provider_contract_id else None
+        if scale is None:
+            return Decimal(str(price))
+        try:
+            return scale.to_decimal(scale.to_ticks(price))
+        except ValueError as e:
+            raise InvalidParameterError(f"Invalid price for contract '{provider_contract_id}': {e}") from e
+
     async def get_historical_bars(self, request: GenericHistoricalBarsRequest) -> GenericHistoricalBarsResponse:
+        if ensure_utc(request.end_time_utc) < datetime.now(UTC_TZ):
+            # A closed range always returns the same bars.
+            return await self.read_cache.get_or_load(
+                self._CACHE_BARS, request.model_dump_json(), partial(self._fetch_historical_bars, request)
+            )
+        return await self._fetch_historical_bars(request)
+
+    async def _fetch_historical_bars(self, request: GenericHistoricalBarsRequest) -> GenericHistoricalBarsResponse:
         if not self._is_connected_http: await self.connect()
         ts_unit = mapper.map_generic_bar_unit_to_ts(request.timeframe_unit)
         start_str = request.start_time_utc.isoformat()
@@ -215,11 +495,16 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
                 type=mapper.map_generic_order_type_to_ts(order_request.order_type),
                 side=mapper.map_generic_order_side_to_ts(order_request.order_side),
                 size=int(order_request.size),
-                limitPrice=Decimal(str(order_request.limit_price)) if order_request.limit_price is not None else None,
-                stopPrice=Decimal(str(order_request.stop_price)) if order_request.stop_price is not None else None,
+                limitPrice=await self._to_ts_price(order_request.provider_contract_id, order_request.limit_price, order_request.limit_price_ticks),
+                stopPrice=await self._to_ts_price(order_request.provider_contract_id, order_request.stop_price, order_request.stop_price_ticks),
                 customTag=order_request.client_order_id
             )
+            placed_at = datetime.now(UTC_TZ)
             ts_response = await self.http_client.ts_place_order(ts_order_req_model)
+            if ts_response.success and ts_response.orderId is not None:
+                self.order_index.record_placement(
+                    str(order_request.provider_account_id), str(ts_response.orderId), order_request.client_order_id, placed_at
+                )
             initial_status = OrderStatus.PENDING_SUBMIT if ts_response.success else OrderStatus.REJECTED
             return GenericOrderPlacementResponse(
                 order_id_acknowledged=ts_response.success and ts_response.orderId is not None,
@@ -229,7 +514,7 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
                 provider_name=self.provider_name,
                 provider_specific_data=ts_response.model_dump(exclude_none=True)
             )
-        except (OperationFailedError, InvalidParameterError, TradeForgeConnectionError) as e:
+        except (OperationFailedError, InvalidParameterError, NotFoundError, TradeForgeConnectionError) as e:
             logger.error(f"Error placing TopStepX order: {e}")
             return GenericOrderPlacementResponse(order_id_acknowledged=False, message=str(e), provider_name=self.provider_name)
 
@@ -239,6 +524,7 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
         ts_response = await self.http_client.ts_cancel_order(account_id=acc_id, order_id=ord_id)
         return GenericCancellationResponse(
             success=ts_response.success,
+            provider_order_id=str(provider_order_id),
             message=ts_response.errorMessage if not ts_response.success else "Cancellation request submitted.",
             provider_name=self.provider_name,
             provider_specific_data=ts_response.model_dump(exclude_none=True)
@@ -250,8 +536,8 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             accountId=int(modify_request.provider_account_id),
             orderId=int(modify_request.provider_order_id),
             size=int(modify_request.new_size) if modify_request.new_size is not None else None,
-            limitPrice=Decimal(str(modify_request.new_limit_price)) if modify_request.new_limit_price is not None else None,
-            stopPrice=Decimal(str(modify_request.new_stop_price)) if modify_request.new_stop_price is not None else None,
+            limitPrice=await self._to_ts_price(modify_request.provider_contract_id, modify_request.new_limit_price, modify_request.new_limit_price_ticks),
+            stopPrice=await self._to_ts_price(modify_request.provider_contract_id, modify_request.new_stop_price, modify_request.new_stop_price_ticks),
             trailPrice=None
         )
         ts_response = await self.http_client.ts_modify_order(ts_modify_req)
@@ -263,56 +549,165 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             provider_specific_data=ts_response.model_dump(exclude_none=True)
         )
 
+    async def _run_order_batch(self, calls: List[Callable[[], Awaitable[Any]]], on_error: Callable[[int, Exception], Any]) -> List[Any]:
+        """
+        Runs order calls concurrently, at most `max_concurrent_order_requests` at a time, and
+        returns their results in call order. Call `i` failing with `e` yields `on_error(i, e)`,
+        whatever the exception, so one failure never discards the other results.
+        """
+        if not calls:
+            return []
+        if not self._is_connected_http: await self.connect()
+        if self._order_request_slots is None:
+            self._order_request_slots = asyncio.Semaphore(self.max_concurrent_order_requests)
+        slots = self._order_request_slots
+
+        async def _run(i: int, call: Callable[[], Awaitable[Any]]) -> Any:
+            async with slots:
+                try:
+                    return await call()
+                except TradeForgeError as e:
+                    return on_error(i, e)
+                except Exception as e:
+                    logger.error(f"Unexpected error in order batch item {i}: {e}", exc_info=True)
+                    return on_error(i, e)
+
+        return list(await asyncio.gather(*(_run(i, call) for i, call in enumerate(calls))))
+
+    async def place_orders(self, order_requests: List[GenericPlaceOrderRequest]) -> List[GenericOrderPlacementResponse]:
+        """Places several orders concurrently; one response per request, in request order."""
+        return await self._run_order_batch(
+            [partial(self.place_order, request) for request in order_requests],
+            lambda i, e: GenericOrderPlacementResponse(order_id_acknowledged=False, message=str(e), provider_name=self.provider_name)
+        )
+
+    async def cancel_orders(self, provider_account_id: Union[str, int], provider_order_ids: List[Union[str, int]]) -> List[GenericCancellationResponse]:
+        """Cancels several orders of one account concurrently; one response per order id, in the given order."""
+        return await self._run_order_batch(
+            [partial(self.cancel_order, provider_account_id, order_id) for order_id in provider_order_ids],
+            lambda i, e: GenericCancellationResponse(
+                success=False, provider_order_id=str(provider_order_ids[i]), message=str(e), provider_name=self.provider_name
+            )
+        )
+
+    async def modify_orders(self, modify_requests: List[GenericModifyOrderRequest]) -> List[GenericModificationResponse]:
+        """Modifies several orders concurrently; one response per request, in request order."""
+        return await self._run_order_batch(
+            [partial(self.modify_order, request) for request in modify_requests],
+            lambda i, e: GenericModificationResponse(
+                success=False, provider_order_id=modify_requests[i].provider_order_id, message=str(e), provider_name=self.provider_name
+            )
+        )
+
+    async def cancel_all(self, provider_account_id: Union[str, int], provider_contract_id: Optional[str] = None) -> List[GenericCancellationResponse]:
+        """
+        Cancels every open order of an account, or only those for one contract, concurrently.
+        The open orders come from the account state store while the order feed is live, so
+        this usually costs a single wave of cancel requests.
+        """
+        open_orders = await self._open_orders(str(provider_account_id), provider_contract_id, seed_state=False)
+        order_ids = [order.provider_order_id for order in open_orders]
+        if not order_ids:
+            return []
+        logger.info(f"Cancelling {len(order_ids)} open order(s) on account {provider_account_id}"
+                    f"{f' for {provider_contract_id}' if provider_contract_id else ''}.")
+        return await self.cancel_orders(provider_account_id, order_ids)
+
     async def get_order_by_id(self, provider_account_id: Union[str, int], provider_order_id: Union[str, int], days_to_search: Optional[int] = None) -> Optional[GenericOrder]:
         """
-        WARNING: This method is inefficient and may be slow.
+        Looks an order up by its ID.
+
+        The TopStepX API has no endpoint for a single order, so orders are kept in
+        `order_index`, fed by placements, user stream updates and every order list
+        fetched over REST. An indexed order is returned without any request when it
+        is in a final state or the user stream is delivering updates for its account.
 
-        The TopStepX API does not provide a direct endpoint to look up a single
-        order by its ID. This method simulates this functionality by fetching
-        order history over a specified time window and filtering the results
-        in-memory.
+        Next, a final order in the history store (if there is one) is returned as
+        stored. Otherwise order history is searched, narrowest window first: from
+        shortly before the order's placement or creation when that is known, else
+        the last hour, then the last day, then `days_to_search` days.
 
         Args:
             provider_account_id: The provider-specific ID of the account.
             provider_order_id: The provider-specific ID of the order to find.
-            days_to_search: The number of past days to search for the order.
-                            If None, defaults to 7 days. Use a larger number for
-                            older orders, but be aware of the performance impact.
+            days_to_search: The widest number of past days to search for the order.
+                            If None, defaults to 7 days.
 
         Returns:
             The generic Order object if found, otherwise None.
         """
+        account_id, order_id = str(provider_account_id), str(provider_order_id)
+        order = self.order_index.get(account_id, order_id)
+        if order is not None and (OrderIndex.is_final(order) or self._user_feed_live(UserDataType.ORDER_UPDATE, account_id)):
+            return order
+
+        placed_at = self.order_index.placed_at(account_id, order_id)
+        if self.history_store is not None:
+            stored = await asyncio.to_thread(self.history_store.get_order, self.provider_name, account_id, order_id)
+            if stored is not None:
+                self.order_index.put(stored)
+                order = self.order_index.get(account_id, order_id)
+                if OrderIndex.is_final(order):
+                    return order
+                # Stored while still open; its creation time bounds the refresh below.
+                placed_at = placed_at or stored.created_at_utc
+
         if not self._is_connected_http: await self.connect()
-        
-        acc_id, ord_id = int(provider_account_id), int(provider_order_id)
-        
-        # Determine the search window, defaulting to 7 days.
-        search_days = days_to_search if days_to_search is not None else 7
-        
         end_time = datetime.now(UTC_TZ)
-        start_time = end_time - timedelta(days=search_days)
-        
-        search_req = TSSearchOrderRequest(
-            accountId=acc_id, 
-            startTimestamp=start_time.isoformat(), 
-            endTimestamp=end_time.isoformat()
-        )
-        
-        ts_response = await self.http_client.ts_search_orders(search_req)
-        
-        for ts_order in ts_response.orders:
-            if ts_order.id == ord_id:
-                return mapper.map_ts_order_details_to_generic(ts_order, self.provider_name)
-                
+        widest = timedelta(days=days_to_search if days_to_search is not None else 7)
+        if placed_at is not None:
+            windows = [min(end_time - placed_at + self._ORDER_LOOKUP_MARGIN, widest)]
+        else:
+            windows = [w for w in self._ORDER_LOOKUP_WINDOWS if w < widest] + [widest]
+
+        for window in windows:
+            # get_order_history() indexes everything it fetches.
+            await self.get_order_history(account_id, end_time - window, end_time)
+            order = self.order_index.get(account_id, order_id)
+            if order is not None:
+                return order
         return None
 
+    async def get_order_by_client_order_id(self, provider_account_id: Union[str, int], client_order_id: str,
+                                           days_to_search: Optional[int] = None) -> Optional[GenericOrder]:
+        """
+        Looks an order up by the `client_order_id` it was placed with through this provider.
+        Returns None if no order was placed with that client ID since the provider was created.
+        """
+        account_id = str(provider_account_id)
+        order_id = self.order_index.resolve_client_order_id(account_id, client_order_id)
+        if order_id is None:
+            return None
+        return await self.get_order_by_id(account_id, order_id, days_to_search)
+
+    def _index_orders(self, orders: LazyMappedList[GenericOrder]) -> None:
+        """Adds a REST order list to the order index without mapping its rows."""
+        for i in range(len(orders)):
+            row = orders.raw_row(i)
+            self.order_index.put_lazy(
+                str(mapper.ts_row_field(row, "accountId")), str(mapper.ts_row_field(row, "id")), partial(orders.__getitem__, i)
+            )
+
     async def get_open_orders(self, provider_account_id: Union[str, int], provider_contract_id: Optional[str] = None) -> List[GenericOrder]:
-        if not self._is_connected_http: await self.connect()
-        search_req = TSSearchOpenOrderRequest(accountId=int(provider_account_id))
-        ts_response = await self.http_client.ts_search_open_orders(search_req)
-        generic_orders = mapper.map_ts_orders_to_generic(ts_response.orders, self.provider_name)
+        return await self._open_orders(str(provider_account_id), provider_contract_id, seed_state=True)
+
+    async def _open_orders(self, account_id: str, provider_contract_id: Optional[str], seed_state: bool) -> List[GenericOrder]:
+        if self._account_state_fresh(ORDERS, UserDataType.ORDER_UPDATE, account_id):
+            return self.account_state.open_orders(account_id, provider_contract_id)
+        generic_orders = await self._fetch_open_orders(account_id, seed_state=seed_state)
         if provider_contract_id:
-            return [o for o in generic_orders if o.provider_contract_id == provider_contract_id]
+            generic_orders = generic_orders.filter_raw(lambda row: mapper.ts_row_field(row, "contractId") == provider_contract_id)
+        return generic_orders.materialize()
+
+    async def _fetch_open_orders(self, account_id: str, seed_state: bool = False) -> LazyMappedList[GenericOrder]:
+        """Open orders over REST. Only with `seed_state` does the snapshot reseed the account state store."""
+        if not self._is_connected_http: await self.connect()
+        with self._account_state_seed(ORDERS, UserDataType.ORDER_UPDATE, account_id, enabled=seed_state) as seed:
+            search_req = TSSearchOpenOrderRequest(accountId=int(account_id))
+            ts_response = await self.http_client.ts_search_open_orders(search_req)
+            generic_orders = mapper.map_ts_orders_to_generic(ts_response.orders, self.provider_name)
+            self._index_orders(generic_orders)
+            if seed: self.account_state.complete_seed(seed, generic_orders)
         return generic_orders
 
     async def get_order_history(self,
@@ -322,21 +717,110 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
                                 provider_contract_id: Optional[str] = None
                                ) -> List[GenericOrder]:
         if not self._is_connected_http: await self.connect()
+        if self.history_store is not None:
+            account_id = str(provider_account_id)
+            start_time_utc, end_time_utc = ensure_utc(start_time_utc), ensure_utc(end_time_utc)
+            await self._sync_history(HISTORY_ORDERS, account_id, start_time_utc, end_time_utc)
+            generic_orders = (await asyncio.to_thread(
+                self.history_store.query_orders, self.provider_name, account_id, start_time_utc, end_time_utc, provider_contract_id
+            )).materialize()
+            for order in generic_orders:
+                self.order_index.put(order)
+            return generic_orders
+        generic_orders = await self._fetch_order_history(provider_account_id, start_time_utc, end_time_utc)
+        self._index_orders(generic_orders)
+        if provider_contract_id:
+            generic_orders = generic_orders.filter_raw(lambda row: mapper.ts_row_field(row, "contractId") == provider_contract_id)
+        return generic_orders.materialize()
+
+    async def _fetch_order_history(self, provider_account_id: Union[str, int], start_time_utc: datetime, end_time_utc: datetime) -> LazyMappedList[GenericOrder]:
         search_req = TSSearchOrderRequest(
             accountId=int(provider_account_id), 
             startTimestamp=start_time_utc.isoformat(), 
             endTimestamp=end_time_utc.isoformat()
         )
         ts_response = await self.http_client.ts_search_orders(search_req)
-        generic_orders = mapper.map_ts_orders_to_generic(ts_response.orders, self.provider_name)
-        if provider_contract_id:
-            return [o for o in generic_orders if o.provider_contract_id == provider_contract_id]
-        return generic_orders
+        return mapper.map_ts_orders_to_generic(ts_response.orders, self.provider_name)
+
+    async def _fetch_trade_history(self, provider_account_id: Union[str, int], start_time_utc: datetime, end_time_utc: datetime) -> LazyMappedList[GenericTrade]:
+        search_req = TSSearchTradeRequest(
+            accountId=int(provider_account_id), 
+            startTimestamp=start_time_utc.isoformat(), 
+            endTimestamp=end_time_utc.isoformat()
+        )
+        ts_response = await self.http_client.ts_search_trades(search_req)
+        return mapper.map_ts_trades_to_generic(ts_response.trades, self.provider_name)
+
+    async def _sync_history(self, kind: str, account_id: str, start_time_utc: datetime, end_time_utc: datetime) -> None:
+        """
+        Fetches only the parts of [start, end] the history store has not synced yet, plus a
+        refresh of stored orders that were still open, and saves them. Ranges in the future
+        are not marked as synced. One sync per (account, kind) runs at a time.
+        """
+        store = self.history_store
+        end_time_utc = min(end_time_utc, datetime.now(UTC_TZ))
+        if start_time_utc >= end_time_utc:
+            return
+        lock = self._history_sync_locks.setdefault((kind, account_id), asyncio.Lock())
+        async with lock:
+            refresh_from = None
+            if kind == HISTORY_ORDERS:
+                refresh_from = await asyncio.to_thread(store.oldest_open_order, self.provider_name, account_id, start_time_utc, end_time_utc)
+            ranges = await asyncio.to_thread(
+                store.missing_ranges, self.provider_name, account_id, kind, start_time_utc, end_time_utc,
+                self._HISTORY_SYNC_OVERLAP, refresh_from
+            )
+            for range_start, range_end in ranges:
+                if kind == HISTORY_ORDERS:
+                    orders = await self._fetch_order_history(account_id, range_start, range_end)
+                    self._index_orders(orders)
+                    saved = await asyncio.to_thread(store.save_orders, self.provider_name, account_id, orders, range_start, range_end)
+                else:
+                    trades = await self._fetch_trade_history(account_id, range_start, range_end)
+                    saved = await asyncio.to_thread(store.save_trades, self.provider_name, account_id, trades, range_start, range_end)
+                logger.debug(f"History sync ({kind}, account {account_id}): stored {saved} record(s) for {range_start} - {range_end}.")
 
     async def get_positions(self, provider_account_id: Union[str, int]) -> List[GenericPosition]:
+        account_id = str(provider_account_id)
+        if self._account_state_fresh(POSITIONS, UserDataType.POSITION_UPDATE, account_id):
+            return self.account_state.positions(account_id)
+        return await self._fetch_positions(account_id, seed_state=True)
+
+    async def _fetch_positions(self, account_id: str, seed_state: bool = False) -> List[GenericPosition]:
+        """Open positions over REST. Only with `seed_state` does the snapshot reseed the account state store."""
         if not self._is_connected_http: await self.connect()
-        ts_response = await self.http_client.ts_search_open_positions(int(provider_account_id))
-        return mapper.map_ts_positions_to_generic(ts_response.positions, self.provider_name)
+        with self._account_state_seed(POSITIONS, UserDataType.POSITION_UPDATE, account_id, enabled=seed_state) as seed:
+            ts_response = await self.http_client.ts_search_open_positions(int(account_id))
+            positions = mapper.map_ts_positions_to_generic(ts_response.positions, self.provider_name).materialize()
+            if seed: self.account_state.complete_seed(seed, positions)
+        return positions
+
+    def _user_feed_live(self, data_type: UserDataType, account_id: Optional[str] = None) -> bool:
+        return self.user_stream_handler is not None and self.user_stream_handler.is_feed_live(data_type, account_id)
+
+    def _account_state_fresh(self, kind: str, data_type: UserDataType, account_id: Optional[str] = None) -> bool:
+        """True if the account state store can answer for this feed instead of REST."""
+        return (self.account_state is not None and self._user_feed_live(data_type, account_id)
+                and self.account_state.is_fresh(kind, account_id))
+
+    @contextmanager
+    def _account_state_seed(self, kind: str, data_type: UserDataType, account_id: Optional[str] = None, *, enabled: bool):
+        """
+        Yields a seed for the account state store if `enabled` and the user stream keeps this feed
+        current (None otherwise). The caller completes it with its REST snapshot; a failed fetch
+        releases it. Only the public getters seed: the store is also the resync baseline, so
+        internal fetches (resync, cancel_all) must never overwrite it.
+        """
+        seed: Optional[StateSeed] = (
+            self.account_state.begin_seed(kind, account_id)
+            if enabled and self.account_state is not None and self._user_feed_live(data_type, account_id) else None
+        )
+        try:
+            yield seed
+        except BaseException:
+            if seed is not None:
+                self.account_state.cancel_seed(seed)
+            raise
 
     async def close_position(self, provider_account_id: Union[str, int], provider_contract_id: str, size_to_close: Optional[float] = None) -> GenericOrderPlacementResponse:
         if not self._is_connected_http: await self.connect()
@@ -371,24 +855,47 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             # Otherwise, use days_to_search
             _start = _end - timedelta(days=days_to_search)
 
-        search_req = TSSearchTradeRequest(
-            accountId=int(provider_account_id), 
-            startTimestamp=_start.isoformat(), 
-            endTimestamp=_end.isoformat()
-        )
-        ts_response = await self.http_client.ts_search_trades(search_req)
-        generic_trades = mapper.map_ts_trades_to_generic(ts_response.trades, self.provider_name)
+        if self.history_store is not None:
+            account_id = str(provider_account_id)
+            _start, _end = ensure_utc(_start), ensure_utc(_end)
+            await self._sync_history(HISTORY_TRADES, account_id, _start, _end)
+            return (await asyncio.to_thread(
+                self.history_store.query_trades, self.provider_name, account_id, _start, _end, provider_contract_id, limit
+            )).materialize()
+
+        generic_trades = await self._fetch_trade_history(provider_account_id, _start, _end)
         if provider_contract_id:
-            generic_trades = [t for t in generic_trades if t.provider_contract_id == provider_contract_id]
+            generic_trades = generic_trades.filter_raw(lambda row: mapper.ts_row_field(row, "contractId") == provider_contract_id)
         if limit:
-            generic_trades = sorted(generic_trades, key=lambda t: t.timestamp_utc, reverse=True)
+            # Sort on the raw timestamps so only the `limit` newest trades are ever mapped.
+            generic_trades = generic_trades.sorted_raw(lambda row: ensure_utc(mapper.ts_row_field(row, "creationTimestamp")), reverse=True)
             generic_trades = generic_trades[:limit]
-        return generic_trades
+        return generic_trades.materialize()
 
     async def _internal_event_handler(self, event: GenericStreamEvent):
-        if self._user_event_callback: await self._user_event_callback(event)
+        if isinstance(event.event_type, UserDataType):
+            # Before the callbacks, so a callback that reads state sees this event applied.
+            if self._user_state is not None:
+                self._user_state.apply(event)
+            if event.event_type == UserDataType.ORDER_UPDATE:
+                self.order_index.put(event.order_data)
+        if self._user_event_callback:
+            try:
+                await self._user_event_callback(event)
+            except Exception as e:
+                # Keep a failing catch-all callback from starving the topic listeners below.
+                logger.error(f"on_event callback failed on {event.event_type.value}: {e}", exc_info=True)
+                await self._internal_listener_error_handler(e)
+        await self.event_dispatcher.dispatch(event)
+
+    async def _internal_listener_error_handler(self, error: Exception):
+        if self._user_error_callback: await self._user_error_callback(error)
 
     async def _internal_status_handler(self, stream_name: str, status: StreamConnectionStatus, reason: Optional[str]):
+        if self.account_state is not None and status != StreamConnectionStatus.CONNECTED and self.user_stream_handler \
+                and stream_name == self.user_stream_handler.stream_name:
+            # Updates may be missed while the user stream is down; the next getter call reseeds.
+            self.account_state.invalidate()
         if self._user_status_callback:
             overall_status = self.get_status()
             await self._user_status_callback(overall_status, f"{stream_name}: {reason or status.value}")
@@ -396,28 +903,76 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
     async def _internal_error_handler(self, stream_name: str, error: Exception):
         if self._user_error_callback: await self._user_error_callback(error)
 
+    def _on_main_loop(self, handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Wraps a callback given to the streams so it runs on this loop when they run on the stream thread."""
+        return self._stream_thread.wrap(handler) if self._stream_thread else handler
+
+    async def _in_stream_loop(self, coro: Awaitable[Any]) -> Any:
+        """Awaits a stream handler coroutine on the loop the streams run on."""
+        return await (self._stream_thread.run(coro) if self._stream_thread and self._stream_thread.is_running else coro)
+
     async def _init_stream_handlers_if_needed(self):
-        if not self._is_connected_http or not self.http_client._token:
+        replaying = self._replay_source is not None
+        if not replaying and (not self._is_connected_http or not self.http_client._token):
              raise AuthenticationError("Must be connected via provider.connect() before initializing streams.")
-        token = self.http_client._token
+        if self.capture_recorder:
+            self.capture_recorder.start()
+        if self._stream_thread:
+            # Handlers are built on the stream loop, so their queues and locks belong to it.
+            self._stream_thread.start()
+            await self._stream_thread.run(self._create_stream_handlers())
+        else:
+            await self._create_stream_handlers()
+
+    async def _create_stream_handlers(self):
+        replaying = self._replay_source is not None
+        token = self.http_client._token or "replay"
+        connection_factory = self._replay_source.connection_for if replaying else None
+        # Live streams ask the HTTP client for a current token on every (re)connect.
+        token_provider = None if replaying else self.http_client.get_stream_token
+        main_loop_runner = self._stream_thread.run_on_main if self._stream_thread else None
         
         # Determine URLs from the provider-specific settings object
         market_hub_url = self.settings.MARKET_HUB_LIVE if self.environment == 'LIVE' else self.settings.MARKET_HUB_DEMO
         user_hub_url = self.settings.USER_HUB_LIVE if self.environment == 'LIVE' else self.settings.USER_HUB_DEMO
-        
-        if self.market_stream_handler is None:
-            self.market_stream_handler = TopStepXMarketStreamInternal(
-                hub_url=market_hub_url, initial_token=token, 
-                event_callback=self._internal_event_handler, status_callback=self._internal_status_handler, 
-                error_callback=self._internal_error_handler, stream_name="MarketStream",
-                mapper=mapper
+
+        def market_stream_factory(stream_name: str, stagger_sec: float = 0.0) -> TopStepXMarketStreamInternal:
+            return TopStepXMarketStreamInternal(
+                hub_url=market_hub_url, initial_token=self.http_client._token or token,
+                event_callback=self._on_main_loop(self._internal_event_handler),
+                status_callback=self._on_main_loop(self._internal_status_handler),
+                error_callback=self._on_main_loop(self._internal_error_handler), stream_name=stream_name,
+                mapper=mapper, tick_scales=self._tick_scales, conflator=self._market_conflator, watchdog=self.feed_watchdog,
+                queue_maxsize=self._market_queue_size, overflow_policy=self._market_overflow_policy,
+                recorder=self.capture_recorder, connection_factory=connection_factory,
+                latency_tracker=self.latency_tracker, token_provider=token_provider,
+                reconnect_stagger_sec=stagger_sec, main_loop_runner=main_loop_runner
             )
+
+        if self.market_stream_handler is None:
+            if self._market_shards > 1:
+                self.market_stream_handler = ShardedMarketStream(
+                    lambda index: market_stream_factory(f"MarketStream[{index}]", index * self._SHARD_RECONNECT_STAGGER_SEC),
+                    self._market_shards
+                )
+                if replaying:
+                    sharded = self.market_stream_handler
+                    self._replay_source.route(
+                        sharded.stream_name, lambda contract_id: sharded.shard_for(contract_id).stream_name,
+                        [shard.stream_name for shard in sharded.shards.values()]
+                    )
+            else:
+                self.market_stream_handler = market_stream_factory("MarketStream")
         if self.user_stream_handler is None:
             self.user_stream_handler = TopStepXUserStreamInternal(
                 hub_url=user_hub_url, initial_token=token,
-                event_callback=self._internal_event_handler, status_callback=self._internal_status_handler,
-                error_callback=self._internal_error_handler, stream_name="UserStream",
-                mapper=mapper
+                event_callback=self._on_main_loop(self._internal_event_handler),
+                status_callback=self._on_main_loop(self._internal_status_handler),
+                error_callback=self._on_main_loop(self._internal_error_handler), stream_name="UserStream",
+                mapper=mapper, recorder=self.capture_recorder, connection_factory=connection_factory,
+                latency_tracker=self.latency_tracker, token_provider=token_provider,
+                reconnect_stagger_sec=self._USER_STREAM_RECONNECT_STAGGER_SEC, resync=self.user_state_resync,
+                main_loop_runner=main_loop_runner
             )
 
     async def subscribe_market_data(self, provider_contract_ids: List[str], data_types: List[MarketDataType]):
@@ -425,11 +980,86 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             raise TradeForgeConnectionError("Market stream handler not initialized. Ensure provider.connect() was called and succeeded.")
         
         for contract_id in provider_contract_ids:
-            await self.market_stream_handler.subscribe_contract(contract_id, data_types)
+            if MarketDataType.ORDER_BOOK in data_types and contract_id not in self._tick_scales:
+                # Books key their levels by integer ticks when the contract's tick size is known.
+                try:
+                    await self.get_tick_scale(contract_id)
+                except TradeForgeError as e:
+                    logger.warning(f"No tick scale for {contract_id} ({e}); its order book will use float price keys.")
+            await self._in_stream_loop(self.market_stream_handler.subscribe_contract(contract_id, data_types))
+
+    def get_order_book(self, provider_contract_id: str) -> Optional[OrderBook]:
+        """
+        Returns the order book maintained for a contract subscribed with `MarketDataType.ORDER_BOOK`,
+        or None if no book is being maintained for it. With `stream_thread` on, the book is
+        updated on the stream thread; copy what you need rather than holding on to it.
+        """
+        return self.market_stream_handler.get_order_book(provider_contract_id) if self.market_stream_handler else None
+
+    def configure_conflation(self, provider_contract_ids: List[str], data_types: List[MarketDataType],
+                             mode: ConflationMode, interval_ms: Optional[float] = None) -> None:
+        """
+        Coalesces QUOTE or ORDER_BOOK events for the given contracts so a slow
+        `on_event` consumer always sees the latest state instead of a backlog.
+
+        `ConflationMode.LATEST` delivers the newest event whenever the consumer is free;
+        `ConflationMode.INTERVAL` delivers at most one event every `interval_ms`;
+        `ConflationMode.NONE` restores delivery of every event. Trades and DEPTH deltas
+        cannot be conflated.
+        """
+        for contract_id in provider_contract_ids:
+            for data_type in data_types:
+                if self._stream_thread and self._stream_thread.is_running:
+                    self._stream_thread.call(self._market_conflator.configure, contract_id, data_type, mode, interval_ms)
+                else:
+                    self._market_conflator.configure(contract_id, data_type, mode, interval_ms)
+
+    async def resize_market_shards(self, shard_count: int) -> Dict[str, str]:
+        """
+        Changes the number of market hub connections of a sharded provider (created with
+        `market_shards > 1`) and moves the affected subscriptions. Returns contract id ->
+        new shard name for each contract that moved.
+        """
+        if not isinstance(self.market_stream_handler, ShardedMarketStream):
+            raise InvalidParameterError("Market data is not sharded; create the provider with market_shards > 1.")
+        return await self._in_stream_loop(self.market_stream_handler.resize(shard_count))
+
+    def get_stream_queue_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns depth, high watermark, drop and conflation counters of each stream's dispatch queue,
+        and of the handoff from the stream thread to this loop when `stream_thread` is on.
+        """
+        metrics = {}
+        if self.market_stream_handler:
+            metrics['market'] = self.market_stream_handler.get_queue_metrics()
+        if self.user_stream_handler:
+            metrics['user'] = self.user_stream_handler.get_queue_metrics()
+        if self._stream_thread:
+            metrics['handoff'] = self._stream_thread.metrics()
+        return metrics
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """
+        Returns rolling latency percentiles per stream, event type and stage
+        (provider_to_recv, recv_to_emit, emit_to_dispatch, deliver, recv_to_delivered)
+        and the estimated provider clock offset per stream. Empty if latency tracking is off.
+        """
+        return self.latency_tracker.stats() if self.latency_tracker else {}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Returns read cache size, evictions and hit/miss counts per kind, plus contract master stats."""
+        stats = {"read_cache": self.read_cache.stats()}
+        if self.contract_master is not None:
+            stats["contract_master"] = self.contract_master.stats()
+        return stats
+
+    def get_conflation_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Returns received/delivered/dropped counts per conflated contract and data type."""
+        return self._market_conflator.stats()
 
     async def unsubscribe_market_data(self, provider_contract_ids: List[str], data_types: List[MarketDataType]):
         if self.market_stream_handler:
-            tasks = [self.market_stream_handler.unsubscribe_contract(cid, data_types) for cid in provider_contract_ids]
+            tasks = [self._in_stream_loop(self.market_stream_handler.unsubscribe_contract(cid, data_types)) for cid in provider_contract_ids]
             await asyncio.gather(*tasks)
         else:
             logger.warning("Cannot unsubscribe market data: market stream handler not initialized.")
@@ -439,21 +1069,27 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             raise TradeForgeConnectionError("User stream handler not initialized. Ensure provider.connect() was called and succeeded.")
 
         if UserDataType.ACCOUNT_UPDATE in data_types:
-            await self.user_stream_handler.subscribe_global_accounts()
+            await self._in_stream_loop(self.user_stream_handler.subscribe_global_accounts())
         
         specific_types = [dt for dt in data_types if dt != UserDataType.ACCOUNT_UPDATE]
         if specific_types:
             for acc_id in provider_account_ids:
-                await self.user_stream_handler.subscribe_account(acc_id, specific_types)
+                await self._in_stream_loop(self.user_stream_handler.subscribe_account(acc_id, specific_types))
 
     async def unsubscribe_user_data(self, provider_account_ids: List[str], data_types: List[UserDataType]):
         if self.user_stream_handler:
+            if self.account_state is not None:
+                # A later resubscribe must not trust state that stopped receiving updates.
+                if UserDataType.ACCOUNT_UPDATE in data_types:
+                    self.account_state.invalidate()
+                for acc_id in provider_account_ids:
+                    self.account_state.invalidate(str(acc_id))
             if UserDataType.ACCOUNT_UPDATE in data_types:
-                await self.user_stream_handler.unsubscribe_global_accounts()
+                await self._in_stream_loop(self.user_stream_handler.unsubscribe_global_accounts())
             
             specific_types = [dt for dt in data_types if dt != UserDataType.ACCOUNT_UPDATE]
             if specific_types:
-                tasks = [self.user_stream_handler.unsubscribe_account(acc_id, specific_types) for acc_id in provider_account_ids]
+                tasks = [self._in_stream_loop(self.user_stream_handler.unsubscribe_account(acc_id, specific_types)) for acc_id in provider_account_ids]
                 await asyncio.gather(*tasks)
         else:
             logger.warning("Cannot unsubscribe user data: user stream handler not initialized.")
@@ -479,8 +1115,58 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
         return {'market': self.get_market_stream_status(), 'user': self.get_user_stream_status()}
 
     def on_event(self, callback: GenericStreamEventCallback): self._user_event_callback = callback
+
+    def add_event_listener(self, callback: EventHandler,
+                           event_types: Optional[List[EventType]] = None,
+                           provider_contract_ids: Optional[List[str]] = None,
+                           provider_account_ids: Optional[List[str]] = None) -> EventSubscription:
+        """
+        Registers an additional event callback that only receives matching events.
+
+        Omitted filters match everything. An event matches when its type is one of
+        `event_types` and it carries one of `provider_contract_ids` or one of
+        `provider_account_ids`. Any number of listeners can be registered, and an
+        exception raised by one listener does not affect the others. Returns a
+        handle for `remove_event_listener()`.
+        """
+        return self.event_dispatcher.subscribe(callback, event_types, provider_contract_ids, provider_account_ids)
+
+    def remove_event_listener(self, subscription: EventSubscription) -> None:
+        self.event_dispatcher.unsubscribe(subscription)
     def on_status_change(self, callback: StreamStatusCallback): self._user_status_callback = callback
     def on_error(self, callback: StreamErrorCallback): self._user_error_callback = callback
+    def on_feed_stale(self, callback: Callable[[FeedStaleness], Awaitable[None]]): self._user_feed_stale_callback = callback
+
+    async def _internal_feed_stale_handler(self, staleness: FeedStaleness):
+        contract_id, data_type = staleness.key
+        if self._user_feed_stale_callback:
+            try:
+                await self._user_feed_stale_callback(staleness)
+            except Exception as e:
+                logger.error(f"Error in user feed-stale callback for {contract_id} {data_type.value}: {e}", exc_info=True)
+        if self._resubscribe_stale_feeds and self.market_stream_handler:
+            if await self._in_stream_loop(self.market_stream_handler.resubscribe_feed(contract_id, data_type)):
+                logger.info(f"Resubscribed stale {data_type.value} feed for {contract_id}.")
+
+    def get_feed_health(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Returns, per subscribed contract and feed (QUOTE, DEPTH, TRADE), the seconds since its
+        last message, its learned message interval, its current staleness timeout and whether
+        it is stale. Empty if the watchdog is disabled or the market stream is not connected.
+        """
+        health: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if self.feed_watchdog:
+            for (contract_id, data_type), info in self.feed_watchdog.snapshot().items():
+                health.setdefault(contract_id, {})[data_type.value] = info
+        return health
+
+    async def _stop_streams_after_replay(self):
+        """Lets run_forever() return once the replay source has delivered every recorded message."""
+        await self._replay_source.wait_finished()
+        logger.info(f"Replay complete: {self._replay_source.stats()}")
+        for handler in (self.market_stream_handler, self.user_stream_handler):
+            if handler:
+                await handler.disconnect()
 
     async def run_forever(self) -> None:
         if self._run_forever_task and not self._run_forever_task.done():
@@ -490,9 +1176,11 @@ class TopStepXProvider(TradingPlatformAPI, RealTimeStream):
             
         tasks = []
         if self.market_stream_handler:
-            tasks.append(self.market_stream_handler.run_forever())
+            tasks.append(self._in_stream_loop(self.market_stream_handler.run_forever()))
         if self.user_stream_handler:
-            tasks.append(self.user_stream_handler.run_forever())
+            tasks.append(self._in_stream_loop(self.user_stream_handler.run_forever()))
+        if tasks and self._replay_source is not None:
+            tasks.append(self._in_stream_loop(self._stop_streams_after_replay()))
             
         if not tasks:
             logger.warning("run_forever called, but no streams were initialized (is provider connected?). Idling.")
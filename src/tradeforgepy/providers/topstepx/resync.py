@@ -0,0 +1,189 @@
+# tradeforgepy/providers/topstepx/resync.py
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from tradeforgepy.core.account_state import AccountStateStore
+from tradeforgepy.core.enums import OrderStatus, UserDataType
+from tradeforgepy.core.interfaces import TradingPlatformAPI
+from tradeforgepy.core.models_generic import (
+    GenericStreamEvent, Order, Position, Trade,
+    OrderUpdateEvent, PositionUpdateEvent, UserTradeEvent
+)
+from tradeforgepy.utils.time_utils import UTC_TZ
+
+logger = logging.getLogger(__name__)
+
+def _order_state(order: Order) -> Tuple:
+    return (order.status, order.original_size, order.filled_size, order.limit_price,
+            order.stop_price, order.average_fill_price)
+
+
+class UserStateResync:
+    """
+    Works out what was missed on the user stream while it was down.
+
+    The last known open orders and positions are read from `state`, the
+    provider's `AccountStateStore`, which every delivered user event (live or
+    synthetic) updates. Fills are tracked here: live fill events are fed in with
+    `observe()`. `resync()` fetches open orders,
+    positions and trades for every subscribed account concurrently over REST,
+    compares them with the last known state and returns synthetic events
+    (`is_synthetic=True`) for each difference:
+
+    - orders that are new or changed, and orders that left the open set (with
+      their final state taken from order history),
+    - positions that opened, changed or went flat,
+    - fills since the disconnect that never arrived on the stream.
+    """
+
+    def __init__(self, api: TradingPlatformAPI, provider_name: str, state: AccountStateStore,
+                 overlap: timedelta = timedelta(seconds=30), max_seen_trades: int = 10000,
+                 fetch_open_orders: Optional[Callable[[str], Awaitable[Iterable[Order]]]] = None,
+                 fetch_positions: Optional[Callable[[str], Awaitable[Iterable[Position]]]] = None):
+        self.api = api
+        self.provider_name = provider_name
+        self.state = state
+        # REST snapshots to compare against `state`. They must not write to `state` themselves,
+        # or the comparison would be against the snapshot; None uses the API getters.
+        self.fetch_open_orders = fetch_open_orders
+        self.fetch_positions = fetch_positions
+        # Extra history fetched before the disconnect time, to cover clock skew between us and the provider.
+        self.overlap = overlap
+        self.max_seen_trades = max_seen_trades
+        # Trade id -> trade time per account, oldest first, for de-duplicating fills around the gap.
+        # Bounded to the `max_seen_trades` most recent fills; a resync only needs the ones near the gap.
+        self._seen_trades: Dict[str, "OrderedDict[str, datetime]"] = {}
+
+        # --- Metrics ---
+        self.resyncs = 0
+        self.synthetic_events = 0
+
+    def observe(self, event: GenericStreamEvent) -> None:
+        """Records a fill seen on the stream (live or synthetic). Other events are ignored."""
+        if isinstance(event, UserTradeEvent):
+            trade = event.trade_data
+            seen = self._seen_trades.get(trade.provider_account_id)
+            if seen is None:
+                seen = self._seen_trades[trade.provider_account_id] = OrderedDict()
+            seen[trade.provider_trade_id] = trade.timestamp_utc
+            seen.move_to_end(trade.provider_trade_id)
+            while len(seen) > self.max_seen_trades:
+                seen.popitem(last=False)
+
+    async def resync(self, subscriptions: Dict[str, Set[UserDataType]], since: datetime) -> List[GenericStreamEvent]:
+        """
+        Returns the catch-up events for `subscriptions` (account id -> subscribed user data
+        types) since `since`, the moment the stream was last known to be connected. Events
+        are ordered per account as orders, then fills (oldest first), then positions.
+
+        Call it once every event received before the disconnect has been applied to
+        `state`; the returned events must be applied (delivered) as well.
+        """
+        self.resyncs += 1
+        window_start = since - self.overlap
+        for seen in self._seen_trades.values():
+            for trade_id in [tid for tid, ts in seen.items() if ts < window_start]:
+                del seen[trade_id]
+
+        per_account = await asyncio.gather(*(
+            self._resync_account(account_id, data_types, window_start)
+            for account_id, data_types in subscriptions.items()
+        ))
+        events = [event for account_events in per_account for event in account_events]
+        for event in events:
+            self.observe(event)
+        self.synthetic_events += len(events)
+        logger.info(f"Resync of {len(subscriptions)} account(s) produced {len(events)} catch-up event(s).")
+        return events
+
+    async def _resync_account(self, account_id: str, data_types: Set[UserDataType], window_start: datetime) -> List[GenericStreamEvent]:
+        now = datetime.now(UTC_TZ)
+
+        async def _skip():
+            return None
+
+        # The baseline is taken before anything is fetched, so nothing the fetches do can move it.
+        known_orders = self.state.open_orders(account_id)
+        known_positions = self.state.positions(account_id)
+        open_orders, positions, trades = await asyncio.gather(
+            (self.fetch_open_orders or self.api.get_open_orders)(account_id)
+            if UserDataType.ORDER_UPDATE in data_types else _skip(),
+            (self.fetch_positions or self.api.get_positions)(account_id)
+            if UserDataType.POSITION_UPDATE in data_types else _skip(),
+            self.api.get_trade_history(account_id, start_time_utc=window_start, end_time_utc=now)
+            if UserDataType.USER_TRADE in data_types else _skip(),
+        )
+        events: List[GenericStreamEvent] = []
+        if open_orders is not None:
+            events.extend(await self._diff_orders(account_id, known_orders, open_orders, now))
+        if trades is not None:
+            events.extend(self._diff_trades(account_id, trades))
+        if positions is not None:
+            events.extend(self._diff_positions(known_positions, positions, now))
+        return events
+
+    async def _diff_orders(self, account_id: str, known_orders: Iterable[Order], open_orders: Iterable[Order],
+                           now: datetime) -> List[GenericStreamEvent]:
+        events: List[GenericStreamEvent] = []
+        open_now = {order.provider_order_id: order for order in open_orders}
+        known_open = {order.provider_order_id: order for order in known_orders}
+        for order_id, order in open_now.items():
+            known = known_open.get(order_id)
+            if known is None or _order_state(known) != _order_state(order):
+                events.append(self._order_event(order, now))
+
+        closed = [order for order_id, order in known_open.items() if order_id not in open_now]
+        if closed:
+            # Orders that filled, cancelled or expired during the gap; fetch their final state.
+            start = min(order.created_at_utc for order in closed) - self.overlap
+            history = {order.provider_order_id: order for order in await self.api.get_order_history(account_id, start, now)}
+            for order in closed:
+                final = history.get(order.provider_order_id)
+                if final is None:
+                    logger.warning(f"Order {order.provider_order_id} is no longer open but is missing from order history; reporting it as UNKNOWN.")
+                    final = order.model_copy(update={"status": OrderStatus.UNKNOWN, "updated_at_utc": now})
+                events.append(self._order_event(final, now))
+        return events
+
+    def _diff_trades(self, account_id: str, trades: Iterable[Trade]) -> List[GenericStreamEvent]:
+        seen = self._seen_trades.get(account_id, {})
+        missed = sorted((t for t in trades if t.provider_trade_id not in seen), key=lambda t: t.timestamp_utc)
+        return [
+            UserTradeEvent(
+                provider_name=self.provider_name, provider_account_id=trade.provider_account_id,
+                provider_contract_id=trade.provider_contract_id, timestamp_utc=trade.timestamp_utc,
+                trade_data=trade, is_synthetic=True
+            )
+            for trade in missed
+        ]
+
+    def _diff_positions(self, known: Iterable[Position], positions: Iterable[Position], now: datetime) -> List[GenericStreamEvent]:
+        events: List[GenericStreamEvent] = []
+        current = {position.provider_contract_id: position for position in positions if position.quantity}
+        known_positions = {position.provider_contract_id: position for position in known}
+        for contract_id, position in current.items():
+            known = known_positions.get(contract_id)
+            if known is None or (known.quantity, known.average_entry_price) != (position.quantity, position.average_entry_price):
+                events.append(self._position_event(position, now))
+        for contract_id, known in known_positions.items():
+            if contract_id not in current:
+                flat = known.model_copy(update={"quantity": 0.0, "unrealized_pnl": None})
+                events.append(self._position_event(flat, now))
+        return events
+
+    def _order_event(self, order: Order, now: datetime) -> OrderUpdateEvent:
+        return OrderUpdateEvent(
+            provider_name=self.provider_name, provider_account_id=order.provider_account_id,
+            provider_contract_id=order.provider_contract_id, timestamp_utc=order.updated_at_utc or now,
+            order_data=order, is_synthetic=True
+        )
+
+    def _position_event(self, position: Position, now: datetime) -> PositionUpdateEvent:
+        return PositionUpdateEvent(
+            provider_name=self.provider_name, provider_account_id=position.provider_account_id,
+            provider_contract_id=position.provider_contract_id, timestamp_utc=now,
+            position_data=position, is_synthetic=True
+        )
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 from enum import IntEnum
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -51,6 +51,9 @@ class TSPartialClosePositionErrorCode(IntEnum):
     SUCCESS = 0; ACCOUNT_NOT_FOUND = 1; POSITION_NOT_FOUND = 2; CONTRACT_NOT_FOUND = 3; CONTRACT_NOT_ACTIVE = 4
     INVALID_CLOSE_SIZE = 5; ORDER_REJECTED = 6; ORDER_PENDING = 7; UNKNOWN_ERROR = 8; ACCOUNT_REJECTED = 9
 class TSSearchTradeErrorCode(IntEnum): SUCCESS = 0; ACCOUNT_NOT_FOUND = 1
+class TSDomType(IntEnum):
+    UNKNOWN = 0; ASK = 1; BID = 2; BEST_ASK = 3; BEST_BID = 4; TRADE = 5; RESET = 6
+    LOW = 7; HIGH = 8; NEW_BEST_BID = 9; NEW_BEST_ASK = 10; FILL = 11
 
 # --- Model Definitions ---
 class TSTradingAccountModel(BaseModel): model_config = MODEL_CONFIG_TS; id: int; name: str; balance: Decimal; canTrade: bool; isVisible: bool; simulated: bool
@@ -62,6 +65,7 @@ class TSHalfTradeModel(BaseModel): model_config = MODEL_CONFIG_TS; id: int; acco
 class TSSearchAccountRequest(BaseModel): model_config = MODEL_CONFIG_TS; onlyActiveAccounts: bool
 class TSLoginApiKeyRequest(BaseModel): model_config = MODEL_CONFIG_TS; userName: str; apiKey: str
 class TSSearchContractRequest(BaseModel): model_config = MODEL_CONFIG_TS; searchText: Optional[str] = None; live: bool
+class TSAvailableContractRequest(BaseModel): model_config = MODEL_CONFIG_TS; live: bool
 class TSSearchContractByIdRequest(BaseModel): model_config = MODEL_CONFIG_TS; contractId: str
 class TSRetrieveBarRequest(BaseModel): model_config = MODEL_CONFIG_TS; contractId: str; live: bool; startTime: str; endTime: str; unit: TSAggregateBarUnit; unitNumber: int; limit: int; includePartialBar: bool
 class TSSearchOrderRequest(BaseModel): model_config = MODEL_CONFIG_TS; accountId: int; startTimestamp: str; endTimestamp: Optional[str] = None
@@ -89,4 +93,10 @@ class TSModifyOrderResponse(BaseModel): model_config = MODEL_CONFIG_TS; success:
 class TSSearchPositionResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSSearchPositionErrorCode; errorMessage: Optional[str] = None; positions: List[TSPositionModel] = Field(default_factory=list)
 class TSClosePositionResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSClosePositionErrorCode; errorMessage: Optional[str] = None
 class TSPartialClosePositionResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSPartialClosePositionErrorCode; errorMessage: Optional[str] = None
-class TSSearchHalfTradeResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSSearchTradeErrorCode; errorMessage: Optional[str] = None; trades: List[TSHalfTradeModel] = Field(default_factory=list)
\ No newline at end of file
+class TSSearchHalfTradeResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSSearchTradeErrorCode; errorMessage: Optional[str] = None; trades: List[TSHalfTradeModel] = Field(default_factory=list)
+
+# --- Envelope-only List Responses ---
+# Rows are kept as raw dictionaries and validated one at a time by the mapper when they are accessed.
+class TSSearchOrderRowsResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSSearchOrderErrorCode; errorMessage: Optional[str] = None; orders: List[Any] = Field(default_factory=list)
+class TSSearchPositionRowsResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSSearchPositionErrorCode; errorMessage: Optional[str] = None; positions: List[Any] = Field(default_factory=list)
+class TSSearchHalfTradeRowsResponse(BaseModel): model_config = MODEL_CONFIG_TS; success: bool; errorCode: TSSearchTradeErrorCode; errorMessage: Optional[str] = None; trades: List[Any] = Field(default_factory=list)
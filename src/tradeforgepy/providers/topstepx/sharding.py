@@ -0,0 +1,173 @@
+# tradeforgepy/providers/topstepx/sharding.py
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from tradeforgepy.core.enums import StreamConnectionStatus, MarketDataType
+from tradeforgepy.core.order_book import OrderBook
+from tradeforgepy.exceptions import InvalidParameterError
+from tradeforgepy.streaming.hash_ring import ConsistentHashRing
+
+from .streams import TopStepXMarketStreamInternal
+
+logger = logging.getLogger(__name__)
+
+ShardFactory = Callable[[int], TopStepXMarketStreamInternal]
+
+
+class ShardedMarketStream:
+    """
+    Spreads market data subscriptions over several market hub connections.
+
+    Contracts are assigned to shards with a consistent-hash ring, so every
+    contract lives on exactly one connection (per-contract event order is
+    preserved) and resizing only moves about 1/N of the contracts. All shards
+    share the provider's event callback, which makes their output a single
+    merged event stream. The class exposes the same surface as
+    `TopStepXMarketStreamInternal`, so the provider can use either one.
+    """
+
+    def __init__(self, shard_factory: ShardFactory, shard_count: int, stream_name: str = "MarketStream"):
+        if shard_count < 1:
+            raise InvalidParameterError("shard_count must be at least 1.")
+        self.stream_name = stream_name
+        self._shard_factory = shard_factory
+        self.shards: Dict[int, TopStepXMarketStreamInternal] = {}
+        self._ring: ConsistentHashRing[int] = ConsistentHashRing()
+        # Desired data types per contract, independent of which shard currently carries them.
+        self._subscriptions: Dict[str, Set[MarketDataType]] = {}
+        self._rebalance_lock = asyncio.Lock()
+        self._shard_tasks: Dict[int, asyncio.Task] = {}
+        self._stopped: Optional[asyncio.Event] = None
+        for index in range(shard_count):
+            self._add_shard(index)
+
+    def _add_shard(self, index: int) -> TopStepXMarketStreamInternal:
+        shard = self._shard_factory(index)
+        self.shards[index] = shard
+        self._ring.add_node(index)
+        if self._stopped is not None and not self._stopped.is_set():
+            self._start_shard(index)
+        return shard
+
+    def _start_shard(self, index: int) -> None:
+        task = asyncio.create_task(self.shards[index].run_forever(), name=f"{self.stream_name}_Shard{index}")
+        self._shard_tasks[index] = task
+        task.add_done_callback(self._on_shard_task_done)
+
+    def _on_shard_task_done(self, _task: asyncio.Task) -> None:
+        # A shard only exits on disconnect or after giving up on authentication.
+        if self._stopped is not None and all(t.done() for t in self._shard_tasks.values()):
+            self._stopped.set()
+
+    def shard_for(self, contract_id: str) -> TopStepXMarketStreamInternal:
+        return self.shards[self._ring.get_node(contract_id)]
+
+    def shard_assignments(self) -> Dict[str, str]:
+        """Returns contract id -> name of the shard carrying it."""
+        return {cid: self.shard_for(cid).stream_name for cid in self._subscriptions}
+
+    # --- Aggregate state ---
+
+    @property
+    def current_status(self) -> StreamConnectionStatus:
+        statuses = [shard.current_status for shard in self.shards.values()]
+        if all(s == StreamConnectionStatus.CONNECTED for s in statuses): return StreamConnectionStatus.CONNECTED
+        if StreamConnectionStatus.ERROR in statuses: return StreamConnectionStatus.ERROR
+        if all(s == StreamConnectionStatus.STOPPED for s in statuses): return StreamConnectionStatus.STOPPED
+        if any(s in (StreamConnectionStatus.CONNECTED, StreamConnectionStatus.CONNECTING) for s in statuses):
+            return StreamConnectionStatus.CONNECTING
+        return StreamConnectionStatus.DISCONNECTED
+
+    @property
+    def pending_subscriptions(self) -> Dict[str, Set[MarketDataType]]:
+        return self._subscriptions
+
+    def get_order_book(self, contract_id: str) -> Optional[OrderBook]:
+        return self.shard_for(contract_id).get_order_book(contract_id)
+
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        return {shard.stream_name: shard.get_queue_metrics() for shard in self.shards.values()}
+
+    # --- Lifecycle ---
+
+    async def run_forever(self):
+        """Runs every shard's resilient loop until `disconnect()` is called or all shards give up."""
+        self._stopped = asyncio.Event()
+        for index in self.shards:
+            self._start_shard(index)
+        logger.info(f"'{self.stream_name}' running {len(self.shards)} shard(s).")
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in self._shard_tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._shard_tasks.values(), return_exceptions=True)
+            self._shard_tasks.clear()
+
+    async def disconnect(self):
+        results = await asyncio.gather(*(shard.disconnect() for shard in self.shards.values()), return_exceptions=True)
+        for shard, result in zip(self.shards.values(), results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error while disconnecting shard '{shard.stream_name}': {result}")
+        if self._stopped is not None:
+            self._stopped.set()
+
+    # --- Subscriptions ---
+
+    async def subscribe_contract(self, contract_id: str, data_types: List[MarketDataType]):
+        async with self._rebalance_lock:
+            self._subscriptions.setdefault(contract_id, set()).update(data_types)
+            shard = self.shard_for(contract_id)
+        await shard.subscribe_contract(contract_id, data_types)
+
+    async def unsubscribe_contract(self, contract_id: str, data_types: List[MarketDataType]):
+        async with self._rebalance_lock:
+            current = self._subscriptions.get(contract_id)
+            if current is not None:
+                current.difference_update(data_types)
+                if not current:
+                    del self._subscriptions[contract_id]
+            shard = self.shard_for(contract_id)
+        await shard.unsubscribe_contract(contract_id, data_types)
+
+    async def resubscribe_feed(self, contract_id: str, data_type: MarketDataType) -> bool:
+        return await self.shard_for(contract_id).resubscribe_feed(contract_id, data_type)
+
+    async def resize(self, shard_count: int) -> Dict[str, str]:
+        """
+        Changes the number of shards and moves the contracts whose ring assignment
+        changed. Returns contract id -> new shard name for every moved contract.
+        """
+        if shard_count < 1:
+            raise InvalidParameterError("shard_count must be at least 1.")
+        async with self._rebalance_lock:
+            before = {cid: self.shard_for(cid) for cid in self._subscriptions}
+
+            for index in range(len(self.shards), shard_count):
+                self._add_shard(index)
+            removed = [self.shards[i] for i in sorted(self.shards) if i >= shard_count]
+            for index in range(shard_count, len(self.shards)):
+                self._ring.remove_node(index)
+
+            moved: Dict[str, str] = {}
+            for cid, old_shard in before.items():
+                new_shard = self.shard_for(cid)
+                if new_shard is old_shard:
+                    continue
+                data_types = list(self._subscriptions[cid])
+                await new_shard.subscribe_contract(cid, data_types)
+                if old_shard not in removed:
+                    await old_shard.unsubscribe_contract(cid, data_types)
+                moved[cid] = new_shard.stream_name
+
+            for shard in removed:
+                index = next(i for i, s in self.shards.items() if s is shard)
+                await shard.disconnect()
+                task = self._shard_tasks.pop(index, None)
+                if task:
+                    task.cancel()
+                del self.shards[index]
+
+        logger.info(f"'{self.stream_name}' resized to {shard_count} shard(s); moved {len(moved)} contract(s).")
+        return moved
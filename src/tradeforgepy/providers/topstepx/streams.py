@@ -1,28 +1,72 @@
 # tradeforgepy/providers/topstepx/streams.py
 import asyncio
 import logging
-from typing import Callable, Awaitable, Optional, List, Any, Dict, Set
+import random
+import time
+from functools import partial
+from datetime import datetime
+from typing import Callable, Awaitable, Optional, List, Any, Dict, Set, Tuple
 
 from pysignalr.client import SignalRClient
-from pysignalr.exceptions import ConnectionError as PySignalRConnectionError
+from pysignalr.exceptions import ConnectionError as PySignalRConnectionError, AuthorizationError as PySignalRAuthorizationError
 
-from tradeforgepy.core.enums import StreamConnectionStatus, MarketDataType, UserDataType
+from tradeforgepy.core.enums import StreamConnectionStatus, MarketDataType, UserDataType, OverflowPolicy
 from tradeforgepy.core.models_generic import GenericStreamEvent
+from tradeforgepy.core.order_book import OrderBook
+from tradeforgepy.streaming.conflation import EventConflator
+from tradeforgepy.streaming.dispatch_queue import BoundedDispatchQueue, default_conflation_key
+from tradeforgepy.streaming.latency import LatencyTracker
+from tradeforgepy.streaming.capture import CaptureRecorder
+from tradeforgepy.streaming.watchdog import StalenessWatchdog
+from tradeforgepy.utils.tick_utils import TickScale
+from tradeforgepy.utils.time_utils import UTC_TZ
 from tradeforgepy.exceptions import ConnectionError as TradeForgeConnectionError, AuthenticationError
 
+from .resync import UserStateResync
+
 logger = logging.getLogger(__name__)
 
 InternalGenericEventCallback = Callable[[GenericStreamEvent], Awaitable[None]]
 InternalStatusChangeCallback = Callable[[str, StreamConnectionStatus, Optional[str]], Awaitable[None]]
 InternalErrorCallback = Callable[[str, Exception], Awaitable[None]]
+# (hub method, args, log name) for one subscription the stream should hold.
+SubscriptionCommand = Tuple[str, Tuple[Any, ...], str]
+# Builds the hub connection for a session from (stream, url); defaults to a pysignalr SignalRClient.
+ConnectionFactory = Callable[["_BaseTopStepXStream", str], Any]
+# Returns the token to connect with; receives the token the hub last rejected, if any.
+TokenProvider = Callable[[Optional[str]], Awaitable[str]]
+# Runs a coroutine on the loop that owns the HTTP client, when the stream runs on a loop of its own.
+MainLoopRunner = Callable[[Awaitable[Any]], Awaitable[Any]]
 
 class _BaseTopStepXStream:
     _MAX_CONSECUTIVE_AUTH_FAILURES = 3
+    # Upper bound on subscription sends in flight at once.
+    _MAX_CONCURRENT_SUBSCRIPTION_SENDS = 16
+    # Unsubscribe method -> the subscribe method whose acknowledgement it revokes.
+    _UNSUBSCRIBE_REVOKES = {
+        "UnsubscribeContractQuotes": "SubscribeContractQuotes",
+        "UnsubscribeContractMarketDepth": "SubscribeContractMarketDepth",
+        "UnsubscribeContractTrades": "SubscribeContractTrades",
+        "UnsubscribeAccounts": "SubscribeAccounts",
+        "UnsubscribeOrders": "SubscribeOrders",
+        "UnsubscribePositions": "SubscribePositions",
+        "UnsubscribeTrades": "SubscribeTrades",
+    }
 
     def __init__(self, hub_url: str, initial_token: str, event_callback: InternalGenericEventCallback, 
-                 status_callback: InternalStatusChangeCallback, error_callback: InternalErrorCallback, stream_name: str):
+                 status_callback: InternalStatusChangeCallback, error_callback: InternalErrorCallback, stream_name: str,
+                 queue_maxsize: int = 10000, overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 recorder: Optional[CaptureRecorder] = None, connection_factory: Optional[ConnectionFactory] = None,
+                 latency_tracker: Optional[LatencyTracker] = None, token_provider: Optional[TokenProvider] = None,
+                 reconnect_jitter: float = 0.25, reconnect_stagger_sec: float = 0.0,
+                 main_loop_runner: Optional[MainLoopRunner] = None):
         self._raw_hub_url = hub_url
         self._current_token = initial_token
+        # Shared source of fresh tokens (the HTTP client), asked before every connection attempt.
+        self._token_provider = token_provider
+        self._rejected_token: Optional[str] = None
+        # Set when the stream runs on a StreamLoopThread; token and REST calls go back to the main loop.
+        self._main_loop_runner = main_loop_runner
         self.event_callback = event_callback
         self.status_callback = status_callback
         self.error_callback = error_callback
@@ -30,19 +74,83 @@ class _BaseTopStepXStream:
         self.connection: Optional[SignalRClient] = None
         self.current_status = StreamConnectionStatus.DISCONNECTED
         self._session_task: Optional[asyncio.Task] = None
+        # Set when this stream cancels its own session to force a reconnect, as opposed to the
+        # task running run_forever() being cancelled from outside.
+        self._session_cancel_requested = False
         self._is_manually_stopping = False
+        # Optional raw capture of every inbound hub message.
+        self.recorder = recorder
+        # Replaces SignalRClient, e.g. with a replay connection fed from a capture.
+        self._connection_factory = connection_factory
+        # Receive -> mapped -> dispatched -> delivered latency, per event type.
+        self.latency_tracker = latency_tracker
+        self._current_recv_ns = 0
 
         # --- Resilience Parameters ---
         self._reconnect_delay_sec = 2.0
         self._max_reconnect_delay_sec = 60.0
         self._consecutive_auth_failures = 0
+        # Random extra fraction of each backoff, plus a fixed per-stream offset, so streams
+        # that drop together (e.g. on a hub restart) do not all reconnect at the same instant.
+        self._reconnect_jitter = reconnect_jitter
+        self._reconnect_stagger_sec = reconnect_stagger_sec
+
+        # --- Subscription State ---
+        # Desired subscriptions live in the subclasses; these track what the current
+        # connection has actually been sent, so only the difference is ever sent.
+        self._subscription_lock = asyncio.Lock()
+        self._acked_subscriptions: Set[Tuple[str, Tuple[Any, ...]]] = set()
+        self._inflight_subscriptions: Set[Tuple[str, Tuple[Any, ...]]] = set()
+
+        # Handlers only enqueue mapped events; a dispatcher task feeds them to the callback,
+        # so a slow consumer never holds up reading from the socket.
+        # Queue items are (event, receive ns, emit ns); the stamps are 0 when latency is not tracked.
+        self._dispatch_queue = BoundedDispatchQueue(
+            self._dispatch_queued, maxsize=queue_maxsize, policy=overflow_policy,
+            key_func=lambda item: default_conflation_key(item[0]),
+            on_error=self._on_consumer_error, name=f"{self.stream_name}_Queue"
+        )
         
         logger.info(f"BaseTopStepXStream '{self.stream_name}' initialized for URL: {self._raw_hub_url}")
 
     def _build_url_with_token(self) -> str:
-        base_url = f"wss://{self._raw_hub_url}" if not self._raw_hub_url.startswith("wss://") else self._raw_hub_url
+        # Hub URLs are configured without a scheme; an explicit ws:// (e.g. a local test hub) is kept.
+        base_url = self._raw_hub_url if self._raw_hub_url.startswith(("wss://", "ws://")) else f"wss://{self._raw_hub_url}"
         return f"{base_url}?access_token={self._current_token}"
 
+    async def _emit(self, event: GenericStreamEvent):
+        """Hands a mapped event to the dispatch queue, applying its overflow policy."""
+        if self.latency_tracker is None:
+            await self._dispatch_queue.put((event, 0, 0))
+        else:
+            await self._dispatch_queue.put((event, self._current_recv_ns, time.time_ns()))
+
+    async def _dispatch_queued(self, item):
+        event, recv_ns, emit_ns = item
+        if not recv_ns or self.latency_tracker is None:
+            await self._deliver_event(event)
+            return
+        dispatch_ns = time.time_ns()
+        await self._deliver_event(event)
+        self.latency_tracker.observe(
+            self.stream_name, event.event_type.value, event.timestamp_event_utc,
+            recv_ns, emit_ns, dispatch_ns, time.time_ns()
+        )
+
+    async def _deliver_event(self, event: GenericStreamEvent):
+        """Runs on the dispatcher task for each queued event."""
+        await self.event_callback(event)
+
+    async def _on_consumer_error(self, error: Exception):
+        await self.error_callback(self.stream_name, error)
+
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        return self._dispatch_queue.metrics()
+
+    async def wait_until_idle(self):
+        """Waits until every message received so far has been handled and delivered to the callback."""
+        await self._dispatch_queue.wait_idle()
+
     async def _update_status(self, new_status: StreamConnectionStatus, reason: Optional[str] = None):
         if self.current_status != new_status:
             old_status = self.current_status
@@ -56,6 +164,9 @@ class _BaseTopStepXStream:
         self._reconnect_delay_sec = 2.0
         self._consecutive_auth_failures = 0
         logger.info(f"{self.stream_name} connection successful. Resilience counters reset.")
+        # A new connection holds no subscriptions; resend everything that is desired.
+        self._acked_subscriptions.clear()
+        self._inflight_subscriptions.clear()
         await self._send_pending_subscriptions()
 
     async def _pysignalr_on_close(self):
@@ -86,12 +197,14 @@ class _BaseTopStepXStream:
                     break
                 
                 # Backoff logic for a normal disconnect
-                logger.warning(f"'{self.stream_name}' session ended. Attempting reconnect in {self._reconnect_delay_sec:.1f}s...")
-                await asyncio.sleep(self._reconnect_delay_sec)
-                self._reconnect_delay_sec = min(self._reconnect_delay_sec * 2, self._max_reconnect_delay_sec)
+                delay = self._next_reconnect_delay()
+                logger.warning(f"'{self.stream_name}' session ended. Attempting reconnect in {delay:.1f}s...")
+                await asyncio.sleep(delay)
 
             except AuthenticationError as e:
                 self._consecutive_auth_failures += 1
+                # Make the next attempt fetch a new token rather than retry the one that failed.
+                self._rejected_token = self._current_token
                 logger.error(f"Authentication failure #{self._consecutive_auth_failures} for '{self.stream_name}': {e}")
                 await self.error_callback(self.stream_name, e)
 
@@ -105,9 +218,9 @@ class _BaseTopStepXStream:
                     self._is_manually_stopping = True  # Break the loop permanently
                 else:
                     # Still within threshold, apply backoff and retry
-                    logger.warning(f"Attempting reconnect after auth failure in {self._reconnect_delay_sec:.1f}s...")
-                    await asyncio.sleep(self._reconnect_delay_sec)
-                    self._reconnect_delay_sec = min(self._reconnect_delay_sec * 2, self._max_reconnect_delay_sec)
+                    delay = self._next_reconnect_delay()
+                    logger.warning(f"Attempting reconnect after auth failure in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
             
             except asyncio.CancelledError:
                 logger.info(f"'{self.stream_name}' resilient run task was cancelled.")
@@ -119,18 +232,36 @@ class _BaseTopStepXStream:
                 await self.error_callback(self.stream_name, e)
                 
                 # Apply backoff and retry
-                logger.warning(f"Attempting reconnect after transient error in {self._reconnect_delay_sec:.1f}s...")
-                await asyncio.sleep(self._reconnect_delay_sec)
-                self._reconnect_delay_sec = min(self._reconnect_delay_sec * 2, self._max_reconnect_delay_sec)
-
+                delay = self._next_reconnect_delay()
+                logger.warning(f"Attempting reconnect after transient error in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+    def _next_reconnect_delay(self) -> float:
+        """Returns the jittered, staggered delay before the next attempt and doubles the base backoff."""
+        delay = self._reconnect_delay_sec * (1 + random.uniform(0, self._reconnect_jitter)) + self._reconnect_stagger_sec
+        self._reconnect_delay_sec = min(self._reconnect_delay_sec * 2, self._max_reconnect_delay_sec)
+        return delay
+
+    async def _on_main_loop(self, coro: Awaitable[Any]) -> Any:
+        return await (self._main_loop_runner(coro) if self._main_loop_runner else coro)
+
+    async def _refresh_token(self):
+        if self._token_provider is None:
+            return
+        try:
+            self._current_token = await self._on_main_loop(self._token_provider(self._rejected_token))
+        except AuthenticationError as e:
+            await self._update_status(StreamConnectionStatus.ERROR, f"Token refresh failed: {str(e)[:100]}")
+            raise
+        self._rejected_token = None
 
     async def _run_single_session(self):
         """ Manages a single connection attempt and its lifetime. """
-        if self._session_task and not self._session_task.done():
-            self._session_task.cancel()
+        self._cancel_session()
 
         await self._update_status(StreamConnectionStatus.CONNECTING)
 
+        await self._refresh_token()
         if not self._current_token:
             err = AuthenticationError("Cannot start stream: token is missing.")
             await self._update_status(StreamConnectionStatus.ERROR, err.args[0])
@@ -138,7 +269,10 @@ class _BaseTopStepXStream:
             raise err
 
         hub_url_with_token = self._build_url_with_token()
-        self.connection = SignalRClient(hub_url_with_token)
+        if self._connection_factory:
+            self.connection = self._connection_factory(self, hub_url_with_token)
+        else:
+            self.connection = SignalRClient(hub_url_with_token)
         self.connection.on_open(self._on_open_and_subscribe)
         self.connection.on_close(self._pysignalr_on_close)
         self.connection.on_error(self._pysignalr_on_error)
@@ -148,10 +282,16 @@ class _BaseTopStepXStream:
             logger.info(f"'{self.stream_name}' starting new connection session...")
             # PysignalR's run() method can raise exceptions on connection failure.
             # These are caught by the run_forever loop.
+            self._session_cancel_requested = False
             self._session_task = asyncio.create_task(self.connection.run(), name=f"{self.stream_name}_Session")
             await self._session_task
         except asyncio.CancelledError:
+            if self._is_manually_stopping or not self._session_cancel_requested:
+                # disconnect(), or run_forever() itself was cancelled rather than just the session; let it stop.
+                raise
             logger.info(f"'{self.stream_name}' session task cancelled.")
+        except PySignalRAuthorizationError as e:
+            raise AuthenticationError(f"'{self.stream_name}' hub rejected the access token.") from e
         except Exception as e:
             # Re-raising allows the resilient loop to handle all exceptions uniformly.
             raise e
@@ -160,19 +300,20 @@ class _BaseTopStepXStream:
             if not self._is_manually_stopping:
                 await self._update_status(StreamConnectionStatus.DISCONNECTED, "Session finished unexpectedly")
 
+    def _cancel_session(self) -> None:
+        """Cancels the current session, if any; run_forever() then reconnects unless it is stopping."""
+        if self._session_task and not self._session_task.done():
+            self._session_cancel_requested = True
+            self._session_task.cancel()
+
     async def disconnect(self):
         if self._is_manually_stopping: return
         self._is_manually_stopping = True
         await self._update_status(StreamConnectionStatus.STOPPING, "Client requested disconnect")
 
-        if self._session_task and not self._session_task.done():
-            self._session_task.cancel()
+        self._cancel_session()
         
-        # Also cancel any supervised handler tasks that might be running
-        if hasattr(self, '_handler_tasks') and isinstance(self._handler_tasks, set):
-            # Create a list from the set to avoid issues with changing set size during iteration
-            for task in list(self._handler_tasks):
-                task.cancel()
+        await self._dispatch_queue.stop()
         
         # Explicitly stop the connection if it exists
         if self.connection:
@@ -183,48 +324,189 @@ class _BaseTopStepXStream:
                 
         await self._update_status(StreamConnectionStatus.STOPPED, "Client disconnect complete")
 
+    async def _on_subscription_completed(self, connection: Any, method: str, args: Tuple[Any, ...], message: Any):
+        """Completion callback of a subscribe command: acknowledges it, or reports the hub's error."""
+        # Ignore completions from a replaced connection, and for commands revoked by an unsubscribe meanwhile.
+        if connection is not self.connection or (method, args) not in self._inflight_subscriptions:
+            return
+        self._inflight_subscriptions.discard((method, args))
+        error = getattr(message, "error", None)
+        if error:
+            logger.error(f"{self.stream_name} hub rejected '{method}' with args {list(args)}: {error}")
+            await self.error_callback(self.stream_name, TradeForgeConnectionError(f"Hub rejected {method}{list(args)}: {error}"))
+            return
+        self._acked_subscriptions.add((method, args))
+
+    def _register(self, method: str, handler: Callable[[List[Any]], Awaitable[None]]):
+        """
+        Registers a hub method handler. When a recorder or latency tracker is attached, each
+        raw message is first stamped with its receive time (and recorded).
+        """
+        recorder = self.recorder
+        if recorder is None and self.latency_tracker is None:
+            self.connection.on(method, handler)
+            return
+
+        async def _stamped(args: List[Any]):
+            recv_ns = self._current_recv_ns = time.time_ns()
+            if recorder is not None:
+                recorder.record(self.stream_name, method, args, recv_ns)
+            await handler(args)
+        self.connection.on(method, _stamped)
+
     def _register_specific_handlers(self): raise NotImplementedError
-    async def _send_pending_subscriptions(self): raise NotImplementedError
+    def _desired_subscriptions(self) -> List[SubscriptionCommand]: raise NotImplementedError
 
-    async def _invoke_subscription_command(self, method: str, args: List[Any], log_name: str) -> bool:
+    async def _send_pending_subscriptions(self):
+        """
+        Sends the subscribe commands that are desired but not yet acknowledged on the
+        current connection, with up to `_MAX_CONCURRENT_SUBSCRIPTION_SENDS` in flight.
+        """
+        async with self._subscription_lock:
+            commands = [
+                cmd for cmd in self._desired_subscriptions()
+                if (cmd[0], cmd[1]) not in self._acked_subscriptions and (cmd[0], cmd[1]) not in self._inflight_subscriptions
+            ]
+            # Claim the commands before awaiting so concurrent callers never send the same one twice.
+            self._inflight_subscriptions.update((method, args) for method, args, _ in commands)
+        if not commands:
+            return
+
+        semaphore = asyncio.Semaphore(self._MAX_CONCURRENT_SUBSCRIPTION_SENDS)
+
+        async def _send(method: str, args: Tuple[Any, ...], log_name: str):
+            async with semaphore:
+                # Stays in flight until the hub's completion arrives; see _on_subscription_completed().
+                if not await self._invoke_subscription_command(method, list(args), log_name, await_completion=True):
+                    self._inflight_subscriptions.discard((method, args))
+
+        logger.info(f"{self.stream_name} sending {len(commands)} subscription command(s).")
+        await asyncio.gather(*(_send(*cmd) for cmd in commands))
+
+    async def _invoke_subscription_command(self, method: str, args: List[Any], log_name: str, await_completion: bool = False) -> bool:
+        """
+        Sends one hub command; returns False if it could not be sent. With `await_completion`,
+        the command is only acknowledged once the hub's completion message reports success.
+        """
         if self.current_status != StreamConnectionStatus.CONNECTED: logger.warning(f"Cannot subscribe '{log_name}' on {self.stream_name}: not connected."); return False
         try:
             logger.info(f"{self.stream_name} sending command: '{method}' with args {args}")
-            await self.connection.send(method, args); return True
+            if await_completion:
+                on_completion = partial(self._on_subscription_completed, self.connection, method, tuple(args))
+                await self.connection.send(method, args, on_invocation=on_completion)
+            else:
+                await self.connection.send(method, args)
+            revoked = self._UNSUBSCRIBE_REVOKES.get(method)
+            if revoked:
+                self._acked_subscriptions.discard((revoked, tuple(args)))
+                self._inflight_subscriptions.discard((revoked, tuple(args)))
+            return True
         except Exception as e:
             await self._update_status(StreamConnectionStatus.ERROR, f"Subscription failed for {method}"); await self.error_callback(self.stream_name, e); return False
 
 class TopStepXMarketStreamInternal(_BaseTopStepXStream):
-    def __init__(self, *args, mapper: Any, **kwargs):
+    # Hub feed -> (subscribe, unsubscribe) method. DEPTH also carries ORDER_BOOK subscriptions.
+    _FEED_COMMANDS = {
+        MarketDataType.QUOTE: ("SubscribeContractQuotes", "UnsubscribeContractQuotes"),
+        MarketDataType.DEPTH: ("SubscribeContractMarketDepth", "UnsubscribeContractMarketDepth"),
+        MarketDataType.TRADE: ("SubscribeContractTrades", "UnsubscribeContractTrades"),
+    }
+
+    def __init__(self, *args, mapper: Any, tick_scales: Optional[Dict[str, TickScale]] = None,
+                 conflator: Optional[EventConflator] = None, watchdog: Optional[StalenessWatchdog] = None, **kwargs):
         super().__init__(*args, **kwargs)
         self.pending_subscriptions: Dict[str, Set[MarketDataType]] = {}
         self.mapper = mapper
-        self._subscription_lock = asyncio.Lock()
+        # Order books maintained in place for contracts subscribed with MarketDataType.ORDER_BOOK.
+        self.order_books: Dict[str, OrderBook] = {}
+        self._tick_scales = tick_scales if tick_scales is not None else {}
+        # Quotes and depth pass through the conflator so slow consumers get the latest state, not a backlog.
+        self.conflator = conflator if conflator is not None else EventConflator(self.event_callback, name=f"{self.stream_name}_Conflator")
+        # Flags (contract, feed) pairs that go quiet while connected; may be shared by several streams.
+        self.watchdog = watchdog
+        self._watched_feeds: Set[Tuple[str, MarketDataType]] = set()
+
+    def get_order_book(self, contract_id: str) -> Optional[OrderBook]:
+        return self.order_books.get(contract_id)
+
+    async def _on_open_and_subscribe(self):
+        # Depth deltas received before the disconnect no longer describe the book; start from empty.
+        for book in self.order_books.values():
+            book.clear()
+        await super()._on_open_and_subscribe()
+
+    async def _deliver_event(self, event: GenericStreamEvent):
+        await self.conflator.submit(event)
+
+    async def disconnect(self):
+        await self.conflator.close()
+        await super().disconnect()
+
+    async def _update_status(self, new_status: StreamConnectionStatus, reason: Optional[str] = None):
+        was_connected = self.current_status == StreamConnectionStatus.CONNECTED
+        await super()._update_status(new_status, reason)
+        # A dead connection is reported by status changes; only watch feeds while connected.
+        if was_connected != (new_status == StreamConnectionStatus.CONNECTED):
+            self._sync_watchdog()
+
+    def _feed_keys(self) -> Set[Tuple[str, MarketDataType]]:
+        keys = set()
+        for contract_id, data_types in self.pending_subscriptions.items():
+            for data_type in data_types:
+                keys.add((contract_id, MarketDataType.DEPTH if data_type == MarketDataType.ORDER_BOOK else data_type))
+        return keys
+
+    def _sync_watchdog(self):
+        if self.watchdog is None:
+            return
+        desired = self._feed_keys() if self.current_status == StreamConnectionStatus.CONNECTED else set()
+        for key in self._watched_feeds - desired:
+            self.watchdog.unwatch(key)
+        for key in desired - self._watched_feeds:
+            self.watchdog.watch(key)
+        self._watched_feeds = desired
+
+    async def resubscribe_feed(self, contract_id: str, data_type: MarketDataType) -> bool:
+        """
+        Unsubscribes and resubscribes the single hub feed behind (contract, data type),
+        e.g. after the watchdog found it silent. Returns False if there is nothing to resend.
+        """
+        feed = MarketDataType.DEPTH if data_type == MarketDataType.ORDER_BOOK else data_type
+        if self.current_status != StreamConnectionStatus.CONNECTED or (contract_id, feed) not in self._feed_keys():
+            return False
+        subscribe, unsubscribe = self._FEED_COMMANDS[feed]
+        async with self._subscription_lock:
+            await self._invoke_subscription_command(unsubscribe, [contract_id], f"Resubscribe {feed.value} for {contract_id}")
+            # Resend even if the unsubscribe failed; a duplicate subscribe is harmless on the hub.
+            self._acked_subscriptions.discard((subscribe, (contract_id,)))
+        await self._send_pending_subscriptions()
+        return True
 
     def _register_specific_handlers(self):
         if not self.connection: return
-        self.connection.on("GatewayQuote", self._handle_ts_quote)
-        self.connection.on("GatewayTrade", self._handle_ts_trade)
-        self.connection.on("GatewayDepth", self._handle_ts_depth)
+        self._register("GatewayQuote", self._handle_ts_quote)
+        self._register("GatewayTrade", self._handle_ts_trade)
+        self._register("GatewayDepth", self._handle_ts_depth)
 
-    async def _send_pending_subscriptions(self):
-        async with self._subscription_lock:
-            # Create a copy of items to iterate over, as the dict can change.
-            pending_items = list(self.pending_subscriptions.items())
-        
-        for contract_id, data_types in pending_items:
+    def _desired_subscriptions(self) -> List[SubscriptionCommand]:
+        commands: List[SubscriptionCommand] = []
+        for contract_id, data_types in self.pending_subscriptions.items():
             if MarketDataType.QUOTE in data_types:
-                await self._invoke_subscription_command("SubscribeContractQuotes", [contract_id], f"Quotes for {contract_id}")
-            if MarketDataType.DEPTH in data_types:
-                await self._invoke_subscription_command("SubscribeContractMarketDepth", [contract_id], f"Depth for {contract_id}")
+                commands.append(("SubscribeContractQuotes", (contract_id,), f"Quotes for {contract_id}"))
+            if MarketDataType.DEPTH in data_types or MarketDataType.ORDER_BOOK in data_types:
+                commands.append(("SubscribeContractMarketDepth", (contract_id,), f"Depth for {contract_id}"))
             if MarketDataType.TRADE in data_types:
-                await self._invoke_subscription_command("SubscribeContractTrades", [contract_id], f"Trades for {contract_id}")
+                commands.append(("SubscribeContractTrades", (contract_id,), f"Trades for {contract_id}"))
+        return commands
 
     async def subscribe_contract(self, contract_id: str, data_types: List[MarketDataType]):
         async with self._subscription_lock:
             if contract_id not in self.pending_subscriptions:
                 self.pending_subscriptions[contract_id] = set()
             self.pending_subscriptions[contract_id].update(data_types)
+            if MarketDataType.ORDER_BOOK in data_types and contract_id not in self.order_books:
+                self.order_books[contract_id] = OrderBook(contract_id, self._tick_scales.get(contract_id))
+        self._sync_watchdog()
         
         if self.current_status == StreamConnectionStatus.CONNECTED:
             await self._send_pending_subscriptions()
@@ -236,20 +518,37 @@ class TopStepXMarketStreamInternal(_BaseTopStepXStream):
                 return
 
             types_to_remove = set()
+            sent_commands = set()
+            current_types = self.pending_subscriptions.get(contract_id, set())
             for data_type in data_types:
                 command = None
                 if data_type == MarketDataType.QUOTE:
                     command = "UnsubscribeContractQuotes"
-                elif data_type == MarketDataType.DEPTH:
+                elif data_type in (MarketDataType.DEPTH, MarketDataType.ORDER_BOOK):
+                    # DEPTH and ORDER_BOOK share one hub subscription; only drop it when neither remains.
+                    other = MarketDataType.ORDER_BOOK if data_type == MarketDataType.DEPTH else MarketDataType.DEPTH
+                    if other in current_types and other not in data_types:
+                        if data_type in current_types:
+                            types_to_remove.add(data_type)
+                        continue
                     command = "UnsubscribeContractMarketDepth"
                 elif data_type == MarketDataType.TRADE:
                     command = "UnsubscribeContractTrades"
                 
                 if command:
                     if data_type in self.pending_subscriptions.get(contract_id, set()):
+                        if command in sent_commands:
+                            types_to_remove.add(data_type)
+                            continue
+                        if self.current_status != StreamConnectionStatus.CONNECTED:
+                            # Nothing is held server-side without a connection; just drop the desired state
+                            # so it is not resubscribed on reconnect (e.g. after a shard rebalance).
+                            types_to_remove.add(data_type)
+                            continue
                         log_msg = f"Unsubscribe {data_type.value} for {contract_id}"
                         success = await self._invoke_subscription_command(command, [contract_id], log_msg)
                         if success:
+                            sent_commands.add(command)
                             types_to_remove.add(data_type)
                     else:
                         logger.debug(f"Skipping unsubscribe for {data_type.value} on {contract_id}: not in pending subscriptions.")
@@ -257,104 +556,182 @@ class TopStepXMarketStreamInternal(_BaseTopStepXStream):
             if types_to_remove:
                 self.pending_subscriptions[contract_id].difference_update(types_to_remove)
                 logger.info(f"Updated pending subscriptions for {contract_id}: removed {types_to_remove}")
+                if MarketDataType.ORDER_BOOK in types_to_remove:
+                    self.order_books.pop(contract_id, None)
                 
                 if not self.pending_subscriptions[contract_id]:
                     del self.pending_subscriptions[contract_id]
                     logger.info(f"Removed contract {contract_id} from all market subscriptions.")
+                self._sync_watchdog()
 
     async def _handle_ts_quote(self, args: List[Any]):
         if self.mapper and len(args) == 2 and isinstance(args[0], str) and isinstance(args[1], dict):
+            if self.watchdog: self.watchdog.touch((args[0], MarketDataType.QUOTE))
             event = self.mapper.map_ts_quote_to_generic_event(args[0], args[1], self.stream_name)
-            if event: await self.event_callback(event)
+            if event: await self._emit(event)
 
     async def _handle_ts_trade(self, args: List[Any]):
         if self.mapper and len(args) == 2 and isinstance(args[0], str) and isinstance(args[1], dict):
+            if self.watchdog: self.watchdog.touch((args[0], MarketDataType.TRADE))
             event = self.mapper.map_ts_market_trade_to_generic_event(args[0], args[1], self.stream_name)
-            if event: await self.event_callback(event)
+            if event: await self._emit(event)
 
     async def _handle_ts_depth(self, args: List[Any]):
         if self.mapper and len(args) == 2 and isinstance(args[0], str) and isinstance(args[1], list):
-            event = self.mapper.map_ts_depth_to_generic_event(args[0], args[1], self.stream_name)
-            if event: await self.event_callback(event)
+            contract_id = args[0]
+            if self.watchdog: self.watchdog.touch((contract_id, MarketDataType.DEPTH))
+            book = self.order_books.get(contract_id)
+            if book is not None:
+                book_event = self.mapper.apply_ts_depth_to_order_book(book, args[1], self.stream_name)
+                if book_event: await self._emit(book_event)
+                # Skip building level lists when the contract only asked for the maintained book.
+                if MarketDataType.DEPTH not in self.pending_subscriptions.get(contract_id, ()):
+                    return
+            event = self.mapper.map_ts_depth_to_generic_event(contract_id, args[1], self.stream_name)
+            if event: await self._emit(event)
 
 class TopStepXUserStreamInternal(_BaseTopStepXStream):
-    def __init__(self, *args, mapper: Any, **kwargs):
+    # Inbox marker that runs a resync; queued on reconnect ahead of the new connection's messages.
+    _RESYNC = "__resync__"
+    _RESYNC_TIMEOUT_SEC = 30.0
+
+    # Hub method -> mapper function for each user event this stream handles.
+    _EVENT_MAPPERS = {
+        "GatewayUserOrder": "map_ts_order_update_to_generic_event",
+        "GatewayUserPosition": "map_ts_position_update_to_generic_event",
+        "GatewayUserAccount": "map_ts_account_update_to_generic_event",
+        "GatewayUserTrade": "map_ts_user_trade_to_generic_event",
+    }
+
+    _ACCOUNT_FEED_SUBSCRIBE = {
+        UserDataType.ORDER_UPDATE: "SubscribeOrders",
+        UserDataType.POSITION_UPDATE: "SubscribePositions",
+        UserDataType.USER_TRADE: "SubscribeTrades",
+    }
+
+    def __init__(self, *args, mapper: Any, resync: Optional[UserStateResync] = None, **kwargs):
         super().__init__(*args, **kwargs)
         self.pending_account_subscriptions: Dict[str, Set[UserDataType]] = {}
         self.pending_global_subscription = False
         self.mapper = mapper
-        self._subscription_lock = asyncio.Lock()
-        self._handler_tasks: Set[asyncio.Task] = set()
-
-    async def _launch_and_supervise_handler(self, coro: Awaitable[None]):
+        # Raw hub messages in arrival order. A single worker maps and emits them, so order,
+        # position and fill updates are never reordered and no task is created per message.
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._worker_task: Optional[asyncio.Task] = None
+        # Catches consumers up on order, position and fill changes missed while disconnected.
+        self.resync = resync
+        self._disconnected_at: Optional[datetime] = None
+
+    def _ensure_worker(self):
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._run_worker(), name=f"{self.stream_name}_Worker")
+
+    async def _run_worker(self):
         """
-        Creates, runs, and supervises a background task for a specific event handler.
-        If the handler task fails with an exception, it logs the error and
-        triggers a cancellation of the main stream session to force a reconnect.
+        Supervised consumer for the inbox.
+        If handling a message fails, the error is logged and reported via the error
+        callback, and the main stream session is cancelled to force a clean reconnect
+        rather than continuing in a broken, partial state. The worker itself keeps
+        running so messages from the next session are handled in order.
         """
+        while True:
+            mapper_func_name, args, self._current_recv_ns = await self._inbox.get()
+            try:
+                if mapper_func_name == self._RESYNC:
+                    await self._resync_after_reconnect(args)
+                else:
+                    await self._handle_generic_user_event(args, mapper_func_name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Unhandled exception in stream handler for '{self.stream_name}': {e}", exc_info=True)
+                await self.error_callback(self.stream_name, e)
+                if self._session_task and not self._session_task.done():
+                    logger.warning(f"Cancelling main stream session for '{self.stream_name}' due to handler failure.")
+                    self._cancel_session()
+            finally:
+                self._inbox.task_done()
+
+    async def _update_status(self, new_status: StreamConnectionStatus, reason: Optional[str] = None):
+        if self.current_status == StreamConnectionStatus.CONNECTED and new_status != StreamConnectionStatus.CONNECTED:
+            self._disconnected_at = datetime.now(UTC_TZ)
+        await super()._update_status(new_status, reason)
+
+    async def _on_open_and_subscribe(self):
+        if self.resync and self._disconnected_at is not None:
+            # Queued before any message of the new connection can arrive, so the worker emits
+            # the catch-up events first and live updates resume after them.
+            self._inbox.put_nowait((self._RESYNC, self._disconnected_at, 0))
+            self._ensure_worker()
+            self._disconnected_at = None
+        await super()._on_open_and_subscribe()
+
+    async def _resync_after_reconnect(self, since: datetime):
+        subscriptions = {acc: set(types) for acc, types in self.pending_account_subscriptions.items() if types}
+        if not subscriptions:
+            return
+        logger.info(f"'{self.stream_name}' resynchronizing {len(subscriptions)} account(s) after reconnect (gap since {since.isoformat()}).")
         try:
-            # Create a task to run the actual handler logic (e.g., mapping data).
-            task = asyncio.create_task(coro)
-            # Add the task to our tracking set for cleanup during disconnect.
-            self._handler_tasks.add(task)
-            # When the task is done (completes or fails), remove it from the set.
-            task.add_done_callback(self._handler_tasks.discard)
-            
-            # Await the task. This is the key part that allows us to catch its exception.
-            await task
+            # The resync diffs against the provider's account state; let every earlier event reach it first.
+            await self._dispatch_queue.wait_idle()
+            events = await asyncio.wait_for(self._on_main_loop(self.resync.resync(subscriptions, since)), self._RESYNC_TIMEOUT_SEC)
         except asyncio.CancelledError:
-            # Don't treat cancellation as a critical failure.
-            pass
+            raise
         except Exception as e:
-            # An unhandled exception occurred within the handler coroutine.
-            # This is a critical failure for this stream.
-            logger.error(f"Unhandled exception in stream handler task for '{self.stream_name}': {e}", exc_info=True)
-            # Report the specific error via the main error callback.
-            await self.error_callback(self.stream_name, e)
-            
-            # Trigger a full, clean reconnect by cancelling the main session task.
-            # This prevents the stream from continuing in a broken, partial state.
-            if self._session_task and not self._session_task.done():
-                logger.warning(f"Cancelling main stream session for '{self.stream_name}' due to handler task failure.")
-                self._session_task.cancel()
+            # Live flow continues; consumers are told their view may be missing updates from the gap.
+            logger.error(f"'{self.stream_name}' resync failed: {e}", exc_info=True)
+            await self.error_callback(self.stream_name, TradeForgeConnectionError(f"User data resync after reconnect failed: {e}"))
+            return
+        for event in events:
+            await self._emit(event)
+
+    def _make_inbox_handler(self, mapper_func_name: str) -> Callable[[List[Any]], Awaitable[None]]:
+        async def _enqueue(args: List[Any]):
+            self._inbox.put_nowait((mapper_func_name, args, self._current_recv_ns))
+            self._ensure_worker()
+        return _enqueue
 
     def _register_specific_handlers(self):
         if not self.connection: return
+        # Registration only enqueues, so the receive loop is never blocked by mapping.
+        for hub_method, mapper_func_name in self._EVENT_MAPPERS.items():
+            self._register(hub_method, self._make_inbox_handler(mapper_func_name))
 
-        # This helper function ensures that our supervisor itself is launched
-        # in the background, allowing the `on` registration to complete instantly.
-        def create_supervised_task(handler_coro: Awaitable[None]):
-            asyncio.create_task(self._launch_and_supervise_handler(handler_coro))
-        
-        # Replace the direct "fire-and-forget" task creation with our supervised version.
-        self.connection.on("GatewayUserOrder", 
-            lambda args: create_supervised_task(self._handle_generic_user_event(args, "map_ts_order_update_to_generic_event")))
-        self.connection.on("GatewayUserPosition", 
-            lambda args: create_supervised_task(self._handle_generic_user_event(args, "map_ts_position_update_to_generic_event")))
-        self.connection.on("GatewayUserAccount", 
-            lambda args: create_supervised_task(self._handle_generic_user_event(args, "map_ts_account_update_to_generic_event")))
-        self.connection.on("GatewayUserTrade", 
-            lambda args: create_supervised_task(self._handle_generic_user_event(args, "map_ts_user_trade_to_generic_event")))
+    async def wait_until_idle(self):
+        await self._inbox.join()
+        await super().wait_until_idle()
 
-    async def _send_pending_subscriptions(self):
-        async with self._subscription_lock:
-            # Create a copy of state to iterate over
-            is_global_sub = self.pending_global_subscription
-            pending_accs = list(self.pending_account_subscriptions.items())
-
-        if is_global_sub:
-            await self._invoke_subscription_command("SubscribeAccounts", [], "Global Accounts")
-        
-        for acc_id_str, data_types in pending_accs:
+    async def disconnect(self):
+        if self._worker_task and not self._worker_task.done():
+            self._worker_task.cancel()
+        await super().disconnect()
+
+    def _desired_subscriptions(self) -> List[SubscriptionCommand]:
+        commands: List[SubscriptionCommand] = []
+        if self.pending_global_subscription:
+            commands.append(("SubscribeAccounts", (), "Global Accounts"))
+        for acc_id_str, data_types in self.pending_account_subscriptions.items():
             try:
                 acc_id_int = int(acc_id_str)
-                # Resubscribe based on the stored desired state.
-                if UserDataType.ORDER_UPDATE in data_types: await self._invoke_subscription_command("SubscribeOrders", [acc_id_int], f"Orders for Acc {acc_id_int}")
-                if UserDataType.POSITION_UPDATE in data_types: await self._invoke_subscription_command("SubscribePositions", [acc_id_int], f"Positions for Acc {acc_id_int}")
-                if UserDataType.USER_TRADE in data_types: await self._invoke_subscription_command("SubscribeTrades", [acc_id_int], f"UserTrades for Acc {acc_id_int}")
             except ValueError:
                 continue
+            if UserDataType.ORDER_UPDATE in data_types: commands.append(("SubscribeOrders", (acc_id_int,), f"Orders for Acc {acc_id_int}"))
+            if UserDataType.POSITION_UPDATE in data_types: commands.append(("SubscribePositions", (acc_id_int,), f"Positions for Acc {acc_id_int}"))
+            if UserDataType.USER_TRADE in data_types: commands.append(("SubscribeTrades", (acc_id_int,), f"UserTrades for Acc {acc_id_int}"))
+        return commands
     
+    def is_feed_live(self, data_type: UserDataType, account_id_str: Optional[str] = None) -> bool:
+        """True while connected with the hub's subscription for this feed (and account) acknowledged."""
+        if self.current_status != StreamConnectionStatus.CONNECTED:
+            return False
+        if data_type == UserDataType.ACCOUNT_UPDATE:
+            return ("SubscribeAccounts", ()) in self._acked_subscriptions
+        method = self._ACCOUNT_FEED_SUBSCRIBE.get(data_type)
+        try:
+            return method is not None and (method, (int(account_id_str),)) in self._acked_subscriptions
+        except (TypeError, ValueError):
+            return False
+
     async def subscribe_global_accounts(self):
         async with self._subscription_lock:
             self.pending_global_subscription = True
@@ -423,4 +800,7 @@ class TopStepXUserStreamInternal(_BaseTopStepXStream):
             mapper_func = getattr(self.mapper, mapper_func_name, None)
             if mapper_func:
                 event = mapper_func(args[0], self.stream_name)
-                if event: await self.event_callback(event)
\ No newline at end of file
+                if event:
+                    if self.resync:
+                        self.resync.observe(event)
+                    await self._emit(event)
\ No newline at end of file
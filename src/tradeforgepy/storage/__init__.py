@@ -0,0 +1,6 @@
+# ==============================================================================
+# tradeforgepy/tradeforgepy/storage/__init__.py
+# ==============================================================================
+from .history_store import HistoryStore
+
+__all__ = ["HistoryStore"]
@@ -0,0 +1,205 @@
+# tradeforgepy/storage/history_store.py
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from tradeforgepy.core.account_state import OPEN_ORDER_STATUSES
+from tradeforgepy.core.models_generic import Order, Trade
+from tradeforgepy.utils.lazy_sequence import LazyMappedList
+from tradeforgepy.utils.time_utils import ensure_utc, UTC_TZ
+
+ORDERS = "orders"
+TRADES = "trades"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    provider TEXT NOT NULL, account_id TEXT NOT NULL, order_id TEXT NOT NULL,
+    contract_id TEXT NOT NULL, created_us INTEGER NOT NULL, is_open INTEGER NOT NULL, data TEXT NOT NULL,
+    PRIMARY KEY (provider, account_id, order_id)
+);
+CREATE INDEX IF NOT EXISTS orders_by_time ON orders (provider, account_id, created_us);
+CREATE INDEX IF NOT EXISTS orders_by_contract ON orders (provider, account_id, contract_id, created_us);
+CREATE INDEX IF NOT EXISTS orders_open ON orders (provider, account_id, is_open, created_us);
+
+CREATE TABLE IF NOT EXISTS trades (
+    provider TEXT NOT NULL, account_id TEXT NOT NULL, trade_id TEXT NOT NULL,
+    contract_id TEXT NOT NULL, ts_us INTEGER NOT NULL, data TEXT NOT NULL,
+    PRIMARY KEY (provider, account_id, trade_id)
+);
+CREATE INDEX IF NOT EXISTS trades_by_time ON trades (provider, account_id, ts_us);
+CREATE INDEX IF NOT EXISTS trades_by_contract ON trades (provider, account_id, contract_id, ts_us);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    provider TEXT NOT NULL, account_id TEXT NOT NULL, kind TEXT NOT NULL,
+    covered_start_us INTEGER NOT NULL, covered_end_us INTEGER NOT NULL,
+    PRIMARY KEY (provider, account_id, kind)
+);
+"""
+
+
+def _to_us(dt: datetime) -> int:
+    dt = ensure_utc(dt)
+    return int(dt.timestamp()) * 1_000_000 + dt.microsecond
+
+
+def _from_us(us: int) -> datetime:
+    return datetime.fromtimestamp(us // 1_000_000, UTC_TZ).replace(microsecond=us % 1_000_000)
+
+
+class HistoryStore:
+    """
+    A local SQLite copy of order and trade history, so repeated range queries are
+    answered from indexed tables instead of the provider's REST API.
+
+    For every (provider, account, kind) the store remembers the contiguous time
+    range it has synced. `missing_ranges()` tells the caller which parts of a
+    query still have to be fetched; only those are downloaded and `save_*()`
+    upserts them and extends the range. Orders are keyed by creation time and
+    trades by fill time, matching the provider's history search.
+
+    Records are stored as their generic model's JSON and decoded lazily by the
+    query methods, which return `LazyMappedList`s like the REST mapping does.
+
+    All methods are blocking; async callers run them with `asyncio.to_thread()`.
+    A single connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Sync state ---
+
+    def coverage(self, provider: str, account_id: str, kind: str) -> Optional[Tuple[datetime, datetime]]:
+        """The synced (start, end) range for an account, or None before the first sync."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT covered_start_us, covered_end_us FROM sync_state WHERE provider=? AND account_id=? AND kind=?",
+                (provider, account_id, kind)
+            ).fetchone()
+        return (_from_us(row[0]), _from_us(row[1])) if row else None
+
+    def missing_ranges(self, provider: str, account_id: str, kind: str, start: datetime, end: datetime,
+                       overlap: timedelta = timedelta(0), refresh_from: Optional[datetime] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Returns the (start, end) ranges that must be fetched so that [start, end] is
+        covered. Coverage stays contiguous, so a query past the synced range also
+        fetches the gap up to it. Fetches past the end of coverage start `overlap`
+        earlier, for records the provider publishes late. `refresh_from` forces a
+        re-fetch from that time, e.g. for orders that were still open when stored.
+        """
+        covered = self.coverage(provider, account_id, kind)
+        if covered is None:
+            return [(start, end)] if start < end else []
+        covered_start, covered_end = covered
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        forward_from = covered_end - overlap if end > covered_end else None
+        if refresh_from is not None and refresh_from < end:
+            forward_from = refresh_from if forward_from is None else min(forward_from, refresh_from)
+        if forward_from is not None:
+            forward_from = max(forward_from, covered_start)
+            if forward_from < end:
+                ranges.append((forward_from, end))
+        return ranges
+
+    def _extend_coverage(self, provider: str, account_id: str, kind: str, start: datetime, end: datetime) -> None:
+        self._conn.execute(
+            "INSERT INTO sync_state (provider, account_id, kind, covered_start_us, covered_end_us) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (provider, account_id, kind) DO UPDATE SET "
+            "covered_start_us=MIN(covered_start_us, excluded.covered_start_us), "
+            "covered_end_us=MAX(covered_end_us, excluded.covered_end_us)",
+            (provider, account_id, kind, _to_us(start), _to_us(end))
+        )
+
+    # --- Writes ---
+
+    def save_orders(self, provider: str, account_id: str, orders: Iterable[Order], start: datetime, end: datetime) -> int:
+        """Upserts the orders fetched for [start, end] and marks that range as synced."""
+        rows = [
+            (provider, account_id, o.provider_order_id, o.provider_contract_id, _to_us(o.created_at_utc),
+             int(o.status in OPEN_ORDER_STATUSES), o.model_dump_json())
+            for o in orders
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO orders (provider, account_id, order_id, contract_id, created_us, is_open, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._extend_coverage(provider, account_id, ORDERS, start, end)
+        return len(rows)
+
+    def save_trades(self, provider: str, account_id: str, trades: Iterable[Trade], start: datetime, end: datetime) -> int:
+        """Upserts the trades fetched for [start, end] and marks that range as synced."""
+        rows = [
+            (provider, account_id, t.provider_trade_id, t.provider_contract_id, _to_us(t.timestamp_utc), t.model_dump_json())
+            for t in trades
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trades (provider, account_id, trade_id, contract_id, ts_us, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._extend_coverage(provider, account_id, TRADES, start, end)
+        return len(rows)
+
+    # --- Reads ---
+
+    def oldest_open_order(self, provider: str, account_id: str, start: datetime, end: datetime) -> Optional[datetime]:
+        """Creation time of the oldest order in [start, end] that was still open when last synced."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(created_us) FROM orders WHERE provider=? AND account_id=? AND is_open=1 AND created_us BETWEEN ? AND ?",
+                (provider, account_id, _to_us(start), _to_us(end))
+            ).fetchone()
+        return _from_us(row[0]) if row and row[0] is not None else None
+
+    def get_order(self, provider: str, account_id: str, order_id: str) -> Optional[Order]:
+        """One stored order by id, whatever its creation time, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM orders WHERE provider=? AND account_id=? AND order_id=?", (provider, account_id, order_id)
+            ).fetchone()
+        return Order.model_validate_json(row[0]) if row else None
+
+    def query_orders(self, provider: str, account_id: str, start: datetime, end: datetime,
+                     contract_id: Optional[str] = None) -> LazyMappedList[Order]:
+        """Orders created in [start, end], oldest first."""
+        sql = "SELECT data FROM orders WHERE provider=? AND account_id=? AND created_us BETWEEN ? AND ?"
+        params = [provider, account_id, _to_us(start), _to_us(end)]
+        if contract_id:
+            sql += " AND contract_id=?"
+            params.append(contract_id)
+        with self._lock:
+            rows = [r[0] for r in self._conn.execute(sql + " ORDER BY created_us", params)]
+        return LazyMappedList(rows, Order.model_validate_json)
+
+    def query_trades(self, provider: str, account_id: str, start: datetime, end: datetime,
+                     contract_id: Optional[str] = None, limit: Optional[int] = None) -> LazyMappedList[Trade]:
+        """Trades filled in [start, end], oldest first; with `limit`, the newest `limit` trades, newest first."""
+        sql = "SELECT data FROM trades WHERE provider=? AND account_id=? AND ts_us BETWEEN ? AND ?"
+        params: list = [provider, account_id, _to_us(start), _to_us(end)]
+        if contract_id:
+            sql += " AND contract_id=?"
+            params.append(contract_id)
+        if limit:
+            sql += " ORDER BY ts_us DESC LIMIT ?"
+            params.append(limit)
+        else:
+            sql += " ORDER BY ts_us"
+        with self._lock:
+            rows = [r[0] for r in self._conn.execute(sql, params)]
+        return LazyMappedList(rows, Trade.model_validate_json)
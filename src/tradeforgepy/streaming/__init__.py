@@ -0,0 +1,19 @@
+# ==============================================================================
+# tradeforgepy/tradeforgepy/streaming/__init__.py
+# ==============================================================================
+from .conflation import EventConflator, CONFLATABLE_DATA_TYPES
+from .dispatcher import EventDispatcher, EventSubscription
+from .dispatch_queue import BoundedDispatchQueue
+from .hash_ring import ConsistentHashRing
+from .capture import CaptureRecorder, CaptureReader, CaptureRecord
+from .replay import ReplaySource, ReplayConnection
+from .latency import LatencyTracker, RollingHistogram
+from .watchdog import StalenessWatchdog, FeedStaleness
+from .loop_thread import StreamLoopThread
+
+__all__ = [
+    "EventConflator", "CONFLATABLE_DATA_TYPES", "EventDispatcher", "EventSubscription",
+    "BoundedDispatchQueue", "ConsistentHashRing", "CaptureRecorder", "CaptureReader", "CaptureRecord",
+    "ReplaySource", "ReplayConnection", "LatencyTracker", "RollingHistogram",
+    "StalenessWatchdog", "FeedStaleness", "StreamLoopThread",
+]
@@ -0,0 +1,195 @@
+# tradeforgepy/streaming/capture.py
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC, then records until EOF, all inside one gzip stream per file.
+# Each record: >I total payload length, then the payload:
+#   >qHH  receive time (ns since epoch), stream name length, method length
+#   stream name (utf-8), method (utf-8), hub message arguments (compact JSON, utf-8)
+MAGIC = b"TFCAP\x01"
+_LENGTH = struct.Struct(">I")
+_HEADER = struct.Struct(">qHH")
+FILE_SUFFIX = ".tfcap.gz"
+
+_STOP = object()
+
+
+class CaptureRecord(NamedTuple):
+    recv_ns: int
+    stream_name: str
+    method: str
+    args: List[Any]
+
+
+def encode_record(recv_ns: int, stream_name: str, method: str, args: Any) -> bytes:
+    name = stream_name.encode("utf-8")
+    meth = method.encode("utf-8")
+    body = json.dumps(args, separators=(",", ":"), default=str).encode("utf-8")
+    payload_len = _HEADER.size + len(name) + len(meth) + len(body)
+    return b"".join((_LENGTH.pack(payload_len), _HEADER.pack(recv_ns, len(name), len(meth)), name, meth, body))
+
+
+class CaptureRecorder:
+    """
+    Records inbound hub messages to append-only, length-prefixed, gzip-compressed files.
+
+    `record()` is called on the event loop and only timestamps the message and
+    puts it on a bounded queue; encoding, compression and file I/O happen on a
+    background thread, so recording never blocks the loop. If the writer falls
+    behind and the queue fills up, messages are dropped and counted rather than
+    stalling the stream.
+
+    Files are named `<prefix>_<UTC start time>_<seq>.tfcap.gz` and rotated once
+    they exceed `max_bytes` (compressed) or `max_seconds` of age.
+    """
+
+    def __init__(self, directory: str, prefix: str = "capture", max_bytes: int = 256 * 1024 * 1024,
+                 max_seconds: Optional[float] = 3600.0, compresslevel: int = 6,
+                 queue_size: int = 100000, flush_interval: float = 1.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compresslevel = compresslevel
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file_seq = 0
+
+        # --- Metrics (written by the loop thread and the writer thread respectively) ---
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.files: List[str] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer_loop, name="CaptureRecorder", daemon=True)
+        self._thread.start()
+        logger.info(f"Capture recorder writing to {self.directory}")
+
+    def record(self, stream_name: str, method: str, args: Any, recv_ns: Optional[int] = None) -> None:
+        """Queues one hub message for writing. Never blocks."""
+        try:
+            self._queue.put_nowait((recv_ns or time.time_ns(), stream_name, method, args))
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Writes everything queued so far, closes the current file and stops the writer thread. Blocking."""
+        if not self.is_running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # --- Writer thread ---
+
+    def _open_file(self):
+        self._file_seq += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(self.directory, f"{self.prefix}_{stamp}_{self._file_seq:04d}{FILE_SUFFIX}")
+        raw = open(path, "ab")
+        gz = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.compresslevel)
+        gz.write(MAGIC)
+        self.files.append(path)
+        logger.info(f"Capture recorder opened {path}")
+        return raw, gz, time.monotonic()
+
+    def _writer_loop(self) -> None:
+        raw, gz, opened_at = self._open_file()
+        dirty = False
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    if dirty:
+                        # Make everything written so far readable even if the process dies.
+                        gz.flush()
+                        dirty = False
+                    item = None
+
+                if item is _STOP:
+                    break
+                if item is not None:
+                    try:
+                        gz.write(encode_record(*item))
+                        self.written += 1
+                        dirty = True
+                    except Exception as e:
+                        logger.error(f"Capture recorder failed to encode a {item[2]} message: {e}")
+
+                too_big = self.max_bytes and raw.tell() >= self.max_bytes
+                too_old = self.max_seconds and time.monotonic() - opened_at >= self.max_seconds
+                if too_big or too_old:
+                    gz.close()
+                    raw.close()
+                    raw, gz, opened_at = self._open_file()
+                    dirty = False
+        except Exception as e:
+            logger.error(f"Capture recorder writer stopped: {e}", exc_info=True)
+        finally:
+            gz.close()
+            raw.close()
+
+
+class CaptureReader:
+    """
+    Iterates the records of one or more capture files in file order.
+
+    A file that was cut short (e.g. the process was killed mid-write) is read up
+    to its last complete record.
+    """
+
+    def __init__(self, paths: Union[str, Iterable[str]]):
+        if isinstance(paths, str):
+            paths = sorted(glob.glob(os.path.join(paths, f"*{FILE_SUFFIX}"))) if os.path.isdir(paths) else [paths]
+        self.paths = list(paths)
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        for path in self.paths:
+            yield from self._read_file(path)
+
+    @staticmethod
+    def _read_file(path: str) -> Iterator[CaptureRecord]:
+        with gzip.open(path, "rb") as f:
+            try:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{path} is not a capture file.")
+                while True:
+                    prefix = f.read(_LENGTH.size)
+                    if len(prefix) < _LENGTH.size:
+                        return
+                    (payload_len,) = _LENGTH.unpack(prefix)
+                    payload = f.read(payload_len)
+                    if len(payload) < payload_len:
+                        return
+                    recv_ns, name_len, meth_len = _HEADER.unpack_from(payload)
+                    offset = _HEADER.size
+                    name = payload[offset:offset + name_len].decode("utf-8")
+                    offset += name_len
+                    method = payload[offset:offset + meth_len].decode("utf-8")
+                    offset += meth_len
+                    yield CaptureRecord(recv_ns, name, method, json.loads(payload[offset:]))
+            except EOFError:
+                # Truncated gzip stream; everything before the cut has been yielded.
+                return
@@ -0,0 +1,216 @@
+# tradeforgepy/streaming/conflation.py
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, Union
+
+from tradeforgepy.core.enums import ConflationMode, MarketDataType
+from tradeforgepy.core.models_generic import GenericStreamEvent
+from tradeforgepy.exceptions import InvalidParameterError
+
+logger = logging.getLogger(__name__)
+
+DeliverCallback = Callable[[GenericStreamEvent], Awaitable[None]]
+ConflationErrorCallback = Callable[[Exception], Awaitable[None]]
+
+# Only state-like data can be coalesced: a newer quote or full book replaces an older one.
+# DEPTH events are per-level deltas, so dropping one would corrupt any book built from them;
+# trades are individual prints. Neither is ever conflated.
+CONFLATABLE_DATA_TYPES = frozenset({MarketDataType.QUOTE, MarketDataType.ORDER_BOOK})
+
+
+class _ConflationSlot:
+    """Pending-value holder and counters for one (contract, data type) pair."""
+    __slots__ = ("mode", "interval_sec", "pending", "received", "delivered", "dropped", "last_delivery",
+                 "queued_seq", "timer")
+
+    def __init__(self, mode: ConflationMode, interval_sec: float):
+        self.mode = mode
+        self.interval_sec = interval_sec
+        self.pending: Optional[GenericStreamEvent] = None
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.last_delivery: Optional[float] = None
+        # Sequence number of the slot's current place in the delivery queue, 0 while not queued.
+        self.queued_seq = 0
+        # INTERVAL mode: the timer that queues the pending event once the interval has passed.
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class _PassThrough:
+    """An unconflated event waiting behind conflated ones; `done` resolves once it was delivered."""
+    __slots__ = ("event", "done")
+
+    def __init__(self, event: GenericStreamEvent, done: asyncio.Future):
+        self.event = event
+        self.done = done
+
+
+class EventConflator:
+    """
+    Coalesces bursts of market data events per (contract, data type) so that a
+    slow consumer always receives the freshest value instead of a growing backlog.
+
+    Two modes are supported:
+
+      LATEST   - events are delivered as fast as the consumer accepts them; while
+                 it is busy, newer events replace the one waiting to be delivered.
+      INTERVAL - at most one event is delivered every `interval_ms`; the event
+                 delivered at the end of each interval is the latest one received.
+
+    All deliveries go through one ordered queue drained by a single task, so the
+    consumer is never called concurrently and events reach it in arrival order:
+    a replaced event gives up its place and the newer one queues behind whatever
+    arrived in between. An INTERVAL key only joins the queue once its interval
+    has passed. Unconflated events are delivered directly while nothing is
+    queued; otherwise they wait their turn, and `submit()` returns once they were
+    delivered, so they keep their backpressure. Every replaced event is counted
+    as dropped and reported by `stats()`.
+    """
+
+    def __init__(self, deliver: DeliverCallback, on_error: Optional[ConflationErrorCallback] = None, name: str = "Conflator"):
+        self._deliver = deliver
+        self._on_error = on_error
+        self.name = name
+        self._slots: Dict[Tuple[str, MarketDataType], _ConflationSlot] = {}
+        self._queue: Deque[Tuple[Union[_ConflationSlot, _PassThrough], int]] = deque()
+        self._seq = 0
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def configure(self, provider_contract_id: str, data_type: MarketDataType,
+                  mode: ConflationMode, interval_ms: Optional[float] = None) -> None:
+        """
+        Sets the conflation mode for one contract and data type. `ConflationMode.NONE`
+        removes any existing configuration; a pending event is still delivered.
+        """
+        if data_type not in CONFLATABLE_DATA_TYPES:
+            raise InvalidParameterError(f"{data_type.value} events cannot be conflated.")
+        if mode == ConflationMode.INTERVAL and (interval_ms is None or interval_ms <= 0):
+            raise InvalidParameterError("INTERVAL conflation requires a positive interval_ms.")
+
+        key = (provider_contract_id, data_type)
+        if mode == ConflationMode.NONE:
+            slot = self._slots.pop(key, None)
+            if slot and slot.pending is not None and not slot.queued_seq:
+                self._enqueue(slot)
+            return
+
+        interval_sec = interval_ms / 1000.0 if mode == ConflationMode.INTERVAL else 0.0
+        slot = self._slots.get(key)
+        if slot is None:
+            self._slots[key] = _ConflationSlot(mode, interval_sec)
+        else:
+            slot.mode, slot.interval_sec = mode, interval_sec
+        logger.info(f"{self.name}: conflating {data_type.value} for {provider_contract_id} ({mode.value}, interval={interval_sec * 1000:.0f}ms)")
+
+    def is_conflated(self, provider_contract_id: str, data_type: MarketDataType) -> bool:
+        return (provider_contract_id, data_type) in self._slots
+
+    async def submit(self, event: GenericStreamEvent) -> None:
+        """Delivers `event` in order, or holds it as the latest value for its key if the key is conflated."""
+        slot = self._slots.get((event.provider_contract_id, event.event_type)) if self._slots else None
+        if slot is None:
+            if not self._queue and (self._drain_task is None or self._drain_task.done()):
+                await self._deliver(event)
+                return
+            done = asyncio.get_running_loop().create_future()
+            self._queue.append((_PassThrough(event, done), 0))
+            self._ensure_drain()
+            await done
+            return
+
+        slot.received += 1
+        if slot.pending is not None:
+            slot.dropped += 1
+        slot.pending = event
+        if slot.queued_seq or slot.mode != ConflationMode.INTERVAL:
+            self._enqueue(slot)
+        elif slot.timer is None:
+            loop = asyncio.get_running_loop()
+            due = slot.last_delivery + slot.interval_sec if slot.last_delivery is not None else 0.0
+            if due <= loop.time():
+                self._enqueue(slot)
+            else:
+                slot.timer = loop.call_at(due, self._enqueue, slot)
+
+    def _enqueue(self, slot: _ConflationSlot) -> None:
+        """Queues the slot behind everything queued so far; an earlier place it held is skipped."""
+        if slot.timer is not None:
+            slot.timer.cancel()
+            slot.timer = None
+        self._seq += 1
+        slot.queued_seq = self._seq
+        self._queue.append((slot, self._seq))
+        self._ensure_drain()
+
+    def _ensure_drain(self) -> None:
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain(), name=f"{self.name}_Drain")
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            item, seq = self._queue.popleft()
+            if isinstance(item, _PassThrough):
+                if item.done.done():
+                    continue  # The submitter was cancelled.
+                try:
+                    await self._deliver(item.event)
+                    item.done.set_result(None)
+                except asyncio.CancelledError:
+                    item.done.cancel()
+                    raise
+                except Exception as e:
+                    item.done.set_exception(e)
+                continue
+
+            if item.queued_seq != seq or item.pending is None:
+                continue  # Superseded by a later place in the queue.
+            item.queued_seq = 0
+            event, item.pending = item.pending, None
+            item.last_delivery = loop.time()
+            try:
+                await self._deliver(event)
+                item.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name}: event consumer failed for {event.provider_contract_id}: {e}", exc_info=True)
+                if self._on_error:
+                    await self._on_error(e)
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, object]]]:
+        """Returns received/delivered/dropped counts keyed by contract id and data type."""
+        result: Dict[str, Dict[str, Dict[str, object]]] = {}
+        for (contract_id, data_type), slot in self._slots.items():
+            result.setdefault(contract_id, {})[data_type.value] = {
+                "mode": slot.mode.value,
+                "interval_ms": slot.interval_sec * 1000,
+                "received": slot.received,
+                "delivered": slot.delivered,
+                "dropped": slot.dropped,
+                "pending": slot.pending is not None,
+            }
+        return result
+
+    @property
+    def total_dropped(self) -> int:
+        return sum(slot.dropped for slot in self._slots.values())
+
+    async def close(self) -> None:
+        """Cancels the drain task and interval timers. Pending events are discarded."""
+        if self._drain_task and not self._drain_task.done():
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+        self._drain_task = None
+        for item, _ in self._queue:
+            if isinstance(item, _PassThrough) and not item.done.done():
+                item.done.cancel()
+        self._queue.clear()
+        for slot in self._slots.values():
+            if slot.timer is not None:
+                slot.timer.cancel()
+                slot.timer = None
+            slot.pending = None
+            slot.queued_seq = 0
@@ -0,0 +1,197 @@
+# tradeforgepy/streaming/dispatch_queue.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from tradeforgepy.core.enums import OverflowPolicy
+from tradeforgepy.core.models_generic import GenericStreamEvent
+from .conflation import CONFLATABLE_DATA_TYPES
+
+logger = logging.getLogger(__name__)
+
+Consumer = Callable[[Any], Awaitable[None]]
+ConsumerErrorCallback = Callable[[Exception], Awaitable[None]]
+KeyFunc = Callable[[Any], Optional[Hashable]]
+
+
+def default_conflation_key(event: Any) -> Optional[Hashable]:
+    """Quotes and book snapshots conflate per contract; depth deltas and everything else are never replaced."""
+    if isinstance(event, GenericStreamEvent) and event.event_type in CONFLATABLE_DATA_TYPES:
+        return event.event_type, event.provider_contract_id
+    return None
+
+
+class BoundedDispatchQueue:
+    """
+    A bounded FIFO between a producer (the SignalR receive path) and a consumer
+    (user callbacks), drained by a dedicated dispatcher task.
+
+    `put()` returns as soon as the item is queued, so socket reads are not held
+    up by slow consumers. When the queue is full, `policy` decides what happens:
+
+      BLOCK       - `put()` waits for space, pushing backpressure onto the reader.
+      DROP_OLDEST - the oldest queued item is discarded.
+      DROP_NEWEST - the incoming item is discarded.
+      CONFLATE    - an item whose `key_func` key matches a queued item replaces it
+                    in place (at any fill level); items without a key wait for space.
+
+    The dispatcher task is started on the first `put()` and awaits `consumer`
+    for one item at a time, preserving order. Consumer exceptions are logged and
+    reported through `on_error`; they do not stop the dispatcher.
+    """
+
+    def __init__(self, consumer: Consumer, maxsize: int = 10000, policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 key_func: KeyFunc = default_conflation_key, on_error: Optional[ConsumerErrorCallback] = None,
+                 name: str = "DispatchQueue"):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self._consumer = consumer
+        self.maxsize = maxsize
+        self.policy = OverflowPolicy(policy)
+        self._key_func = key_func
+        self._on_error = on_error
+        self.name = name
+
+        # Entries are [key, item] lists so CONFLATE can replace an item without moving it.
+        self._entries: Deque[List[Any]] = deque()
+        self._keyed: Dict[Hashable, List[Any]] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        # Set while nothing is queued and the consumer is not running.
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+        # --- Metrics ---
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.conflated = 0
+        self.consumer_errors = 0
+        self.blocked_puts = 0
+        self.blocked_seconds = 0.0
+        self.high_watermark = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def dropped(self) -> int:
+        return self.dropped_oldest + self.dropped_newest
+
+    def _ensure_dispatcher(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}_Dispatcher")
+
+    def _append(self, key: Optional[Hashable], item: Any) -> None:
+        entry = [key, item]
+        self._entries.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self.enqueued += 1
+        depth = len(self._entries)
+        if depth > self.high_watermark:
+            self.high_watermark = depth
+        if depth >= self.maxsize:
+            self._not_full.clear()
+        self._idle.clear()
+        self._not_empty.set()
+
+    def _popleft(self) -> Any:
+        entry = self._entries.popleft()
+        key, item = entry
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
+        if not self._entries:
+            self._not_empty.clear()
+        self._not_full.set()
+        return item
+
+    async def put(self, item: Any) -> bool:
+        """Queues `item` for the consumer. Returns False if the item was dropped."""
+        self._ensure_dispatcher()
+        key = None
+        if self.policy == OverflowPolicy.CONFLATE:
+            key = self._key_func(item)
+            if key is not None:
+                entry = self._keyed.get(key)
+                if entry is not None:
+                    entry[1] = item
+                    self.conflated += 1
+                    return True
+
+        if len(self._entries) >= self.maxsize:
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                self.dropped_newest += 1
+                return False
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                self._popleft()
+                self.dropped_oldest += 1
+            else:
+                self.blocked_puts += 1
+                started = time.perf_counter()
+                while len(self._entries) >= self.maxsize:
+                    await self._not_full.wait()
+                self.blocked_seconds += time.perf_counter() - started
+
+        self._append(key, item)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await self._not_empty.wait()
+            item = self._popleft()
+            try:
+                await self._consumer(item)
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.consumer_errors += 1
+                logger.error(f"{self.name}: consumer failed: {e}", exc_info=True)
+                if self._on_error:
+                    try:
+                        await self._on_error(e)
+                    except Exception as cb_err:
+                        logger.error(f"{self.name}: error callback raised: {cb_err}")
+            if not self._entries:
+                self._idle.set()
+
+    async def wait_idle(self) -> None:
+        """Waits until every queued item has been handed to the consumer and the consumer has returned."""
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        """Stops the dispatcher task and discards anything still queued."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._entries.clear()
+        self._keyed.clear()
+        self._not_empty.clear()
+        self._not_full.set()
+        self._idle.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy.value,
+            "maxsize": self.maxsize,
+            "depth": len(self._entries),
+            "high_watermark": self.high_watermark,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "conflated": self.conflated,
+            "consumer_errors": self.consumer_errors,
+            "blocked_puts": self.blocked_puts,
+            "blocked_seconds": round(self.blocked_seconds, 6),
+        }
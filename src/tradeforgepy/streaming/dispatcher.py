@@ -0,0 +1,125 @@
+# tradeforgepy/streaming/dispatcher.py
+import itertools
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from tradeforgepy.core.enums import MarketDataType, UserDataType
+from tradeforgepy.core.models_generic import GenericStreamEvent
+
+logger = logging.getLogger(__name__)
+
+EventType = Union[MarketDataType, UserDataType]
+EventHandler = Callable[[GenericStreamEvent], Awaitable[None]]
+SubscriberErrorCallback = Callable[[Exception], Awaitable[None]]
+
+# Route keys are (event type or None, ("contract" | "account", id) or None); None is a wildcard.
+_TopicKey = Optional[Tuple[str, str]]
+_RouteKey = Tuple[Optional[EventType], _TopicKey]
+
+_CONTRACT = "contract"
+_ACCOUNT = "account"
+
+
+class EventSubscription:
+    """Handle returned by `EventDispatcher.subscribe()`; pass it back to `unsubscribe()`."""
+    __slots__ = ("subscription_id", "handler", "route_keys", "delivered", "errors")
+
+    def __init__(self, subscription_id: int, handler: EventHandler, route_keys: List[_RouteKey]):
+        self.subscription_id = subscription_id
+        self.handler = handler
+        self.route_keys = route_keys
+        self.delivered = 0
+        self.errors = 0
+
+    def __repr__(self) -> str:
+        return f"EventSubscription(id={self.subscription_id}, routes={len(self.route_keys)}, delivered={self.delivered}, errors={self.errors})"
+
+
+class EventDispatcher:
+    """
+    Routes stream events to the subscribers interested in them.
+
+    Subscriptions are indexed by (event type, contract id or account id), with
+    None acting as a wildcard for either part, so routing an event is a handful
+    of dict lookups regardless of how many subscribers exist. A subscriber that
+    raises is logged (and reported through `on_subscriber_error`) without
+    affecting delivery to the others.
+    """
+
+    def __init__(self, on_subscriber_error: Optional[SubscriberErrorCallback] = None):
+        self._routes: Dict[_RouteKey, List[EventSubscription]] = {}
+        self._ids = itertools.count(1)
+        self.on_subscriber_error = on_subscriber_error
+
+    def subscribe(self, handler: EventHandler,
+                  event_types: Optional[Iterable[EventType]] = None,
+                  provider_contract_ids: Optional[Iterable[str]] = None,
+                  provider_account_ids: Optional[Iterable[str]] = None) -> EventSubscription:
+        """
+        Registers `handler` for events matching every given filter. Omitted filters
+        match anything; contract and account ids are alternatives (an event matches
+        if it carries any of the listed contract ids or any of the listed account ids).
+        """
+        types: List[Optional[EventType]] = list(event_types) if event_types else [None]
+        topics: List[_TopicKey] = [(_CONTRACT, str(cid)) for cid in provider_contract_ids or ()]
+        topics += [(_ACCOUNT, str(aid)) for aid in provider_account_ids or ()]
+        if not topics:
+            topics = [None]
+
+        subscription = EventSubscription(next(self._ids), handler, [(t, k) for t in types for k in topics])
+        for route_key in subscription.route_keys:
+            self._routes.setdefault(route_key, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        for route_key in subscription.route_keys:
+            subscribers = self._routes.get(route_key)
+            if subscribers and subscription in subscribers:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    del self._routes[route_key]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({sub.subscription_id for subs in self._routes.values() for sub in subs})
+
+    def _match(self, event: GenericStreamEvent) -> List[EventSubscription]:
+        topics: List[_TopicKey] = [None]
+        if event.provider_contract_id:
+            topics.append((_CONTRACT, event.provider_contract_id))
+        if event.provider_account_id:
+            topics.append((_ACCOUNT, event.provider_account_id))
+
+        matched: List[EventSubscription] = []
+        buckets = 0
+        for event_type in (event.event_type, None):
+            for topic in topics:
+                subscribers = self._routes.get((event_type, topic))
+                if subscribers:
+                    matched.extend(subscribers)
+                    buckets += 1
+        if buckets > 1:
+            # A subscriber registered under several matching routes receives the event once.
+            unique = {s.subscription_id: s for s in matched}
+            matched = [unique[i] for i in sorted(unique)]
+        return matched
+
+    async def dispatch(self, event: GenericStreamEvent) -> int:
+        """Delivers `event` to every matching subscriber, in subscription order. Returns the number delivered."""
+        if not self._routes:
+            return 0
+        delivered = 0
+        for subscription in self._match(event):
+            try:
+                await subscription.handler(event)
+                subscription.delivered += 1
+                delivered += 1
+            except Exception as e:
+                subscription.errors += 1
+                logger.error(f"Event subscriber {subscription.subscription_id} failed on {event.event_type.value}: {e}", exc_info=True)
+                if self.on_subscriber_error:
+                    try:
+                        await self.on_subscriber_error(e)
+                    except Exception as cb_err:
+                        logger.error(f"Subscriber error callback raised: {cb_err}")
+        return delivered
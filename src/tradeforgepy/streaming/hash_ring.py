@@ -0,0 +1,63 @@
+# tradeforgepy/streaming/hash_ring.py
+import hashlib
+from bisect import bisect_right, insort
+from typing import Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+
+N = TypeVar("N", bound=Hashable)
+
+
+def _hash(value: str) -> int:
+    # A keyed-by-content hash, stable across processes (unlike the built-in hash()).
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing(Generic[N]):
+    """
+    Assigns string keys to nodes with consistent hashing.
+
+    Each node is placed on the ring at `replicas` pseudo-random points, and a key
+    belongs to the first node point at or after the key's hash. Adding or removing
+    a node therefore only moves the keys adjacent to that node's points (about
+    1/N of all keys), and assignments are identical across processes and restarts.
+    """
+
+    def __init__(self, nodes: Iterable[N] = (), replicas: int = 64):
+        if replicas <= 0:
+            raise ValueError("replicas must be positive.")
+        self.replicas = replicas
+        self._points: List[Tuple[int, str]] = []
+        self._owners: Dict[Tuple[int, str], N] = {}
+        self._nodes: Dict[str, N] = {}
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[N]:
+        return list(self._nodes.values())
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add_node(self, node: N) -> None:
+        name = str(node)
+        if name in self._nodes:
+            return
+        self._nodes[name] = node
+        for i in range(self.replicas):
+            # The node name breaks ties if two points ever hash to the same value.
+            point = (_hash(f"{name}#{i}"), name)
+            insort(self._points, point)
+            self._owners[point] = node
+
+    def remove_node(self, node: N) -> None:
+        name = str(node)
+        if self._nodes.pop(name, None) is None:
+            return
+        self._points = [p for p in self._points if p[1] != name]
+        self._owners = {p: n for p, n in self._owners.items() if p[1] != name}
+
+    def get_node(self, key: str) -> N:
+        if not self._points:
+            raise LookupError("The hash ring has no nodes.")
+        index = bisect_right(self._points, (_hash(key), ""))
+        return self._owners[self._points[index % len(self._points)]]
@@ -0,0 +1,200 @@
+# tradeforgepy/streaming/latency.py
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Sub-buckets per power of two: bucket bounds grow by ~19%, so percentiles are within that error.
+_SUB_BUCKETS = 4
+_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+# Raw upstream delays are stored shifted by one hour so skewed (negative) delays stay positive.
+_RAW_SHIFT_NS = 3600 * 10**9
+
+# Latency stages recorded per event, in pipeline order.
+STAGE_PROVIDER_TO_RECV = "provider_to_recv"    # provider timestamp -> socket receive, offset corrected
+STAGE_RECV_TO_EMIT = "recv_to_emit"            # receive -> mapped and queued (mapper cost)
+STAGE_EMIT_TO_DISPATCH = "emit_to_dispatch"    # queued -> picked up by the dispatcher (queueing)
+# Handing the event on: the event callbacks, except for a conflated market feed, whose events
+# are only handed to the conflator here and reach the callbacks later.
+STAGE_DELIVER = "deliver"
+STAGE_RECV_TO_DELIVERED = "recv_to_delivered"
+STAGES = (STAGE_PROVIDER_TO_RECV, STAGE_RECV_TO_EMIT, STAGE_EMIT_TO_DISPATCH, STAGE_DELIVER, STAGE_RECV_TO_DELIVERED)
+
+
+def _bucket(value_ns: int) -> int:
+    if value_ns <= 1:
+        return 0
+    return int(math.log2(value_ns) * _SUB_BUCKETS)
+
+
+def _bucket_upper_ns(bucket: int) -> float:
+    return 2 ** ((bucket + 1) / _SUB_BUCKETS)
+
+
+class _Slice:
+    __slots__ = ("slice_id", "buckets", "count", "total", "min", "max")
+
+    def __init__(self, slice_id: int):
+        self.slice_id = slice_id
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+
+class RollingHistogram:
+    """
+    A log-bucketed histogram of nanosecond values over a sliding time window.
+
+    The window is split into `slices` equal time slices; observations go into
+    the current slice and whole slices expire as time moves on, so reads cover
+    between (slices-1)/slices and all of `window_seconds`. Observing is a dict
+    increment; quantiles are computed on read. `lifetime_count` and
+    `lifetime_total_ns` never expire, for monotonic counters.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, slices: int = 6):
+        self.slice_seconds = window_seconds / slices
+        self._slices: Deque[_Slice] = deque(maxlen=slices)
+        self.lifetime_count = 0
+        self.lifetime_total_ns = 0
+
+    def _current(self, now: float) -> _Slice:
+        slice_id = int(now / self.slice_seconds)
+        if not self._slices or self._slices[-1].slice_id != slice_id:
+            self._slices.append(_Slice(slice_id))
+        return self._slices[-1]
+
+    def _live(self, now: float) -> List[_Slice]:
+        oldest = int(now / self.slice_seconds) - self._slices.maxlen + 1
+        return [s for s in self._slices if s.slice_id >= oldest]
+
+    def observe(self, value_ns: int, now: Optional[float] = None) -> None:
+        current = self._current(time.monotonic() if now is None else now)
+        b = _bucket(value_ns)
+        current.buckets[b] = current.buckets.get(b, 0) + 1
+        current.count += 1
+        current.total += value_ns
+        if current.min is None or value_ns < current.min:
+            current.min = value_ns
+        if current.max is None or value_ns > current.max:
+            current.max = value_ns
+        self.lifetime_count += 1
+        self.lifetime_total_ns += value_ns
+
+    def window_min(self, now: Optional[float] = None) -> Optional[int]:
+        mins = [s.min for s in self._live(time.monotonic() if now is None else now) if s.min is not None]
+        return min(mins) if mins else None
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Returns count, mean, min, max and quantiles (in microseconds) over the current window."""
+        live = self._live(time.monotonic() if now is None else now)
+        count = sum(s.count for s in live)
+        if not count:
+            return {"count": 0}
+        merged: Dict[int, int] = {}
+        for s in live:
+            for b, n in s.buckets.items():
+                merged[b] = merged.get(b, 0) + n
+        result = {
+            "count": count,
+            "mean_us": sum(s.total for s in live) / count / 1000,
+            "min_us": min(s.min for s in live if s.min is not None) / 1000,
+            "max_us": max(s.max for s in live if s.max is not None) / 1000,
+        }
+        ordered = sorted(merged.items())
+        for q in _QUANTILES:
+            rank, seen = q * count, 0
+            for b, n in ordered:
+                seen += n
+                if seen >= rank:
+                    result[f"p{q * 100:g}_us"] = min(_bucket_upper_ns(b), result["max_us"] * 1000) / 1000
+                    break
+        return result
+
+
+class LatencyTracker:
+    """
+    Rolling latency histograms per stream, event type and pipeline stage.
+
+    Streams stamp each message when it is received, when the mapped event is
+    queued, when the dispatcher picks it up and when it has been delivered. Comparing the
+    receive time with the provider's own event timestamp gives the upstream
+    delay, but that includes the (unknown) offset between the provider clock and
+    the local clock. The offset is estimated as the smallest raw provider-to-
+    receive delay seen in the window, i.e. the delay of the fastest message, and
+    `provider_to_recv` is reported relative to it. The estimate is an upper bound
+    on the true offset (it still contains the minimum network delay).
+    """
+
+    def __init__(self, window_seconds: float = 60.0, slices: int = 6):
+        self.window_seconds = window_seconds
+        self.slices = slices
+        self._histograms: Dict[Tuple[str, str, str], RollingHistogram] = {}
+        # Signed raw delays (local receive - provider timestamp) per stream, for the offset estimate.
+        self._raw_upstream: Dict[str, RollingHistogram] = {}
+
+    def _histogram(self, stream_name: str, event_type: str, stage: str) -> RollingHistogram:
+        key = (stream_name, event_type, stage)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = RollingHistogram(self.window_seconds, self.slices)
+        return hist
+
+    def observe(self, stream_name: str, event_type: str, provider_ts: Optional[datetime],
+                recv_ns: int, emit_ns: int, dispatch_ns: int, done_ns: int) -> None:
+        now = time.monotonic()
+        if provider_ts is not None:
+            raw = recv_ns - int(provider_ts.timestamp() * 1e9)
+            offsets = self._raw_upstream.get(stream_name)
+            if offsets is None:
+                offsets = self._raw_upstream[stream_name] = RollingHistogram(self.window_seconds, self.slices)
+            # Shift by a constant so that negative raw delays (provider clock ahead) are kept.
+            offsets.observe(raw + _RAW_SHIFT_NS, now)
+            floor = offsets.window_min(now) - _RAW_SHIFT_NS
+            self._histogram(stream_name, event_type, STAGE_PROVIDER_TO_RECV).observe(raw - floor, now)
+        self._histogram(stream_name, event_type, STAGE_RECV_TO_EMIT).observe(emit_ns - recv_ns, now)
+        self._histogram(stream_name, event_type, STAGE_EMIT_TO_DISPATCH).observe(dispatch_ns - emit_ns, now)
+        self._histogram(stream_name, event_type, STAGE_DELIVER).observe(done_ns - dispatch_ns, now)
+        self._histogram(stream_name, event_type, STAGE_RECV_TO_DELIVERED).observe(done_ns - recv_ns, now)
+
+    def clock_offsets_ms(self) -> Dict[str, Optional[float]]:
+        """Estimated local-minus-provider clock offset per stream, in milliseconds."""
+        result = {}
+        for stream_name, offsets in self._raw_upstream.items():
+            floor = offsets.window_min()
+            result[stream_name] = (floor - _RAW_SHIFT_NS) / 1e6 if floor is not None else None
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns {"clock_offset_ms": {...}, "streams": {stream: {event type: {stage: snapshot}}}}."""
+        now = time.monotonic()
+        streams: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (stream_name, event_type, stage), hist in sorted(self._histograms.items()):
+            streams.setdefault(stream_name, {}).setdefault(event_type, {})[stage] = hist.snapshot(now)
+        return {"window_seconds": self.window_seconds, "clock_offset_ms": self.clock_offsets_ms(), "streams": streams}
+
+    def render_prometheus(self, metric_prefix: str = "tradeforge_stream_latency") -> str:
+        """
+        Renders Prometheus summaries (seconds), one series per stream/event/stage.
+        Quantiles cover the current window; `_count` and `_sum` are lifetime totals,
+        so they only ever increase as Prometheus counters must.
+        """
+        lines = [f"# TYPE {metric_prefix}_seconds summary"]
+        now = time.monotonic()
+        for (stream_name, event_type, stage), hist in sorted(self._histograms.items()):
+            labels = f'stream="{stream_name}",event_type="{event_type}",stage="{stage}"'
+            snap = hist.snapshot(now)
+            for q in _QUANTILES:
+                value = snap.get(f"p{q * 100:g}_us")
+                if value is not None:
+                    lines.append(f'{metric_prefix}_seconds{{{labels},quantile="{q:g}"}} {value / 1e6:.9f}')
+            lines.append(f"{metric_prefix}_seconds_count{{{labels}}} {hist.lifetime_count}")
+            lines.append(f"{metric_prefix}_seconds_sum{{{labels}}} {hist.lifetime_total_ns / 1e9:.9f}")
+        lines.append(f"# TYPE {metric_prefix}_clock_offset_seconds gauge")
+        for stream_name, offset_ms in self.clock_offsets_ms().items():
+            if offset_ms is not None:
+                lines.append(f'{metric_prefix}_clock_offset_seconds{{stream="{stream_name}"}} {offset_ms / 1e3:.9f}')
+        return "\n".join(lines) + "\n"
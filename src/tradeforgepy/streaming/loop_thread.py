@@ -0,0 +1,193 @@
+# tradeforgepy/streaming/loop_thread.py
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+MainLoopHandler = Callable[..., Awaitable[Any]]
+
+
+class StreamLoopThread:
+    """
+    Runs stream connections, JSON decoding and mapping on a dedicated thread with
+    its own event loop, so market data bursts do not compete with the owning
+    ("main") loop's own work, such as order placement or web request handlers.
+
+    Results come back to the main loop through `post()`: the stream thread appends
+    (handler, args) to a deque and wakes the main loop once per batch rather than
+    once per item. A single task on the main loop then awaits the handlers in
+    posting order. The deque holds at most `handoff_maxsize` items; once it is
+    full `post()` waits, so backpressure reaches the stream's own dispatch queue
+    and its overflow policy applies as usual.
+
+    `run()` executes a coroutine on the stream loop from the main loop, and
+    `run_on_main()` does the reverse for work that must stay on the main loop
+    (e.g. calls through the HTTP client).
+    """
+
+    def __init__(self, name: str = "StreamLoopThread", handoff_maxsize: int = 10000):
+        if handoff_maxsize <= 0:
+            raise ValueError("handoff_maxsize must be positive.")
+        self.name = name
+        self.handoff_maxsize = handoff_maxsize
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self._handoff: Deque[Tuple[MainLoopHandler, Tuple[Any, ...]]] = deque()
+        # Set by the first post() after a drain and cleared by the drain task, so a burst
+        # of posts costs one call_soon_threadsafe() instead of one per item.
+        self._wakeup_pending = False
+        self._wakeup_lock = threading.Lock()
+        self._ready: Optional[asyncio.Event] = None        # main loop side: items are waiting
+        self._space: Optional[asyncio.Event] = None        # stream loop side: the deque has room
+        self._producer_waiting = False
+        self._drain_task: Optional[asyncio.Task] = None
+
+        # --- Metrics ---
+        self.posted = 0
+        self.delivered = 0
+        self.handler_errors = 0
+        self.blocked_posts = 0
+        self.blocked_seconds = 0.0
+        self.high_watermark = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Starts the thread and its loop. Must be called from the main loop."""
+        if self.is_running:
+            return
+        self._main_loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._drain_task = asyncio.create_task(self._drain(), name=f"{self.name}_Handoff")
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(started,), name=self.name, daemon=True)
+        self._thread.start()
+        started.wait()
+        logger.info(f"{self.name}: stream loop started on its own thread.")
+
+    def _run_loop(self, started: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        self._space = asyncio.Event()
+        self._space.set()
+        started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def stop(self) -> None:
+        """Cancels whatever still runs on the stream loop, stops the thread and the handoff task."""
+        if self.is_running:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._cancel_remaining(), self.loop))
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            await asyncio.to_thread(self._thread.join)
+        self._thread = None
+        if self._drain_task and not self._drain_task.done():
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+        if self._handoff:
+            logger.info(f"{self.name}: discarded {len(self._handoff)} undelivered item(s) on stop.")
+            self._handoff.clear()
+        logger.info(f"{self.name}: stream loop stopped.")
+
+    async def _cancel_remaining(self) -> None:
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- Main loop -> stream loop ---
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """Runs `coro` on the stream loop and waits for its result from the main loop."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Calls a short, non-blocking function on the stream loop from synchronous code on
+        the main loop, and returns its result or raises its exception.
+        """
+        async def _call():
+            return func(*args)
+        return asyncio.run_coroutine_threadsafe(_call(), self.loop).result()
+
+    # --- Stream loop -> main loop ---
+
+    async def run_on_main(self, coro: Awaitable[T]) -> T:
+        """Runs `coro` on the main loop and waits for its result from the stream loop."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._main_loop))
+
+    async def post(self, handler: MainLoopHandler, *args: Any) -> None:
+        """Queues `handler(*args)` to be awaited on the main loop, waiting while the handoff is full."""
+        if len(self._handoff) >= self.handoff_maxsize:
+            self.blocked_posts += 1
+            started = time.perf_counter()
+            while len(self._handoff) >= self.handoff_maxsize:
+                self._space.clear()
+                self._producer_waiting = True
+                # Re-checked after flagging, so a drain that ran in between is not missed.
+                if len(self._handoff) < self.handoff_maxsize:
+                    break
+                await self._space.wait()
+            self._producer_waiting = False
+            self.blocked_seconds += time.perf_counter() - started
+
+        self._handoff.append((handler, args))
+        self.posted += 1
+        depth = len(self._handoff)
+        if depth > self.high_watermark:
+            self.high_watermark = depth
+        with self._wakeup_lock:
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        self._main_loop.call_soon_threadsafe(self._ready.set)
+
+    def wrap(self, handler: MainLoopHandler) -> MainLoopHandler:
+        """Returns a callback for the stream loop that posts its calls to `handler` on the main loop."""
+        async def _post(*args: Any) -> None:
+            await self.post(handler, *args)
+        return _post
+
+    async def _drain(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            with self._wakeup_lock:
+                self._wakeup_pending = False
+            while self._handoff:
+                handler, args = self._handoff.popleft()
+                try:
+                    await handler(*args)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.handler_errors += 1
+                    logger.error(f"{self.name}: main loop handler failed: {e}", exc_info=True)
+                self.delivered += 1
+                if self._producer_waiting and self.loop is not None:
+                    self._producer_waiting = False
+                    self.loop.call_soon_threadsafe(self._space.set)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "maxsize": self.handoff_maxsize,
+            "depth": len(self._handoff),
+            "high_watermark": self.high_watermark,
+            "posted": self.posted,
+            "delivered": self.delivered,
+            "handler_errors": self.handler_errors,
+            "blocked_posts": self.blocked_posts,
+            "blocked_seconds": round(self.blocked_seconds, 6),
+        }
@@ -0,0 +1,212 @@
+# tradeforgepy/streaming/replay.py
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Union
+
+from pysignalr.messages import CompletionMessage
+
+from .capture import CaptureReader, CaptureRecord
+
+logger = logging.getLogger(__name__)
+
+HubHandler = Callable[[List[Any]], Awaitable[None]]
+ContractRouter = Callable[[str], str]
+
+
+def _base_stream_name(stream_name: str) -> str:
+    # "MarketStream[2]" is shard 2 of "MarketStream"; records are routed by contract, not by recorded shard.
+    return stream_name.split("[", 1)[0]
+
+
+class ReplayConnection:
+    """
+    Stands in for `pysignalr.client.SignalRClient` during a replay.
+
+    Streams register their handlers and open/close callbacks exactly as they do
+    on a live connection; `ReplaySource` then invokes the handlers with recorded
+    messages. Subscription commands sent through `send()` are acknowledged and
+    otherwise ignored, since a capture already contains whatever was subscribed
+    at the time.
+    """
+
+    def __init__(self, source: "ReplaySource", stream: Any):
+        self._source = source
+        self.stream = stream
+        self.stream_name: str = getattr(stream, "stream_name", "Stream")
+        self.handlers: Dict[str, List[HubHandler]] = {}
+        self.sent: List[Any] = []
+        self._on_open: Optional[Callable[[], Awaitable[None]]] = None
+        self._on_close: Optional[Callable[[], Awaitable[None]]] = None
+        self._on_error: Optional[Callable[[Any], Awaitable[None]]] = None
+        self._closed = asyncio.Event()
+
+    def on(self, event: str, callback: HubHandler) -> None:
+        self.handlers.setdefault(event, []).append(callback)
+
+    def on_open(self, callback) -> None: self._on_open = callback
+    def on_close(self, callback) -> None: self._on_close = callback
+    def on_error(self, callback) -> None: self._on_error = callback
+
+    async def send(self, method: str, arguments: List[Any], on_invocation: Optional[Callable[[Any], Awaitable[None]]] = None) -> None:
+        self.sent.append((method, arguments))
+        if on_invocation is not None:
+            await on_invocation(CompletionMessage(invocation_id=f"replay-{len(self.sent)}"))
+
+    async def run(self) -> None:
+        if self._on_open:
+            await self._on_open()
+        self._source._attach(self)
+        try:
+            await self._closed.wait()
+        finally:
+            self._source._detach(self)
+            if self._on_close:
+                await self._on_close()
+
+    async def stop(self) -> None:
+        self._closed.set()
+
+    async def deliver(self, method: str, args: List[Any]) -> bool:
+        handlers = self.handlers.get(method)
+        if not handlers:
+            return False
+        for handler in handlers:
+            await handler(args)
+        return True
+
+
+class ReplaySource:
+    """
+    Plays recorded hub messages back through the normal stream handler path.
+
+    Pass `ReplaySource.connection_for` as a stream's connection factory (the
+    provider does this when created with `replay_source=`). Playback starts once a
+    connection exists for every name in `expected_streams`, and records from all
+    captures are merged by receive time, so market and user messages are
+    interleaved exactly as they were received.
+
+    A sharded stream registers a router with `route()`. Its records are then
+    delivered to the shard that owns the message's contract now, whichever shard
+    recorded it, so a replay works with any shard count.
+
+    `speed` controls pacing: None replays as fast as possible, 1.0 in real time,
+    and N at N times real time. With `deterministic=True`, each message is fully
+    handled and delivered to the event callbacks before the next one is
+    replayed, which makes the callback order reproducible across runs.
+    """
+
+    def __init__(self, captures: Union[str, Iterable[Union[str, CaptureRecord]]],
+                 speed: Optional[float] = None, expected_streams: Iterable[str] = ("MarketStream", "UserStream"),
+                 deterministic: bool = True):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive, or None for as fast as possible.")
+        self._captures = captures
+        self.speed = speed
+        self.deterministic = deterministic
+        self.expected_streams = {_base_stream_name(name) for name in expected_streams}
+        self._connections: Dict[str, ReplayConnection] = {}
+        self._routers: Dict[str, ContractRouter] = {}
+        self._required_connections: Set[str] = set()
+        self._player_task: Optional[asyncio.Task] = None
+        self._finished: Optional[asyncio.Event] = None
+
+        # --- Metrics ---
+        self.replayed = 0
+        self.unhandled = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def connection_for(self, stream: Any, url: str) -> ReplayConnection:
+        return ReplayConnection(self, stream)
+
+    def route(self, stream_name: str, router: ContractRouter, shard_names: Iterable[str]) -> None:
+        """
+        Delivers `stream_name` records to the stream named by `router(contract_id)`.
+        Playback waits until every stream in `shard_names` is connected.
+        """
+        self._routers[_base_stream_name(stream_name)] = router
+        self._required_connections.update(shard_names)
+
+    def _records(self) -> Iterable[CaptureRecord]:
+        captures = self._captures
+        if isinstance(captures, str):
+            return CaptureReader(captures)
+        items = list(captures)
+        if items and all(isinstance(item, CaptureRecord) for item in items):
+            return sorted(items, key=lambda r: r.recv_ns)
+        # One reader per file, merged by receive time; ties keep file order.
+        readers = [iter(CaptureReader(path)) for path in items]
+        return heapq.merge(*readers, key=lambda r: r.recv_ns)
+
+    def _attach(self, connection: ReplayConnection) -> None:
+        self._connections.setdefault(connection.stream_name, connection)
+        attached_bases = {_base_stream_name(name) for name in self._connections}
+        if (self._player_task is None and self.expected_streams.issubset(attached_bases)
+                and self._required_connections.issubset(self._connections)):
+            self._finished = self._finished or asyncio.Event()
+            self._player_task = asyncio.create_task(self._play(), name="ReplaySource_Player")
+
+    def _detach(self, connection: ReplayConnection) -> None:
+        if self._connections.get(connection.stream_name) is connection:
+            del self._connections[connection.stream_name]
+
+    def _connection_for(self, record: CaptureRecord) -> Optional[ReplayConnection]:
+        base = _base_stream_name(record.stream_name)
+        router = self._routers.get(base)
+        if router is not None and record.args and isinstance(record.args[0], str):
+            # Market hub messages carry the contract id as their first argument.
+            connection = self._connections.get(router(record.args[0]))
+            if connection is not None:
+                return connection
+        connection = self._connections.get(record.stream_name)
+        if connection is not None:
+            return connection
+        return next((c for name, c in self._connections.items() if _base_stream_name(name) == base), None)
+
+    async def _play(self) -> None:
+        loop = asyncio.get_running_loop()
+        first_ns: Optional[int] = None
+        start = loop.time()
+        self.started_at = time.time()
+        try:
+            for record in self._records():
+                if self.speed is not None:
+                    if first_ns is None:
+                        first_ns = record.recv_ns
+                    delay = start + (record.recv_ns - first_ns) / 1e9 / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                connection = self._connection_for(record)
+                if connection is None or not await connection.deliver(record.method, record.args):
+                    self.unhandled += 1
+                    continue
+                self.replayed += 1
+                if self.deterministic:
+                    await connection.stream.wait_until_idle()
+            for connection in list(self._connections.values()):
+                await connection.stream.wait_until_idle()
+        except Exception as e:
+            logger.error(f"Replay stopped after {self.replayed} message(s): {e}", exc_info=True)
+            raise
+        finally:
+            self.finished_at = time.time()
+            self._finished.set()
+            logger.info(f"Replay finished: {self.replayed} message(s) replayed, {self.unhandled} without a handler.")
+
+    async def wait_finished(self) -> None:
+        """Waits until every recorded message has been replayed and delivered."""
+        if self._finished is None:
+            self._finished = asyncio.Event()
+        await self._finished.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        return {
+            "replayed": self.replayed,
+            "unhandled": self.unhandled,
+            "elapsed_seconds": elapsed,
+            "messages_per_second": self.replayed / elapsed if elapsed > 0 else None,
+        }
@@ -0,0 +1,247 @@
+# tradeforgepy/streaming/watchdog.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class FeedStaleness(NamedTuple):
+    key: Hashable
+    silent_seconds: float             # time since the last message
+    expected_interval: Optional[float]  # learned average gap between messages, None before warm-up
+    timeout: float                    # silence that was allowed before flagging
+    stale_count: int                  # 1 for the first alert of this silence, then 2, 3, ...
+
+
+StaleCallback = Callable[[FeedStaleness], Awaitable[None]]
+RecoveredCallback = Callable[[Hashable, float], Awaitable[None]]
+
+
+class _FeedState:
+    __slots__ = ("last_seen", "ewma_interval", "samples", "stale_count", "next_check")
+
+    def __init__(self, now: float):
+        self.last_seen = now
+        self.ewma_interval: Optional[float] = None
+        self.samples = 0
+        self.stale_count = 0
+        self.next_check = now
+
+
+class StalenessWatchdog:
+    """
+    Flags feeds that have gone quiet for much longer than they usually do.
+
+    Each watched key (e.g. a (contract, data type) pair) learns an EWMA of the gap
+    between its messages. A feed is stale once it has been silent for
+    `rate_multiple` times that gap, clamped to [`min_timeout`, `max_timeout`];
+    until `warmup_samples` gaps have been seen, `max_timeout` applies. While a
+    feed stays silent `on_stale` fires again with a doubling delay (capped at
+    `max_timeout`), and `on_recovered` fires on its next message.
+
+    `touch()` only records the time and updates the average. Deadlines live on a
+    hashed timer wheel with one slot per `tick_seconds`; a single task visits one
+    slot per tick and re-files any feed that has been touched since it was filed,
+    so the cost per tick is proportional to the feeds due in that slot, not to
+    the number of feeds watched.
+
+    One watchdog can be shared by several streams. Watches are reference
+    counted: a key stays watched until every `watch()` has been matched by an
+    `unwatch()`, so a contract that moves between shards is not dropped when the
+    old shard lets go of it after the new one has picked it up.
+    """
+
+    def __init__(self, on_stale: StaleCallback, on_recovered: Optional[RecoveredCallback] = None,
+                 tick_seconds: float = 0.5, wheel_size: int = 512, rate_multiple: float = 20.0,
+                 min_timeout: float = 5.0, max_timeout: float = 120.0, alpha: float = 0.1,
+                 warmup_samples: int = 20, name: str = "StalenessWatchdog"):
+        if tick_seconds <= 0 or wheel_size <= 1:
+            raise ValueError("tick_seconds must be positive and wheel_size greater than 1.")
+        if not 0 < min_timeout <= max_timeout:
+            raise ValueError("min_timeout must be positive and at most max_timeout.")
+        self._on_stale = on_stale
+        self._on_recovered = on_recovered
+        self.tick_seconds = tick_seconds
+        self.rate_multiple = rate_multiple
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.alpha = alpha
+        self.warmup_samples = warmup_samples
+        self.name = name
+
+        self._feeds: Dict[Hashable, _FeedState] = {}
+        self._watchers: Dict[Hashable, int] = {}
+        self._wheel: List[Set[Hashable]] = [set() for _ in range(wheel_size)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._cursor_tick: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        # touch() is synchronous, so recovery callbacks run as tasks; held here until they finish.
+        self._callback_tasks: Set[asyncio.Task] = set()
+
+        # --- Metrics ---
+        self.stale_events = 0
+        self.recoveries = 0
+        self.callback_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._feeds)
+
+    # --- Feed registration ---
+
+    def watch(self, key: Hashable, now: Optional[float] = None) -> None:
+        """Starts (or restarts) watching a feed; the silence clock starts now. Keeps any learned rate."""
+        self._watchers[key] = self._watchers.get(key, 0) + 1
+        now = time.monotonic() if now is None else now
+        state = self._feeds.get(key)
+        if state is None:
+            state = self._feeds[key] = _FeedState(now)
+        state.last_seen = now
+        state.stale_count = 0
+        self._ensure_running()
+        self._schedule(key, state, now + self.timeout_for(state))
+
+    def unwatch(self, key: Hashable) -> None:
+        """Releases one `watch()` of a feed; the feed is dropped when no watcher is left."""
+        remaining = self._watchers.get(key, 0) - 1
+        if remaining > 0:
+            self._watchers[key] = remaining
+            return
+        self._watchers.pop(key, None)
+        if self._feeds.pop(key, None) is not None:
+            slot = self._slot_of.pop(key, None)
+            if slot is not None:
+                self._wheel[slot].discard(key)
+
+    def is_watched(self, key: Hashable) -> bool:
+        return key in self._feeds
+
+    def touch(self, key: Hashable, now: Optional[float] = None) -> None:
+        """Records a message on a watched feed. Unwatched keys are ignored."""
+        state = self._feeds.get(key)
+        if state is None:
+            return
+        now = time.monotonic() if now is None else now
+        silent = now - state.last_seen
+        # One long silence should not teach the feed that silence is normal.
+        gap = min(silent, self.max_timeout)
+        state.ewma_interval = gap if state.ewma_interval is None else self.alpha * gap + (1 - self.alpha) * state.ewma_interval
+        state.samples += 1
+        state.last_seen = now
+        if state.stale_count:
+            state.stale_count = 0
+            self.recoveries += 1
+            logger.info(f"{self.name}: feed {key} recovered after {silent:.1f}s of silence.")
+            if self._on_recovered:
+                task = asyncio.create_task(self._call(self._on_recovered, key, silent))
+                self._callback_tasks.add(task)
+                task.add_done_callback(self._callback_tasks.discard)
+            self._schedule(key, state, now + self.timeout_for(state))
+        else:
+            # Later deadlines are picked up lazily when the slot comes round; only an earlier
+            # one (the feed got faster, or finished warming up) needs to be filed again.
+            deadline = now + self.timeout_for(state)
+            if deadline < state.next_check - self.tick_seconds:
+                self._schedule(key, state, deadline)
+
+    def timeout_for(self, state: _FeedState) -> float:
+        if state.samples < self.warmup_samples or state.ewma_interval is None:
+            return self.max_timeout
+        return min(max(state.ewma_interval * self.rate_multiple, self.min_timeout), self.max_timeout)
+
+    # --- Timer wheel ---
+
+    def _tick_of(self, t: float) -> int:
+        return int(t / self.tick_seconds)
+
+    def _schedule(self, key: Hashable, state: _FeedState, deadline: float) -> None:
+        state.next_check = deadline
+        old = self._slot_of.get(key)
+        if old is not None:
+            self._wheel[old].discard(key)
+        tick = self._tick_of(deadline)
+        if self._cursor_tick is not None:
+            # Never file behind the cursor, and never a full turn or more ahead (it would be visited early).
+            tick = min(max(tick, self._cursor_tick + 1), self._cursor_tick + len(self._wheel) - 1)
+        slot = tick % len(self._wheel)
+        self._wheel[slot].add(key)
+        self._slot_of[key] = slot
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._cursor_tick = self._tick_of(time.monotonic())
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}_Wheel")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            await self.advance()
+
+    async def advance(self, now: Optional[float] = None) -> None:
+        """Processes every wheel slot up to `now`. Called by the wheel task each tick."""
+        now = time.monotonic() if now is None else now
+        target = self._tick_of(now)
+        if self._cursor_tick is None:
+            self._cursor_tick = target
+        # After a long stall, one full turn visits every slot; more turns would only repeat them.
+        self._cursor_tick = max(self._cursor_tick, target - len(self._wheel))
+        while self._cursor_tick < target:
+            self._cursor_tick += 1
+            slot = self._cursor_tick % len(self._wheel)
+            due = self._wheel[slot]
+            if not due:
+                continue
+            self._wheel[slot] = set()
+            for key in due:
+                self._slot_of.pop(key, None)
+                state = self._feeds.get(key)
+                if state is not None:
+                    await self._check(key, state, now)
+
+    async def _check(self, key: Hashable, state: _FeedState, now: float) -> None:
+        timeout = self.timeout_for(state)
+        silent = now - state.last_seen
+        if not state.stale_count and silent < timeout:
+            # Touched since it was filed; file it again at its real deadline.
+            self._schedule(key, state, state.last_seen + timeout)
+            return
+        if state.stale_count and now < state.next_check:
+            self._schedule(key, state, state.next_check)
+            return
+        state.stale_count += 1
+        self.stale_events += 1
+        self._schedule(key, state, now + min(timeout * 2 ** state.stale_count, self.max_timeout))
+        logger.warning(f"{self.name}: feed {key} silent for {silent:.1f}s (timeout {timeout:.1f}s, alert #{state.stale_count}).")
+        await self._call(self._on_stale, FeedStaleness(key, silent, state.ewma_interval, timeout, state.stale_count))
+
+    async def _call(self, callback: Callable[..., Awaitable[None]], *args: Any) -> None:
+        try:
+            await callback(*args)
+        except Exception as e:
+            self.callback_errors += 1
+            logger.error(f"{self.name}: staleness callback failed: {e}", exc_info=True)
+
+    # --- Introspection and shutdown ---
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[Hashable, Dict[str, Any]]:
+        """Per feed: seconds since the last message, learned interval, current timeout and stale flag."""
+        now = time.monotonic() if now is None else now
+        return {
+            key: {
+                "silent_seconds": now - state.last_seen,
+                "expected_interval": state.ewma_interval,
+                "timeout": self.timeout_for(state),
+                "stale": state.stale_count > 0,
+            }
+            for key, state in self._feeds.items()
+        }
+
+    async def close(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -0,0 +1,6 @@
+# ==============================================================================
+# tradeforgepy/tradeforgepy/testing/__init__.py
+# ==============================================================================
+from .topstepx_hub import TopStepXTestHub, HubTraffic
+
+__all__ = ["TopStepXTestHub", "HubTraffic"]
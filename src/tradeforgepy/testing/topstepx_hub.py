@@ -0,0 +1,407 @@
+# tradeforgepy/testing/topstepx_hub.py
+"""
+A local stand-in for the TopStepX market and user hubs, for load and resilience
+testing of the streams without the real service.
+
+The hub speaks enough of the SignalR JSON protocol for `pysignalr` (negotiate,
+handshake, invocations, completions), accepts the subscribe/unsubscribe
+commands sent by `streams.py`, and generates GatewayQuote/Trade/Depth and
+GatewayUser* traffic at configurable per-subscription rates. It also serves
+the REST login/validate endpoints, so a `TopStepXProvider` built from
+`hub.provider_settings()` connects to it end to end.
+
+Faults can be injected at any time: `drop_connections()` closes the hub
+sockets, `fail_next_auth(n)` rejects the next n negotiations, `revoke_tokens()`
+expires every issued token, and `mute_contract()` silences one contract while
+its subscription stays up.
+
+Run standalone with `python -m tradeforgepy.testing.topstepx_hub --help`.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web, WSMsgType
+
+from tradeforgepy.config import ProviderSettings
+
+logger = logging.getLogger(__name__)
+
+RECORD_SEPARATOR = "\x1e"
+_TS = "__TS__"
+_TEMPLATES_PER_FEED = 256
+
+# Hub command -> (feed kind, whether it subscribes). Feeds are keyed by (kind, argument).
+_MARKET_COMMANDS = {
+    "SubscribeContractQuotes": ("quote", True), "UnsubscribeContractQuotes": ("quote", False),
+    "SubscribeContractTrades": ("trade", True), "UnsubscribeContractTrades": ("trade", False),
+    "SubscribeContractMarketDepth": ("depth", True), "UnsubscribeContractMarketDepth": ("depth", False),
+}
+_USER_COMMANDS = {
+    "SubscribeAccounts": ("accounts", True), "UnsubscribeAccounts": ("accounts", False),
+    "SubscribeOrders": ("orders", True), "UnsubscribeOrders": ("orders", False),
+    "SubscribePositions": ("positions", True), "UnsubscribePositions": ("positions", False),
+    "SubscribeTrades": ("trades", True), "UnsubscribeTrades": ("trades", False),
+}
+_HUB_COMMANDS = {"market": _MARKET_COMMANDS, "user": _USER_COMMANDS}
+
+
+@dataclass
+class HubTraffic:
+    """Message rates the hub generates, per subscribed feed, in messages per second."""
+    quotes_per_sec: float = 0.0      # per contract subscribed to quotes
+    trades_per_sec: float = 0.0      # per contract subscribed to trades
+    depth_per_sec: float = 0.0       # per contract subscribed to depth
+    depth_levels: int = 10           # bid and ask updates per depth message
+    user_events_per_sec: float = 0.0  # per account and subscribed user feed (orders, positions, trades)
+    tick_seconds: float = 0.005      # generation granularity
+    max_batch: int = 256             # hub messages packed into one websocket frame
+
+    def rate_for(self, kind: str) -> float:
+        return {
+            "quote": self.quotes_per_sec, "trade": self.trades_per_sec, "depth": self.depth_per_sec,
+            "orders": self.user_events_per_sec, "positions": self.user_events_per_sec, "trades": self.user_events_per_sec,
+        }.get(kind, 0.0)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _record(target: str, arguments: List[Any]) -> str:
+    return json.dumps({"type": 1, "target": target, "arguments": arguments}, separators=(",", ":"))
+
+
+class _HubConnection:
+    def __init__(self, hub: str, ws: web.WebSocketResponse, token: str):
+        self.hub = hub
+        self.ws = ws
+        self.token = token
+        self.feeds: Set[Tuple[str, Any]] = set()
+        self.credit: Dict[Tuple[str, Any], float] = {}
+        self.sent = 0
+
+
+class TopStepXTestHub:
+    """
+    Local TopStepX market/user hub and login endpoint. See the module docstring.
+
+    Usage:
+        hub = await TopStepXTestHub(HubTraffic(quotes_per_sec=500)).start()
+        provider = TopStepXProvider(hub.provider_settings())
+        ...
+        await hub.stop()
+    """
+
+    def __init__(self, traffic: Optional[HubTraffic] = None, host: str = "127.0.0.1", port: int = 0, seed: int = 1):
+        self.traffic = traffic or HubTraffic()
+        self.host = host
+        self.port = port
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self._connections: List[_HubConnection] = []
+        self._generator_tasks: Set[asyncio.Task] = set()
+        self._token_seq = itertools.count(1)
+        self._valid_tokens: Set[str] = set()
+        self._auth_failures_to_inject = 0
+        self._muted: Set[str] = set()
+        self._templates: Dict[Tuple[str, str], List[str]] = {}
+        self._ids = itertools.count(1_000_000)
+
+        # --- Metrics ---
+        self.messages_sent: Counter = Counter()     # hub message target -> count
+        self.commands_received: Counter = Counter()  # hub command -> count
+        self.connections_opened = 0
+        self.auth_rejections = 0
+
+    # --- Lifecycle ---
+
+    async def start(self) -> "TopStepXTestHub":
+        app = web.Application()
+        app.router.add_post("/api/Auth/loginKey", self._login)
+        app.router.add_post("/api/Auth/validate", self._validate)
+        app.router.add_post("/hubs/{hub}/negotiate", self._negotiate)
+        app.router.add_get("/hubs/{hub}", self._websocket)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"TopStepX test hub listening on {self.base_url}")
+        return self
+
+    async def stop(self) -> None:
+        for task in list(self._generator_tasks):
+            task.cancel()
+        await self.drop_connections()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def market_hub_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/hubs/market"
+
+    @property
+    def user_hub_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/hubs/user"
+
+    def provider_settings(self, username: str = "test-user", api_key: str = "test-key") -> ProviderSettings:
+        """DEMO settings whose REST and hub URLs all point at this hub."""
+        return ProviderSettings(
+            USERNAME=username, API_KEY=api_key, ENVIRONMENT="DEMO",
+            API_URL_DEMO=self.base_url, MARKET_HUB_DEMO=self.market_hub_url, USER_HUB_DEMO=self.user_hub_url,
+        )
+
+    # --- Fault injection ---
+
+    async def drop_connections(self, hub: Optional[str] = None) -> int:
+        """Closes every open socket (of one hub, if given). Returns how many were closed."""
+        dropped = [c for c in self._connections if hub is None or c.hub == hub]
+        for conn in dropped:
+            await conn.ws.close(code=1011, message=b"Injected disconnect")
+        return len(dropped)
+
+    def fail_next_auth(self, count: int = 1) -> None:
+        """Makes the next `count` hub negotiations fail with 401, whatever the token."""
+        self._auth_failures_to_inject += count
+
+    def revoke_tokens(self) -> None:
+        """Expires every token issued so far; hubs and /validate reject them until a new login."""
+        self._valid_tokens.clear()
+
+    def mute_contract(self, contract_id: str) -> None:
+        """Stops generating market traffic for a contract without touching its subscriptions."""
+        self._muted.add(contract_id)
+
+    def unmute_contract(self, contract_id: str) -> None:
+        self._muted.discard(contract_id)
+
+    def subscriptions(self, hub: Optional[str] = None) -> Set[Tuple[str, Any]]:
+        """The (feed kind, argument) pairs currently subscribed across open connections."""
+        return {feed for c in self._connections if hub is None or c.hub == hub for feed in c.feeds}
+
+    # --- REST ---
+
+    async def _login(self, request: web.Request) -> web.Response:
+        token = f"test-token-{next(self._token_seq)}"
+        self._valid_tokens.add(token)
+        return web.json_response({"success": True, "errorCode": 0, "errorMessage": None, "token": token})
+
+    async def _validate(self, request: web.Request) -> web.Response:
+        token = request.headers.get("Authorization", "")[len("Bearer "):]
+        if token not in self._valid_tokens:
+            return web.json_response({"success": False, "errorCode": 1, "errorMessage": "Token expired"}, status=401)
+        return web.json_response({"success": True, "errorCode": 0, "errorMessage": None, "newToken": None})
+
+    def _token_ok(self, request: web.Request) -> bool:
+        if self._auth_failures_to_inject > 0:
+            self._auth_failures_to_inject -= 1
+            return False
+        return request.query.get("access_token") in self._valid_tokens
+
+    # --- SignalR ---
+
+    async def _negotiate(self, request: web.Request) -> web.Response:
+        if request.match_info["hub"] not in _HUB_COMMANDS or not self._token_ok(request):
+            self.auth_rejections += 1
+            return web.Response(status=401)
+        return web.json_response({
+            "connectionId": f"conn-{next(self._ids)}", "negotiateVersion": 0,
+            "availableTransports": [{"transport": "WebSockets", "transferFormats": ["Text"]}],
+        })
+
+    async def _websocket(self, request: web.Request) -> web.StreamResponse:
+        hub = request.match_info["hub"]
+        token = request.query.get("access_token", "")
+        if hub not in _HUB_COMMANDS or token not in self._valid_tokens:
+            self.auth_rejections += 1
+            return web.Response(status=401)
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        conn = _HubConnection(hub, ws, token)
+
+        first = await ws.receive()
+        if first.type != WSMsgType.TEXT or '"json"' not in first.data:
+            await ws.send_str(json.dumps({"error": "Only the json protocol is supported."}) + RECORD_SEPARATOR)
+            await ws.close()
+            return ws
+        await ws.send_str("{}" + RECORD_SEPARATOR)
+
+        self._connections.append(conn)
+        self.connections_opened += 1
+        generator = asyncio.create_task(self._generate(conn), name=f"TestHub_{hub}_Generator")
+        self._generator_tasks.add(generator)
+        generator.add_done_callback(self._generator_tasks.discard)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    break
+                for raw in msg.data.split(RECORD_SEPARATOR):
+                    if raw:
+                        await self._on_record(conn, json.loads(raw))
+        finally:
+            generator.cancel()
+            self._connections.remove(conn)
+        return ws
+
+    async def _on_record(self, conn: _HubConnection, message: Dict[str, Any]) -> None:
+        if message.get("type") == 7:  # Close
+            await conn.ws.close()
+            return
+        if message.get("type") != 1:  # Pings and anything else need no reply.
+            return
+        target, args = message.get("target"), message.get("arguments") or []
+        self.commands_received[target] += 1
+        command = _HUB_COMMANDS[conn.hub].get(target)
+        error = None
+        if command is None:
+            error = f"Unknown hub method '{target}'."
+        else:
+            kind, subscribe = command
+            feed = (kind, args[0] if args else None)
+            if subscribe:
+                conn.feeds.add(feed)
+            else:
+                conn.feeds.discard(feed)
+                conn.credit.pop(feed, None)
+        if message.get("invocationId"):
+            completion = {"type": 3, "invocationId": message["invocationId"]}
+            completion.update({"error": error} if error else {"result": None})
+            await conn.ws.send_str(json.dumps(completion) + RECORD_SEPARATOR)
+
+    # --- Traffic ---
+
+    async def _generate(self, conn: _HubConnection) -> None:
+        loop = asyncio.get_running_loop()
+        traffic = self.traffic
+        last = loop.time()
+        while True:
+            await asyncio.sleep(traffic.tick_seconds)
+            now = loop.time()
+            elapsed, last = now - last, now
+            ts = _now_iso()
+            records: List[str] = []
+            for feed in list(conn.feeds):
+                rate = traffic.rate_for(feed[0])
+                if rate <= 0 or (conn.hub == "market" and feed[1] in self._muted):
+                    continue
+                # Carry fractional messages over, but never more than a quarter second of backlog.
+                credit = min(conn.credit.get(feed, 0.0) + rate * elapsed, max(rate * 0.25, 1.0))
+                count = int(credit)
+                conn.credit[feed] = credit - count
+                records.extend(self._messages(feed, count, ts))
+            for i in range(0, len(records), traffic.max_batch):
+                if conn.ws.closed:
+                    return
+                await conn.ws.send_str(RECORD_SEPARATOR.join(records[i:i + traffic.max_batch]) + RECORD_SEPARATOR)
+            conn.sent += len(records)
+
+    def _messages(self, feed: Tuple[str, Any], count: int, ts: str) -> List[str]:
+        kind, arg = feed
+        if kind in ("quote", "trade", "depth"):
+            target = {"quote": "GatewayQuote", "trade": "GatewayTrade", "depth": "GatewayDepth"}[kind]
+            pool = self._templates.get((kind, arg))
+            if pool is None:
+                pool = self._templates[(kind, arg)] = [self._market_template(kind, arg) for _ in range(_TEMPLATES_PER_FEED)]
+            self.messages_sent[target] += count
+            return [self._rng.choice(pool).replace(_TS, ts) for _ in range(count)]
+        target, build = {
+            "orders": ("GatewayUserOrder", self._order_payload),
+            "positions": ("GatewayUserPosition", self._position_payload),
+            "trades": ("GatewayUserTrade", self._user_trade_payload),
+        }.get(kind, (None, None))
+        if target is None:
+            return []
+        self.messages_sent[target] += count
+        return [_record(target, [build(int(arg), ts)]) for _ in range(count)]
+
+    def _price(self, ticks: int = 40) -> float:
+        return 5400.0 + self._rng.randint(-ticks, ticks) * 0.25
+
+    def _market_template(self, kind: str, contract_id: str) -> str:
+        rng = self._rng
+        if kind == "quote":
+            bid = self._price()
+            payload = {
+                "symbol": contract_id, "lastPrice": bid + 0.25, "bestBid": bid, "bestAsk": bid + 0.25,
+                "volume": rng.randint(1, 500000), "lastUpdated": _TS, "timestamp": _TS,
+            }
+            return _record("GatewayQuote", [contract_id, payload])
+        if kind == "trade":
+            payload = {"symbolId": contract_id, "price": self._price(), "timestamp": _TS,
+                       "type": rng.randint(0, 1), "volume": rng.randint(1, 25)}
+            return _record("GatewayTrade", [contract_id, payload])
+        mid = self._price(8)
+        updates = []
+        for n in range(1, self.traffic.depth_levels + 1):
+            updates.append({"timestamp": _TS, "type": 4, "price": mid - n * 0.25, "volume": rng.randint(1, 200), "currentVolume": 0})
+            updates.append({"timestamp": _TS, "type": 3, "price": mid + n * 0.25, "volume": rng.randint(1, 200), "currentVolume": 0})
+        rng.shuffle(updates)
+        return _record("GatewayDepth", [contract_id, updates])
+
+    def _order_payload(self, account_id: int, ts: str) -> Dict[str, Any]:
+        rng = self._rng
+        return {"action": 1, "data": {
+            "id": next(self._ids), "accountId": account_id, "contractId": "CON.F.US.EP.M25",
+            "creationTimestamp": ts, "updateTimestamp": ts, "status": rng.choice([1, 2, 3]),
+            "type": 1, "side": rng.randint(0, 1), "size": rng.randint(1, 5), "limitPrice": self._price(), "fillVolume": 0,
+        }}
+
+    def _position_payload(self, account_id: int, ts: str) -> Dict[str, Any]:
+        return {"action": 1, "data": {
+            "id": next(self._ids), "accountId": account_id, "contractId": "CON.F.US.EP.M25",
+            "creationTimestamp": ts, "type": 1, "size": self._rng.randint(1, 10), "averagePrice": self._price(),
+        }}
+
+    def _user_trade_payload(self, account_id: int, ts: str) -> Dict[str, Any]:
+        return {"action": 0, "data": {
+            "id": next(self._ids), "accountId": account_id, "contractId": "CON.F.US.EP.M25",
+            "creationTimestamp": ts, "price": self._price(), "profitAndLoss": None, "fees": 1.24,
+            "side": self._rng.randint(0, 1), "size": self._rng.randint(1, 5), "voided": False, "orderId": next(self._ids),
+        }}
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    traffic = HubTraffic(
+        quotes_per_sec=args.quotes_per_sec, trades_per_sec=args.trades_per_sec, depth_per_sec=args.depth_per_sec,
+        depth_levels=args.depth_levels, user_events_per_sec=args.user_events_per_sec,
+    )
+    hub = await TopStepXTestHub(traffic, host=args.host, port=args.port).start()
+    # The first line is machine-readable so a parent process can find the port.
+    print(f"READY {hub.base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await hub.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local TopStepX market/user hub for stream testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port.")
+    parser.add_argument("--quotes-per-sec", type=float, default=10.0, help="Per contract subscribed to quotes.")
+    parser.add_argument("--trades-per-sec", type=float, default=5.0, help="Per contract subscribed to trades.")
+    parser.add_argument("--depth-per-sec", type=float, default=10.0, help="Per contract subscribed to depth.")
+    parser.add_argument("--depth-levels", type=int, default=10)
+    parser.add_argument("--user-events-per-sec", type=float, default=1.0, help="Per account and subscribed user feed.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# tradeforgepy/utils/cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from tradeforgepy.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+_CacheKey = Tuple[str, Hashable]
+
+
+class CachePolicy:
+    """
+    Expiry rules for one kind of cached value.
+
+    `ttl`: seconds a loaded value is served as fresh.
+    `stale_ttl`: further seconds an expired value is still served while it is
+        reloaded in the background (stale-while-revalidate). 0 disables it.
+    `negative_ttl`: seconds a `NotFoundError` from the loader is remembered and
+        raised again without calling the loader. None disables negative caching.
+    """
+    __slots__ = ("ttl", "stale_ttl", "negative_ttl")
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, negative_ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+
+
+class _Entry:
+    __slots__ = ("value", "error", "weight", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, error: Optional[NotFoundError], weight: int, fresh_until: float, stale_until: float):
+        self.value = value
+        self.error = error
+        self.weight = weight
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+def _count_items(value: Any) -> int:
+    """Default weigher: the number of records in a list or tuple, 1 for anything else."""
+    return len(value) if isinstance(value, (list, tuple)) else 1
+
+
+class TTLCache:
+    """
+    A bounded read-through cache for provider lookups, keyed by (kind, key).
+
+    `get_or_load()` returns a fresh value, or calls the loader once per key however
+    many callers miss at the same time. Each kind has its own `CachePolicy`; with a
+    stale window, an expired value is returned immediately and reloaded in the
+    background, so callers only wait on a cold miss. Not-found results can be
+    cached negatively.
+
+    The cache holds at most `max_entries` entries and, if `max_weight` is set, at
+    most that total weight as measured by `weigher` (by default the number of
+    records in a list value, so the bound tracks memory roughly). The least
+    recently used entries are evicted first.
+    """
+
+    def __init__(self, policies: Optional[Dict[str, CachePolicy]] = None,
+                 default_policy: CachePolicy = CachePolicy(ttl=300.0),
+                 max_entries: int = 10000, max_weight: Optional[int] = None,
+                 weigher: Callable[[Any], int] = _count_items, name: str = "TTLCache"):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.policies: Dict[str, CachePolicy] = dict(policies or {})
+        self.default_policy = default_policy
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.name = name
+        self._entries: "OrderedDict[_CacheKey, _Entry]" = OrderedDict()
+        self._weight = 0
+        self._inflight: Dict[_CacheKey, asyncio.Task] = {}
+
+        # --- Metrics ---
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def policy(self, kind: str) -> CachePolicy:
+        return self.policies.get(kind, self.default_policy)
+
+    def _count(self, kind: str, counter: str) -> None:
+        counters = self._counters.get(kind)
+        if counters is None:
+            counters = self._counters[kind] = {
+                "hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0, "loads": 0, "load_errors": 0
+            }
+        counters[counter] += 1
+
+    # --- Reads ---
+
+    async def get_or_load(self, kind: str, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """Returns the cached value for (kind, key), loading it with `loader()` when needed."""
+        full_key = (kind, key)
+        entry = self._entries.get(full_key)
+        if entry is not None:
+            now = time.monotonic()
+            if now < entry.fresh_until:
+                self._entries.move_to_end(full_key)
+                if entry.error is not None:
+                    self._count(kind, "negative_hits")
+                    raise entry.error
+                self._count(kind, "hits")
+                return entry.value
+            if entry.error is None and now < entry.stale_until:
+                self._entries.move_to_end(full_key)
+                self._count(kind, "stale_hits")
+                self._revalidate(full_key, loader)
+                return entry.value
+
+        self._count(kind, "misses")
+        task = self._inflight.get(full_key) or self._start_load(full_key, loader, background=False)
+        # Shielded so one caller giving up does not cancel the load for the others.
+        return await asyncio.shield(task)
+
+    def peek(self, kind: str, key: Hashable) -> Optional[Any]:
+        """Returns a fresh or stale value without loading or counting, or None."""
+        entry = self._entries.get((kind, key))
+        if entry is None or entry.error is not None or time.monotonic() >= entry.stale_until:
+            return None
+        return entry.value
+
+    async def _load(self, full_key: _CacheKey, loader: Callable[[], Awaitable[T]]) -> T:
+        kind = full_key[0]
+        try:
+            self._count(kind, "loads")
+            try:
+                value = await loader()
+            except NotFoundError as e:
+                self._count(kind, "load_errors")
+                negative_ttl = self.policy(kind).negative_ttl
+                if negative_ttl:
+                    now = time.monotonic()
+                    self._store(full_key, _Entry(None, e, 1, now + negative_ttl, now + negative_ttl))
+                raise
+            except Exception:
+                self._count(kind, "load_errors")
+                raise
+            self.put(kind, full_key[1], value)
+            return value
+        finally:
+            self._inflight.pop(full_key, None)
+
+    def _revalidate(self, full_key: _CacheKey, loader: Callable[[], Awaitable[Any]]) -> None:
+        if full_key not in self._inflight:
+            self._start_load(full_key, loader, background=True)
+
+    def _start_load(self, full_key: _CacheKey, loader: Callable[[], Awaitable[Any]], background: bool) -> asyncio.Task:
+        task = self._inflight[full_key] = asyncio.ensure_future(self._load(full_key, loader))
+        task.add_done_callback(partial(self._load_done, full_key, background))
+        return task
+
+    def _load_done(self, full_key: _CacheKey, background: bool, task: asyncio.Task) -> None:
+        # Always retrieves the outcome, so a load whose callers all gave up does not log as unhandled.
+        error = None if task.cancelled() else task.exception()
+        if background and error is not None and not isinstance(error, NotFoundError):
+            # The stale value stays until its stale window ends; the next stale hit retries.
+            logger.warning(f"{self.name}: background refresh of {full_key} failed: {error}")
+
+    # --- Writes ---
+
+    def put(self, kind: str, key: Hashable, value: Any) -> None:
+        """Stores a value loaded elsewhere, e.g. a REST result that bypassed the cache."""
+        policy = self.policy(kind)
+        now = time.monotonic()
+        fresh_until = now + policy.ttl
+        self._store((kind, key), _Entry(value, None, self.weigher(value), fresh_until, fresh_until + policy.stale_ttl))
+
+    def _store(self, full_key: _CacheKey, entry: _Entry) -> None:
+        old = self._entries.pop(full_key, None)
+        if old is not None:
+            self._weight -= old.weight
+        self._entries[full_key] = entry
+        self._weight += entry.weight
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or (self.max_weight is not None and self._weight > self.max_weight)):
+            _, evicted = self._entries.popitem(last=False)
+            self._weight -= evicted.weight
+            self.evictions += 1
+
+    def invalidate(self, kind: Optional[str] = None, key: Optional[Hashable] = None) -> None:
+        """Drops one entry, every entry of a kind, or (with no arguments) everything."""
+        if kind is not None and key is not None:
+            targets = [(kind, key)]
+        else:
+            targets = [k for k in self._entries if kind is None or k[0] == kind]
+        for full_key in targets:
+            entry = self._entries.pop(full_key, None)
+            if entry is not None:
+                self._weight -= entry.weight
+
+    async def close(self) -> None:
+        """Cancels loads and background refreshes still in flight."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "weight": self._weight,
+            "evictions": self.evictions,
+            "in_flight": len(self._inflight),
+            "kinds": {kind: dict(counters) for kind, counters in self._counters.items()},
+        }
@@ -0,0 +1,80 @@
+# tradeforgepy/utils/lazy_sequence.py
+from typing import Any, Callable, Generic, Iterator, List, Sequence, TypeVar, Union
+
+T = TypeVar("T")
+
+_UNMAPPED = object()
+
+
+class LazyMappedList(Sequence[T], Generic[T]):
+    """
+    A read-only sequence that maps raw rows to result objects on first access.
+
+    The raw rows (e.g. the dictionaries from a REST list response) are kept
+    as-is and `map_row` is only called for the rows that are actually read.
+    Each mapped result is memoized, so repeated access is free. Filtering,
+    sorting and slicing operate on the raw rows and return new lazy lists,
+    which means code that filters by contract or takes the first N items only
+    pays the mapping cost for the rows it uses.
+
+    The sequence is accepted anywhere a list is validated by Pydantic, so it
+    can be returned directly from API endpoints.
+    """
+    __slots__ = ("_rows", "_map_row", "_mapped")
+
+    def __init__(self, rows: Sequence[Any], map_row: Callable[[Any], T]):
+        self._rows: List[Any] = rows if isinstance(rows, list) else list(rows)
+        self._map_row = map_row
+        self._mapped: List[Any] = [_UNMAPPED] * len(self._rows)
+
+    def _derive(self, indices: Sequence[int]) -> "LazyMappedList[T]":
+        derived = LazyMappedList([self._rows[i] for i in indices], self._map_row)
+        # Carry over anything that has already been mapped.
+        derived._mapped = [self._mapped[i] for i in indices]
+        return derived
+
+    def filter_raw(self, predicate: Callable[[Any], bool]) -> "LazyMappedList[T]":
+        """Returns a new lazy list with only the raw rows for which `predicate(row)` is true."""
+        return self._derive([i for i, row in enumerate(self._rows) if predicate(row)])
+
+    def sorted_raw(self, key: Callable[[Any], Any], reverse: bool = False) -> "LazyMappedList[T]":
+        """Returns a new lazy list ordered by `key(row)` evaluated on the raw rows."""
+        rows = self._rows
+        return self._derive(sorted(range(len(rows)), key=lambda i: key(rows[i]), reverse=reverse))
+
+    def materialize(self) -> List[T]:
+        """Maps every remaining row and returns the results as a plain list."""
+        return list(self)
+
+    def raw_row(self, index: int) -> Any:
+        """Returns the unmapped row at `index`."""
+        return self._rows[index]
+
+    @property
+    def mapped_count(self) -> int:
+        """The number of rows that have been mapped so far."""
+        return sum(1 for item in self._mapped if item is not _UNMAPPED)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return self._derive(range(len(self._rows))[index])
+        item = self._mapped[index]
+        if item is _UNMAPPED:
+            item = self._map_row(self._rows[index])
+            self._mapped[index] = item
+        return item
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(len(self._rows)):
+            yield self[i]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (LazyMappedList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyMappedList(rows={len(self._rows)}, mapped={self.mapped_count})"
@@ -0,0 +1,76 @@
+# tradeforgepy/utils/tick_utils.py
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Union
+
+PriceLike = Union[int, float, Decimal, str]
+"""Any value that can be interpreted as a price."""
+
+
+class TickScale:
+    """
+    Exact conversions between prices and integer tick counts for one contract.
+
+    A price is represented as `ticks * tick_size`, where `ticks` is a plain
+    Python int. Integer ticks compare, hash and add exactly, which makes them
+    suitable as dictionary keys for book levels and free of float rounding
+    issues. Conversion back to a price goes through `Decimal`, so the value
+    sent to the provider is exactly the intended multiple of the tick size.
+    """
+    __slots__ = ("tick_size", "_tick_float")
+
+    OFF_TICK_TOLERANCE = 1e-6
+    """How far (as a fraction of one tick) a float price may drift from a tick before it is considered off-tick."""
+
+    def __init__(self, tick_size: PriceLike):
+        tick = tick_size if isinstance(tick_size, Decimal) else Decimal(str(tick_size))
+        if not tick.is_finite() or tick <= 0:
+            raise ValueError(f"Tick size must be a positive number, got {tick_size!r}.")
+        self.tick_size = tick
+        self._tick_float = float(tick)
+
+    def to_ticks(self, price: PriceLike, strict: bool = True) -> int:
+        """
+        Converts a price to the nearest integer number of ticks.
+
+        Args:
+            price: The price to convert.
+            strict: If True, raise ValueError when the price is not within
+                    `OFF_TICK_TOLERANCE` of a tick. If False, round to the
+                    nearest tick.
+        """
+        if isinstance(price, float):
+            # Fast path: float division is exact enough to identify the nearest tick.
+            quotient = price / self._tick_float
+            ticks = round(quotient)
+            off_tick = abs(quotient - ticks) > self.OFF_TICK_TOLERANCE
+        else:
+            quotient = (price if isinstance(price, Decimal) else Decimal(str(price))) / self.tick_size
+            ticks = int(quotient.to_integral_value(rounding=ROUND_HALF_EVEN))
+            off_tick = abs(quotient - ticks) > Decimal(str(self.OFF_TICK_TOLERANCE))
+
+        if strict and off_tick:
+            raise ValueError(f"Price {price} is not a multiple of tick size {self.tick_size}.")
+        return ticks
+
+    def to_decimal(self, ticks: int) -> Decimal:
+        """Converts a tick count to an exact Decimal price."""
+        return self.tick_size * ticks
+
+    def to_price(self, ticks: int) -> float:
+        """Converts a tick count to the float closest to the exact price."""
+        return float(self.tick_size * ticks)
+
+    def round_price(self, price: PriceLike) -> float:
+        """Snaps a price to the nearest tick and returns it as a float."""
+        return self.to_price(self.to_ticks(price, strict=False))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TickScale):
+            return self.tick_size == other.tick_size
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.tick_size)
+
+    def __repr__(self) -> str:
+        return f"TickScale(tick_size={self.tick_size})"
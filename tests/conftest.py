@@ -0,0 +1,38 @@
+# tests/conftest.py
+from types import SimpleNamespace
+
+import pytest
+
+from tradeforgepy.config import ProviderSettings
+from tradeforgepy.providers.topstepx.provider import TopStepXProvider
+
+
+def ts_contract(contract_id="CON.F.US.ENQ.Z25", name="NQZ5", description="E-mini NASDAQ-100", tick_size=0.25, tick_value=5.0):
+    return {"id": contract_id, "name": name, "description": description,
+            "tickSize": tick_size, "tickValue": tick_value, "activeContract": True}
+
+
+def ts_order(order_id, account_id=1, contract_id="CON.F.US.ENQ.Z25", created="2026-01-05T14:30:00+00:00", status=1):
+    return {"id": order_id, "accountId": account_id, "contractId": contract_id, "creationTimestamp": created,
+            "status": status, "type": 1, "side": 0, "size": 1, "limitPrice": 100.25, "fillVolume": 0}
+
+
+def ts_trade(trade_id, account_id=1, contract_id="CON.F.US.ENQ.Z25", created="2026-01-05T14:30:00+00:00"):
+    return {"id": trade_id, "accountId": account_id, "contractId": contract_id, "creationTimestamp": created,
+            "price": 100.25, "fees": 1.0, "side": 0, "size": 1, "voided": False, "orderId": trade_id}
+
+
+def ok(**fields):
+    """A successful TopStepX response envelope with the given payload fields."""
+    return SimpleNamespace(success=True, errorCode=0, errorMessage=None,
+                           model_dump=lambda **kwargs: {"success": True}, **fields)
+
+
+@pytest.fixture
+def make_provider():
+    """Builds a TopStepXProvider that is marked as connected; tests replace http_client methods."""
+    def _make(**kwargs) -> TopStepXProvider:
+        provider = TopStepXProvider(ProviderSettings(USERNAME="user", API_KEY="key"), **kwargs)
+        provider._is_connected_http = True
+        return provider
+    return _make
@@ -0,0 +1,88 @@
+# tests/test_account_state.py
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from tradeforgepy.core.account_state import AccountStateStore, ORDERS, POSITIONS
+from tradeforgepy.core.enums import OrderSide, OrderStatus, OrderType
+from tradeforgepy.core.models_generic import Order, OrderUpdateEvent, Position, PositionUpdateEvent
+
+from conftest import ok, ts_order
+
+NOW = datetime(2026, 1, 5, 14, 30, tzinfo=timezone.utc)
+
+
+def order(order_id, status=OrderStatus.WORKING, size=1.0):
+    return Order(provider_order_id=order_id, provider_account_id="1", provider_contract_id="CON.A",
+                 order_type=OrderType.LIMIT, order_side=OrderSide.BUY, original_size=size, status=status,
+                 limit_price=100.0, created_at_utc=NOW)
+
+
+def order_event(o):
+    return OrderUpdateEvent(provider_account_id="1", provider_contract_id="CON.A", timestamp_utc=NOW, order_data=o)
+
+
+def position_event(quantity):
+    p = Position(provider_account_id="1", provider_contract_id="CON.A", quantity=quantity, average_entry_price=100.0)
+    return PositionUpdateEvent(provider_account_id="1", provider_contract_id="CON.A", timestamp_utc=NOW, position_data=p)
+
+
+def test_events_during_a_seed_are_replayed_over_the_snapshot():
+    store = AccountStateStore()
+    seed = store.begin_seed(ORDERS, "1")
+    # While the REST snapshot is in flight, order 2 is filled and order 3 is placed.
+    store.apply(order_event(order("2", OrderStatus.FILLED)))
+    store.apply(order_event(order("3")))
+    # The snapshot was taken before those events and still shows order 2 working.
+    store.complete_seed(seed, [order("1"), order("2")])
+
+    assert store.is_fresh(ORDERS, "1")
+    assert sorted(o.provider_order_id for o in store.open_orders("1")) == ["1", "3"]
+
+
+def test_live_events_update_seeded_state():
+    store = AccountStateStore()
+    store.complete_seed(store.begin_seed(POSITIONS, "1"), [])
+    store.apply(position_event(2))
+    assert [p.quantity for p in store.positions("1")] == [2]
+    store.apply(position_event(0))
+    assert store.positions("1") == []
+
+
+def test_invalidation_during_a_seed_leaves_the_state_stale():
+    store = AccountStateStore()
+    seed = store.begin_seed(ORDERS, "1")
+    store.invalidate()
+    store.complete_seed(seed, [order("1")])
+    assert not store.is_fresh(ORDERS, "1")
+    # The contents are still the last known state, e.g. for a resync baseline.
+    assert [o.provider_order_id for o in store.open_orders("1")] == ["1"]
+
+
+def test_freshness_expires_after_max_age(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("tradeforgepy.core.account_state.time.monotonic", lambda: clock[0])
+    store = AccountStateStore()
+    assert store.max_age is not None
+    store.complete_seed(store.begin_seed(ORDERS, "1"), [])
+    clock[0] += store.max_age - 1
+    assert store.is_fresh(ORDERS, "1")
+    clock[0] += 2
+    assert not store.is_fresh(ORDERS, "1")
+
+
+async def test_only_the_public_getters_seed_the_store(make_provider):
+    provider = make_provider(track_account_state=True)
+    provider.user_stream_handler = SimpleNamespace(is_feed_live=lambda data_type, account_id=None: True)
+
+    async def search_open_orders(request):
+        return ok(orders=[ts_order(1)])
+
+    async def cancel_order(account_id, order_id):
+        return ok()
+    provider.http_client.ts_search_open_orders = search_open_orders
+    provider.http_client.ts_cancel_order = cancel_order
+
+    assert [r.provider_order_id for r in await provider.cancel_all(1)] == ["1"]
+    assert not provider.account_state.is_fresh(ORDERS, "1")
+    await provider.get_open_orders(1)
+    assert provider.account_state.is_fresh(ORDERS, "1")
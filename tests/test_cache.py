@@ -0,0 +1,100 @@
+# tests/test_cache.py
+import asyncio
+
+import pytest
+
+from tradeforgepy.exceptions import NotFoundError
+from tradeforgepy.utils.cache import CachePolicy, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("tradeforgepy.utils.cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def counting_loader(results):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        result = results[min(len(calls), len(results)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return load, calls
+
+
+async def test_expired_values_are_served_while_they_reload_in_the_background(clock):
+    cache = TTLCache({"accounts": CachePolicy(ttl=10.0, stale_ttl=10.0)})
+    load, calls = counting_loader(["v1", "v2"])
+    assert await cache.get_or_load("accounts", None, load) == "v1"
+
+    clock[0] += 15.0
+    # Stale: the old value comes back at once and a single refresh starts.
+    assert await cache.get_or_load("accounts", None, load) == "v1"
+    assert await cache.get_or_load("accounts", None, load) == "v1"
+    await asyncio.sleep(0)
+    assert len(calls) == 2
+    assert await cache.get_or_load("accounts", None, load) == "v2"
+    assert cache.stats()["kinds"]["accounts"]["stale_hits"] == 2
+
+    clock[0] += 25.0
+    # Past the stale window the caller waits for a fresh load.
+    assert await cache.get_or_load("accounts", None, load) == "v2"
+    assert len(calls) == 3
+    await cache.close()
+
+
+async def test_failed_background_refresh_keeps_the_stale_value(clock):
+    cache = TTLCache({"accounts": CachePolicy(ttl=10.0, stale_ttl=10.0)})
+    load, calls = counting_loader(["v1", ConnectionError("down")])
+    await cache.get_or_load("accounts", None, load)
+    clock[0] += 15.0
+    assert await cache.get_or_load("accounts", None, load) == "v1"
+    await asyncio.sleep(0)
+    assert cache.peek("accounts", None) == "v1"
+    await cache.close()
+
+
+async def test_not_found_is_cached_only_with_a_negative_ttl(clock):
+    load, calls = counting_loader([NotFoundError("no such contract")])
+    cache = TTLCache({"contract": CachePolicy(ttl=10.0, negative_ttl=5.0)})
+    for _ in range(2):
+        with pytest.raises(NotFoundError):
+            await cache.get_or_load("contract", "X", load)
+    assert len(calls) == 1
+    assert cache.stats()["kinds"]["contract"]["negative_hits"] == 1
+
+    clock[0] += 6.0
+    with pytest.raises(NotFoundError):
+        await cache.get_or_load("contract", "X", load)
+    assert len(calls) == 2
+
+    uncached = TTLCache({"contract": CachePolicy(ttl=10.0)})
+    for _ in range(2):
+        with pytest.raises(NotFoundError):
+            await uncached.get_or_load("contract", "X", load)
+    assert len(calls) == 4
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    release = asyncio.Event()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await release.wait()
+        return "v"
+    waiters = [asyncio.create_task(cache.get_or_load("bars", "k", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["v", "v", "v"]
+    assert calls == [1]
+
+
+async def test_provider_defaults_neither_serve_stale_nor_cache_not_found(make_provider):
+    policy = make_provider().read_cache.policy("contract")
+    assert policy.stale_ttl == 0 and policy.negative_ttl is None
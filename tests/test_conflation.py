@@ -0,0 +1,123 @@
+# tests/test_conflation.py
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from tradeforgepy.core.enums import ConflationMode, MarketDataType
+from tradeforgepy.core.models_generic import MarketTradeEvent, QuoteEvent
+from tradeforgepy.exceptions import InvalidParameterError
+from tradeforgepy.streaming.conflation import EventConflator
+
+NOW = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+def quote(bid, contract="CON.A"):
+    return QuoteEvent(provider_contract_id=contract, timestamp_utc=NOW, bid_price=bid)
+
+
+def trade(price, contract="CON.A"):
+    return MarketTradeEvent(provider_contract_id=contract, timestamp_utc=NOW, price=price, size=1)
+
+
+class SlowConsumer:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.received = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, event):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.received.append(event.bid_price if isinstance(event, QuoteEvent) else ("trade", event.price))
+        self.active -= 1
+
+
+def test_depth_deltas_cannot_be_conflated():
+    conflator = EventConflator(SlowConsumer())
+    with pytest.raises(InvalidParameterError):
+        conflator.configure("CON.A", MarketDataType.DEPTH, ConflationMode.LATEST)
+
+
+async def test_latest_keeps_arrival_order_and_serial_delivery():
+    consumer = SlowConsumer()
+    conflator = EventConflator(consumer)
+    conflator.configure("CON.A", MarketDataType.QUOTE, ConflationMode.LATEST)
+
+    async def produce():
+        await conflator.submit(quote(1))
+        await conflator.submit(quote(2))
+        await conflator.submit(trade(10))   # waits for its turn behind quote 2
+        await conflator.submit(quote(3))
+        await conflator.submit(quote(4))
+
+    await produce()
+    await asyncio.sleep(0.1)
+    # Quote 2 is delivered before the trade that followed it; quote 3 was replaced by 4.
+    assert consumer.received == [2, ("trade", 10), 4]
+    assert consumer.max_active == 1
+    assert conflator.stats()["CON.A"]["QUOTE"]["dropped"] == 2
+    await conflator.close()
+
+
+async def test_replaced_quote_moves_behind_later_trade():
+    consumer = SlowConsumer(delay=0.02)
+    conflator = EventConflator(consumer)
+    conflator.configure("CON.A", MarketDataType.QUOTE, ConflationMode.LATEST)
+    await conflator.submit(quote(1))               # queued, drain starts
+    trade_task = asyncio.create_task(conflator.submit(trade(10)))
+    await asyncio.sleep(0)
+    await conflator.submit(quote(2))               # arrives after the trade
+    await trade_task
+    await asyncio.sleep(0.1)
+    assert consumer.received == [1, ("trade", 10), 2]
+    await conflator.close()
+
+
+async def test_interval_limits_delivery_rate():
+    consumer = SlowConsumer(delay=0)
+    conflator = EventConflator(consumer)
+    conflator.configure("CON.A", MarketDataType.QUOTE, ConflationMode.INTERVAL, interval_ms=50)
+    for bid in range(1, 6):
+        await conflator.submit(quote(bid))
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.1)
+    assert consumer.received == [1, 5]
+    await conflator.close()
+
+
+async def test_disabling_conflation_delivers_the_pending_event():
+    consumer = SlowConsumer(delay=0)
+    conflator = EventConflator(consumer)
+    conflator.configure("CON.A", MarketDataType.QUOTE, ConflationMode.INTERVAL, interval_ms=1000)
+    await conflator.submit(quote(1))
+    await asyncio.sleep(0.01)
+    await conflator.submit(quote(2))               # held for the interval
+    await asyncio.sleep(0.01)
+    assert consumer.received == [1]
+    conflator.configure("CON.A", MarketDataType.QUOTE, ConflationMode.NONE)
+    await asyncio.sleep(0.01)
+    assert consumer.received == [1, 2]
+    await conflator.close()
+
+
+async def test_close_discards_pending_events():
+    consumer = SlowConsumer(delay=0.05)
+    conflator = EventConflator(consumer)
+    conflator.configure("CON.A", MarketDataType.QUOTE, ConflationMode.LATEST)
+    await conflator.submit(quote(1))
+    await conflator.submit(quote(2))
+    await conflator.close()
+    await asyncio.sleep(0.1)
+    assert consumer.received == []
+
+
+def test_dispatch_queue_never_conflates_depth_deltas():
+    from tradeforgepy.core.models_generic import DepthSnapshotEvent
+    from tradeforgepy.streaming.dispatch_queue import default_conflation_key
+
+    assert default_conflation_key(quote(1)) == (MarketDataType.QUOTE, "CON.A")
+    assert default_conflation_key(DepthSnapshotEvent(provider_contract_id="CON.A", timestamp_utc=NOW)) is None
+    assert default_conflation_key(trade(1)) is None
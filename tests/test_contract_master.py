@@ -0,0 +1,59 @@
+# tests/test_contract_master.py
+from tradeforgepy.core.enums import AssetClass
+from tradeforgepy.providers.topstepx.schemas_ts import TSContractModel
+
+from conftest import ok, ts_contract
+
+
+def contract(contract_id, name, description):
+    return TSContractModel.model_validate(ts_contract(contract_id, name, description))
+
+
+NQ = contract("CON.F.US.ENQ.Z25", "NQZ5", "E-mini NASDAQ-100")
+ES = contract("CON.F.US.EP.Z25", "ESZ5", "E-mini S&P 500")
+
+
+def contract_api(provider, universe, search_results):
+    searches = []
+
+    async def get_available_contracts(live=False):
+        return ok(contracts=universe)
+
+    async def search_contracts(search_text, live=False):
+        searches.append(search_text)
+        return ok(contracts=search_results)
+    provider.http_client.ts_get_available_contracts = get_available_contracts
+    provider.http_client.ts_search_contracts = search_contracts
+    return searches
+
+
+async def test_symbol_prefixes_are_answered_locally(make_provider):
+    provider = make_provider(use_contract_master=True, contract_refresh_seconds=None)
+    searches = contract_api(provider, [NQ, ES], [])
+
+    assert [c.symbol for c in await provider.search_contracts("nq")] == ["NQZ5"]
+    assert [c.symbol for c in await provider.search_contracts("ES", asset_class=AssetClass.FUTURES)] == ["ESZ5"]
+    assert await provider.search_contracts("NQ", asset_class=AssetClass.STOCK) == []
+    assert searches == ["NQ"]  # the filtered-out prefix falls through to the server
+    assert provider.contract_master.search("NQ", asset_class=AssetClass.STOCK) == []
+
+
+async def test_other_text_uses_the_server_search_merged_with_local_matches(make_provider):
+    provider = make_provider(use_contract_master=True, contract_refresh_seconds=None)
+    micro = contract("CON.F.US.MNQ.Z25", "MNQZ5", "Micro E-mini Nasdaq-100")
+    searches = contract_api(provider, [NQ, ES], [micro])
+
+    contracts = await provider.search_contracts("nasdaq")
+    assert searches == ["nasdaq"]
+    assert [c.symbol for c in contracts] == ["MNQZ5", "NQZ5"]
+    # Server results are remembered for later prefix searches.
+    assert [c.symbol for c in await provider.search_contracts("MNQ")] == ["MNQZ5"]
+    assert searches == ["nasdaq"]
+
+
+async def test_contract_master_is_off_by_default(make_provider):
+    provider = make_provider()
+    searches = contract_api(provider, [NQ, ES], [NQ])
+    assert provider.contract_master is None
+    assert [c.symbol for c in await provider.search_contracts("NQ")] == ["NQZ5"]
+    assert searches == ["NQ"]
@@ -0,0 +1,45 @@
+# tests/test_depth_levels.py
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from tradeforgepy.core.enums import OrderSide
+from tradeforgepy.core.models_generic import DepthLevel, DepthLevels, DepthSnapshotEvent
+
+NOW = datetime(2026, 1, 5, 14, 30, tzinfo=timezone.utc)
+
+
+def test_levels_are_sorted_best_first_per_side():
+    bids = DepthLevels(OrderSide.BUY, [100.0, 100.5, 99.75], [1, 2, 3])
+    asks = DepthLevels(OrderSide.SELL, [101.0, 100.75], [4, 5])
+    assert list(bids.prices) == [100.5, 100.0, 99.75] and list(bids.sizes) == [2, 1, 3]
+    assert asks.best == DepthLevel(price=100.75, size=5, side=OrderSide.SELL)
+    assert bids.top(2).total_size() == 3 and bids[1:].best_price == 100.0
+    with pytest.raises(ValueError):
+        DepthLevels(OrderSide.BUY, [100.0], [])
+
+
+def test_a_container_always_has_a_side():
+    with pytest.raises(ValueError):
+        DepthLevels(None)
+    with pytest.raises(ValueError):
+        DepthLevels.from_levels([])
+    assert DepthLevels.from_levels([], side=OrderSide.SELL).side == OrderSide.SELL
+    with pytest.raises(ValueError):
+        DepthLevels.from_levels([DepthLevel(price=1, size=1, side=OrderSide.BUY),
+                                 DepthLevel(price=2, size=1, side=OrderSide.SELL)])
+
+
+def test_snapshot_round_trips_through_json_including_empty_sides():
+    event = DepthSnapshotEvent(provider_contract_id="CON.A", timestamp_utc=NOW,
+                               bids=DepthLevels(OrderSide.BUY, [100.0, 100.25], [1, 2]))
+    restored = DepthSnapshotEvent.model_validate_json(event.model_dump_json())
+    assert restored.bids == event.bids and restored.bids.best_price == 100.25
+    assert len(restored.asks) == 0 and restored.asks.side == OrderSide.SELL
+
+
+def test_snapshot_rejects_levels_on_the_wrong_side():
+    with pytest.raises(ValidationError):
+        DepthSnapshotEvent(provider_contract_id="CON.A", timestamp_utc=NOW,
+                           asks=[{"price": 100.0, "size": 1, "side": "BUY"}])
@@ -0,0 +1,96 @@
+# tests/test_dispatcher.py
+from datetime import datetime, timezone
+
+from tradeforgepy.core.enums import MarketDataType, UserDataType
+from tradeforgepy.core.models_generic import Account, AccountUpdateEvent, MarketTradeEvent, QuoteEvent
+from tradeforgepy.streaming.dispatcher import EventDispatcher
+
+NOW = datetime.now(timezone.utc)
+
+
+def quote(contract_id):
+    return QuoteEvent(provider_contract_id=contract_id, timestamp_utc=NOW, bid_price=1.0, ask_price=1.25)
+
+
+def market_trade(contract_id):
+    return MarketTradeEvent(provider_contract_id=contract_id, timestamp_utc=NOW, price=1.0, size=1.0)
+
+
+def account_update(account_id):
+    return AccountUpdateEvent(provider_account_id=account_id, timestamp_utc=NOW,
+                              account_data=Account(provider_account_id=account_id))
+
+
+def recorder(name, received):
+    async def handler(event):
+        received.append((name, event))
+    return handler
+
+
+async def test_events_reach_only_the_subscribers_whose_filters_match():
+    received = []
+    dispatcher = EventDispatcher()
+    dispatcher.subscribe(recorder("all", received))
+    dispatcher.subscribe(recorder("quotes", received), event_types=[MarketDataType.QUOTE])
+    dispatcher.subscribe(recorder("es", received), provider_contract_ids=["ES"])
+    dispatcher.subscribe(recorder("es-quotes", received), event_types=[MarketDataType.QUOTE], provider_contract_ids=["ES"])
+    dispatcher.subscribe(recorder("acct-7", received), provider_account_ids=["7"])
+
+    async def routed(event):
+        received.clear()
+        count = await dispatcher.dispatch(event)
+        assert count == len(received)
+        return [name for name, _ in received]
+
+    # Subscribers are called in subscription order.
+    assert await routed(quote("ES")) == ["all", "quotes", "es", "es-quotes"]
+    assert await routed(quote("NQ")) == ["all", "quotes"]
+    assert await routed(market_trade("ES")) == ["all", "es"]
+    assert await routed(account_update("7")) == ["all", "acct-7"]
+    assert await routed(account_update("8")) == ["all"]
+
+
+async def test_contract_and_account_filters_are_alternatives_and_deliver_once():
+    received = []
+    dispatcher = EventDispatcher()
+    dispatcher.subscribe(recorder("client", received), event_types=[MarketDataType.QUOTE, UserDataType.ACCOUNT_UPDATE],
+                         provider_contract_ids=["ES", "NQ"], provider_account_ids=["7"])
+
+    for event in [quote("ES"), quote("NQ"), quote("CL"), market_trade("ES"), account_update("7"), account_update("8")]:
+        await dispatcher.dispatch(event)
+    assert [(e.event_type, e.provider_contract_id or e.provider_account_id) for _, e in received] == [
+        (MarketDataType.QUOTE, "ES"), (MarketDataType.QUOTE, "NQ"), (UserDataType.ACCOUNT_UPDATE, "7"),
+    ]
+
+
+async def test_a_failing_subscriber_is_reported_without_stopping_the_rest():
+    received, errors = [], []
+
+    async def broken(event):
+        raise RuntimeError("boom")
+
+    async def on_error(error):
+        errors.append(error)
+
+    dispatcher = EventDispatcher(on_subscriber_error=on_error)
+    failing = dispatcher.subscribe(broken)
+    dispatcher.subscribe(recorder("ok", received))
+
+    assert await dispatcher.dispatch(quote("ES")) == 1
+    assert [name for name, _ in received] == ["ok"]
+    assert [str(e) for e in errors] == ["boom"]
+    assert (failing.delivered, failing.errors) == (0, 1)
+
+
+async def test_unsubscribe_removes_every_route():
+    received = []
+    dispatcher = EventDispatcher()
+    subscription = dispatcher.subscribe(recorder("client", received), event_types=[MarketDataType.QUOTE, MarketDataType.TRADE],
+                                        provider_contract_ids=["ES", "NQ"])
+    assert dispatcher.subscriber_count == 1
+
+    dispatcher.unsubscribe(subscription)
+    assert dispatcher.subscriber_count == 0
+    assert dispatcher._routes == {}
+    assert await dispatcher.dispatch(quote("ES")) == 0
+    assert received == []
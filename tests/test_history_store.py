@@ -0,0 +1,68 @@
+# tests/test_history_store.py
+from datetime import datetime, timedelta, timezone
+
+from tradeforgepy.core.enums import OrderStatus
+from tradeforgepy.storage.history_store import HistoryStore, ORDERS
+
+from conftest import ok, ts_order
+
+T0 = datetime(2026, 1, 5, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def test_missing_ranges_cover_only_what_was_not_synced():
+    store = HistoryStore(":memory:")
+    assert store.missing_ranges("TopStepX", "1", ORDERS, T0, T0 + 2 * HOUR) == [(T0, T0 + 2 * HOUR)]
+    store.save_orders("TopStepX", "1", [], T0, T0 + 2 * HOUR)
+
+    assert store.missing_ranges("TopStepX", "1", ORDERS, T0 + HOUR, T0 + 2 * HOUR) == []
+    # Forward fetches restart `overlap` before the end of coverage; earlier gaps are filled too.
+    assert store.missing_ranges("TopStepX", "1", ORDERS, T0 - HOUR, T0 + 3 * HOUR, overlap=timedelta(minutes=5)) == [
+        (T0 - HOUR, T0), (T0 + 2 * HOUR - timedelta(minutes=5), T0 + 3 * HOUR)
+    ]
+    # Stored orders that were still open force a refresh from their creation time.
+    assert store.missing_ranges("TopStepX", "1", ORDERS, T0, T0 + 2 * HOUR, refresh_from=T0 + HOUR) == [
+        (T0 + HOUR, T0 + 2 * HOUR)
+    ]
+
+
+def search_orders_recorder(provider, orders):
+    requests = []
+
+    async def search_orders(request):
+        requests.append((request.startTimestamp, request.endTimestamp))
+        return ok(orders=orders)
+    provider.http_client.ts_search_orders = search_orders
+    return requests
+
+
+async def test_repeated_queries_only_fetch_the_unsynced_part(make_provider):
+    provider = make_provider(history_db_path=":memory:")
+    now = datetime.now(timezone.utc)
+    requests = search_orders_recorder(provider, [ts_order(1, created=(now - 2 * HOUR).isoformat(), status=2)])
+
+    first = await provider.get_order_history(1, now - 3 * HOUR, now - HOUR)
+    assert [o.provider_order_id for o in first] == ["1"] and type(first) is list
+    assert len(requests) == 1
+
+    second = await provider.get_order_history(1, now - 3 * HOUR, now)
+    assert [o.provider_order_id for o in second] == ["1"]
+    # Only the part after the last sync, plus the overlap, is fetched.
+    assert len(requests) == 2
+    assert datetime.fromisoformat(requests[1][0]) == now - HOUR - provider._HISTORY_SYNC_OVERLAP
+
+    await provider.get_order_history(1, now - 2 * HOUR, now - HOUR)
+    assert len(requests) == 2
+
+
+async def test_order_lookup_uses_stored_orders_outside_the_search_windows(make_provider):
+    provider = make_provider(history_db_path=":memory:")
+    created = datetime.now(timezone.utc) - timedelta(days=30)
+    search_orders_recorder(provider, [ts_order(5, created=created.isoformat(), status=2)])
+    await provider.get_order_history(1, created - HOUR, created + HOUR)
+
+    provider.order_index = type(provider.order_index)()  # e.g. evicted, or a fresh process
+    requests = search_orders_recorder(provider, [])
+    order = await provider.get_order_by_id(1, 5)
+    assert order is not None and order.status == OrderStatus.FILLED
+    assert requests == []
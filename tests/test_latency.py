@@ -0,0 +1,39 @@
+# tests/test_latency.py
+import re
+from datetime import datetime, timezone
+
+from tradeforgepy.streaming.latency import LatencyTracker, RollingHistogram, STAGE_DELIVER
+
+
+def series(text, suffix):
+    pattern = rf'tradeforge_stream_latency_seconds_{suffix}{{[^}}]*stage="{STAGE_DELIVER}"}} (\S+)'
+    return float(re.search(pattern, text).group(1))
+
+
+def test_window_expires_but_lifetime_totals_do_not():
+    hist = RollingHistogram(window_seconds=6.0, slices=6)
+    hist.observe(1000, now=0.0)
+    hist.observe(3000, now=0.5)
+    assert hist.snapshot(now=1.0)["count"] == 2
+    assert hist.snapshot(now=100.0) == {"count": 0}
+    assert (hist.lifetime_count, hist.lifetime_total_ns) == (2, 4000)
+
+
+def test_prometheus_count_and_sum_are_monotonic(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("tradeforgepy.streaming.latency.time.monotonic", lambda: clock[0])
+    tracker = LatencyTracker(window_seconds=6.0, slices=6)
+    ts = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    # 2 ms in the callbacks per event.
+    tracker.observe("MarketStream", "QUOTE", ts, recv_ns=0, emit_ns=0, dispatch_ns=0, done_ns=2_000_000)
+    tracker.observe("MarketStream", "QUOTE", ts, recv_ns=0, emit_ns=0, dispatch_ns=0, done_ns=2_000_000)
+    first = tracker.render_prometheus()
+    assert series(first, "count") == 2
+    assert series(first, "sum") == 0.004
+    assert 'quantile="0.5"' in first
+
+    clock[0] = 100.0                                   # the window has moved past both events
+    tracker.observe("MarketStream", "QUOTE", ts, recv_ns=0, emit_ns=0, dispatch_ns=0, done_ns=2_000_000)
+    later = tracker.render_prometheus()
+    assert series(later, "count") == 3
+    assert series(later, "sum") == 0.006
@@ -0,0 +1,99 @@
+# tests/test_loop_thread.py
+import asyncio
+import threading
+
+from tradeforgepy.streaming.loop_thread import StreamLoopThread
+
+
+async def eventually(condition, timeout=2.0):
+    async def _poll():
+        while not condition():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(_poll(), timeout)
+
+
+async def test_start_run_and_stop():
+    thread = StreamLoopThread(name="TestStreamLoop")
+    thread.start()
+    try:
+        assert thread.is_running
+
+        async def on_stream_loop():
+            return threading.current_thread().name
+        assert await thread.run(on_stream_loop()) == "TestStreamLoop"
+        assert thread.call(lambda x: x + 1, 1) == 2
+
+        async def main_thread_name():
+            return threading.current_thread().name
+        assert await thread.run(thread.run_on_main(main_thread_name())) == threading.current_thread().name
+
+        # Work left running on the stream loop is cancelled by stop().
+        forever = asyncio.run_coroutine_threadsafe(asyncio.sleep(3600), thread.loop)
+    finally:
+        await thread.stop()
+    assert not thread.is_running
+    assert forever.cancelled()
+
+
+async def test_posts_are_delivered_in_order():
+    thread = StreamLoopThread(handoff_maxsize=50)
+    received = []
+
+    async def handler(i):
+        received.append(i)
+    thread.start()
+    try:
+        post = thread.wrap(handler)
+
+        async def produce():
+            for i in range(500):
+                await post(i)
+        await thread.run(produce())
+        await eventually(lambda: thread.delivered == 500)
+        assert received == list(range(500))
+        assert thread.metrics()["high_watermark"] <= 50
+    finally:
+        await thread.stop()
+
+
+async def test_a_full_handoff_blocks_the_producer_until_the_main_loop_drains():
+    thread = StreamLoopThread(handoff_maxsize=2)
+    release = asyncio.Event()
+    received = []
+
+    async def handler(i):
+        await release.wait()
+        received.append(i)
+    thread.start()
+    try:
+        async def produce():
+            for i in range(6):
+                await thread.post(handler, i)
+        producer = asyncio.run_coroutine_threadsafe(produce(), thread.loop)
+        await eventually(lambda: thread.blocked_posts >= 1)
+        assert not producer.done()
+
+        release.set()
+        await asyncio.wrap_future(producer)
+        await eventually(lambda: thread.delivered == 6)
+        assert received == list(range(6))
+    finally:
+        await thread.stop()
+
+
+async def test_stop_discards_undelivered_items():
+    thread = StreamLoopThread()
+    started = asyncio.Event()
+
+    async def stuck(i):
+        started.set()
+        await asyncio.Event().wait()
+    thread.start()
+
+    async def produce():
+        for i in range(3):
+            await thread.post(stuck, i)
+    await thread.run(produce())
+    await started.wait()
+    await thread.stop()
+    assert thread.metrics()["depth"] == 0 and thread.delivered == 0
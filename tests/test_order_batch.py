@@ -0,0 +1,40 @@
+# tests/test_order_batch.py
+import asyncio
+
+from tradeforgepy.exceptions import OperationFailedError
+
+from conftest import ok
+
+
+async def test_each_failure_maps_to_its_own_response(make_provider):
+    provider = make_provider()
+
+    async def cancel_order(account_id, order_id):
+        if order_id == 2:
+            raise OperationFailedError("rejected")
+        if order_id == 3:
+            raise ValueError("bad payload")
+        return ok()
+    provider.http_client.ts_cancel_order = cancel_order
+
+    responses = await provider.cancel_orders(1, [1, 2, 3, 4])
+    assert [(r.provider_order_id, r.success) for r in responses] == [("1", True), ("2", False), ("3", False), ("4", True)]
+    assert responses[1].message == "rejected" and responses[2].message == "bad payload"
+
+
+async def test_batches_respect_the_concurrency_limit(make_provider):
+    provider = make_provider(max_concurrent_order_requests=2)
+    assert provider._order_request_slots is None  # created inside the running loop
+    running, peak = [0], [0]
+
+    async def cancel_order(account_id, order_id):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return ok()
+    provider.http_client.ts_cancel_order = cancel_order
+
+    responses = await provider.cancel_orders(1, list(range(6)))
+    assert all(r.success for r in responses)
+    assert peak[0] == 2
@@ -0,0 +1,77 @@
+# tests/test_order_book.py
+from tradeforgepy.core.enums import OrderSide
+from tradeforgepy.core.order_book import OrderBook
+from tradeforgepy.providers.topstepx.mapper import apply_ts_depth_to_order_book
+from tradeforgepy.providers.topstepx.schemas_ts import TSDomType
+from tradeforgepy.utils.tick_utils import TickScale
+
+TS = "2026-01-05T14:30:00+00:00"
+
+
+def level(type_code, price, volume, timestamp=TS):
+    return {"type": int(type_code), "price": price, "volume": volume, "timestamp": timestamp}
+
+
+def test_deltas_add_resize_and_remove_levels():
+    book = OrderBook("CON.A", TickScale("0.25"))
+    assert book.apply_level(OrderSide.BUY, 100.0, 5)
+    assert book.apply_level(OrderSide.BUY, 100.25, 2)
+    assert book.apply_level(OrderSide.SELL, 100.75, 3)
+    assert book.apply_level(OrderSide.SELL, 100.5, 4)
+    assert book.best_bid() == (100.25, 2)
+    assert book.best_ask() == (100.5, 4)
+
+    assert not book.apply_level(OrderSide.BUY, 100.25, 2)     # same size: no change
+    assert book.apply_level(OrderSide.BUY, 100.25, 7)
+    assert book.apply_level(OrderSide.SELL, 100.5, 0)         # zero size removes the level
+    assert not book.apply_level(OrderSide.SELL, 99.0, 0)      # removing a missing level: no change
+    assert book.best_bid() == (100.25, 7)
+    assert book.best_ask() == (100.75, 3)
+    assert book.bid_depth == 2 and book.ask_depth == 1
+    assert book.spread() == 0.5
+
+
+def test_tick_keys_merge_float_noise_into_one_level():
+    book = OrderBook("CON.A", TickScale("0.1"))
+    book.apply_level(OrderSide.BUY, 0.1 + 0.2, 1)
+    book.apply_level(OrderSide.BUY, 0.3, 4)
+    assert book.bid_depth == 1
+    assert book.best_bid() == (0.3, 4)
+
+
+def test_top_and_cumulative_depth_are_best_first():
+    book = OrderBook("CON.A")
+    for price, size in ((99.0, 1), (101.0, 2), (100.0, 3)):
+        book.apply_level(OrderSide.BUY, price, size)
+    assert list(book.top(OrderSide.BUY, 2).prices) == [101.0, 100.0]
+    assert list(book.cumulative_depth(OrderSide.BUY).sizes) == [2, 5, 6]
+    assert book.total_size(OrderSide.BUY, 2) == 5
+
+
+def test_depth_message_applies_deltas_and_commits_once():
+    book = OrderBook("CON.A", TickScale("0.25"))
+    event = apply_ts_depth_to_order_book(book, [
+        level(TSDomType.BID, 100.0, 5),
+        level(TSDomType.ASK, 100.25, 3),
+        level(TSDomType.TRADE, 100.0, 1),                     # not a book level
+    ], "TopStepX")
+    assert event.sequence == 1 and event.levels_changed == 2
+    assert (event.best_bid_price, event.best_ask_price) == (100.0, 100.25)
+
+    event = apply_ts_depth_to_order_book(book, [level(TSDomType.ASK, 100.25, 0)], "TopStepX")
+    assert event.sequence == 2 and event.best_ask_price is None
+
+    assert apply_ts_depth_to_order_book(book, [level(TSDomType.BID, 100.0, 5)], "TopStepX") is None
+    assert book.sequence == 2
+
+
+def test_reset_clears_the_book_before_later_levels():
+    book = OrderBook("CON.A")
+    book.apply_level(OrderSide.BUY, 100.0, 5)
+    book.apply_level(OrderSide.SELL, 101.0, 5)
+    event = apply_ts_depth_to_order_book(book, [
+        {"type": int(TSDomType.RESET), "timestamp": TS},
+        level(TSDomType.BID, 99.0, 1),
+    ], "TopStepX")
+    assert event.is_reset
+    assert book.best_bid() == (99.0, 1) and book.best_ask() is None
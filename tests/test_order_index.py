@@ -0,0 +1,61 @@
+# tests/test_order_index.py
+from datetime import datetime, timezone
+
+from tradeforgepy.core.enums import OrderSide, OrderStatus, OrderType
+from tradeforgepy.core.models_generic import Order
+from tradeforgepy.core.order_index import OrderIndex
+
+NOW = datetime(2026, 1, 5, 14, 30, tzinfo=timezone.utc)
+
+
+def order(order_id, status=OrderStatus.WORKING, client_order_id=None):
+    return Order(provider_order_id=order_id, provider_account_id="1", provider_contract_id="CON.A",
+                 order_type=OrderType.LIMIT, order_side=OrderSide.BUY, original_size=1, status=status,
+                 limit_price=100.0, created_at_utc=NOW, client_order_id=client_order_id)
+
+
+def test_least_recently_written_orders_are_evicted_with_their_client_ids():
+    index = OrderIndex(max_orders=2)
+    index.record_placement("1", "1", "tag-1", NOW)
+    index.put(order("2", client_order_id="tag-2"))
+    index.put(order("1"))                     # rewriting order 1 makes order 2 the oldest
+    index.put(order("3"))
+
+    assert len(index) == 2
+    assert index.get("1", "2") is None
+    assert index.resolve_client_order_id("1", "tag-2") is None
+    assert index.resolve_client_order_id("1", "tag-1") == "1"
+    assert index.stats()["client_ids"] == 1
+
+
+def test_lazy_entries_are_loaded_once_on_first_read():
+    index = OrderIndex()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return order("5", OrderStatus.FILLED)
+    index.put_lazy("1", "5", loader)
+    index.put_lazy("1", "6", lambda: None)
+    assert loads == []
+
+    assert index.get("1", "5").status == OrderStatus.FILLED
+    assert index.get("1", "5").status == OrderStatus.FILLED
+    assert loads == [1]
+    assert index.placed_at("1", "5") == NOW
+    assert index.get("1", "6") is None
+    assert (index.hits, index.misses) == (2, 1)
+
+
+def test_client_order_id_from_the_placement_is_merged_into_later_records():
+    index = OrderIndex()
+    index.record_placement("1", "7", "my-tag", NOW)
+    assert index.get("1", "7") is None
+    assert index.placed_at("1", "7") == NOW
+
+    index.put_lazy("1", "7", lambda: order("7"))  # provider records do not carry the tag
+    assert index.get("1", "7").client_order_id == "my-tag"
+    index.put(order("7", OrderStatus.FILLED))
+    merged = index.get("1", "7")
+    assert merged.client_order_id == "my-tag" and merged.status == OrderStatus.FILLED
+    assert index.resolve_client_order_id("1", "my-tag") == "7"
@@ -0,0 +1,57 @@
+# tests/test_replay.py
+import asyncio
+
+from tradeforgepy.streaming.capture import CaptureRecord
+from tradeforgepy.streaming.hash_ring import ConsistentHashRing
+from tradeforgepy.streaming.replay import ReplaySource
+
+
+class FakeStream:
+    def __init__(self, stream_name):
+        self.stream_name = stream_name
+        self.received = []
+
+    async def handle(self, args):
+        self.received.append(args[0])
+
+    async def wait_until_idle(self):
+        pass
+
+
+async def replay(source, streams):
+    connections = []
+    for stream in streams:
+        connection = source.connection_for(stream, "replay://")
+        connection.on("GatewayQuote", stream.handle)
+        connections.append(connection)
+    runs = [asyncio.create_task(c.run()) for c in connections]
+    await asyncio.wait_for(source.wait_finished(), 1)
+    for connection in connections:
+        await connection.stop()
+    await asyncio.gather(*runs)
+
+
+async def test_sharded_records_go_to_the_owning_shard():
+    contracts = [f"CON.F.US.C{i}.Z25" for i in range(20)]
+    # Recorded with one shard; replayed with three.
+    records = [CaptureRecord(i, "MarketStream[0]", "GatewayQuote", [cid, {}]) for i, cid in enumerate(contracts)]
+    shards = {i: FakeStream(f"MarketStream[{i}]") for i in range(3)}
+    ring = ConsistentHashRing(shards)
+
+    source = ReplaySource(records, expected_streams=("MarketStream",))
+    source.route("MarketStream", lambda cid: shards[ring.get_node(cid)].stream_name,
+                 [s.stream_name for s in shards.values()])
+    await replay(source, shards.values())
+
+    assert source.replayed == len(contracts) and source.unhandled == 0
+    for index, shard in shards.items():
+        assert shard.received == [cid for cid in contracts if ring.get_node(cid) == index]
+    assert all(shard.received for shard in shards.values())
+
+
+async def test_unrouted_shard_records_use_any_connection_of_the_stream():
+    records = [CaptureRecord(1, "MarketStream[4]", "GatewayQuote", ["CON.A", {}])]
+    stream = FakeStream("MarketStream")
+    source = ReplaySource(records, expected_streams=("MarketStream",))
+    await replay(source, [stream])
+    assert stream.received == ["CON.A"]
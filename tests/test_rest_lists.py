@@ -0,0 +1,61 @@
+# tests/test_rest_lists.py
+from datetime import datetime, timezone
+
+import pytest
+
+from tradeforgepy.exceptions import TradeForgeError
+from tradeforgepy.utils.lazy_sequence import LazyMappedList
+
+from conftest import ok, ts_order, ts_trade
+
+
+def test_lazy_list_maps_only_accessed_rows():
+    calls = []
+    lazy = LazyMappedList([1, 2, 3, 4], lambda row: calls.append(row) or row * 10)
+    assert lazy.filter_raw(lambda row: row % 2 == 0)[1] == 40
+    assert calls == [4]
+    assert lazy.sorted_raw(lambda row: -row)[:2].materialize() == [40, 30]
+
+
+async def test_order_getters_return_plain_lists(make_provider):
+    provider = make_provider(use_contract_master=False, track_account_state=False)
+
+    async def open_orders(request):
+        return ok(orders=[ts_order(1), ts_order(2, contract_id="CON.F.US.EP.Z25")])
+    provider.http_client.ts_search_open_orders = open_orders
+
+    orders = await provider.get_open_orders(1)
+    assert type(orders) is list and len(orders) == 2
+    orders.append(orders[0])
+    assert len(orders + orders) == 6
+
+    filtered = await provider.get_open_orders(1, "CON.F.US.EP.Z25")
+    assert type(filtered) is list
+    assert [o.provider_order_id for o in filtered] == ["2"]
+
+
+async def test_invalid_rows_fail_inside_the_call(make_provider):
+    provider = make_provider(use_contract_master=False)
+    bad = ts_trade(1)
+    del bad["price"]
+
+    async def trades(request):
+        return ok(trades=[ts_trade(2), bad])
+    provider.http_client.ts_search_trades = trades
+
+    with pytest.raises(TradeForgeError, match="Malformed trade"):
+        await provider.get_trade_history(1, start_time_utc=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                                         end_time_utc=datetime(2026, 1, 6, tzinfo=timezone.utc))
+
+
+async def test_trade_limit_returns_newest_first(make_provider):
+    provider = make_provider(use_contract_master=False)
+
+    async def trades(request):
+        return ok(trades=[ts_trade(i, created=f"2026-01-0{i}T00:00:00+00:00") for i in range(1, 6)])
+    provider.http_client.ts_search_trades = trades
+
+    newest = await provider.get_trade_history(1, start_time_utc=datetime(2026, 1, 1, tzinfo=timezone.utc),
+                                              end_time_utc=datetime(2026, 1, 9, tzinfo=timezone.utc), limit=2)
+    assert type(newest) is list
+    assert [t.provider_trade_id for t in newest] == ["5", "4"]
@@ -0,0 +1,102 @@
+# tests/test_resync.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from tradeforgepy.core.account_state import AccountStateStore
+from tradeforgepy.core.enums import OrderSide, OrderStatus, OrderType, UserDataType
+from tradeforgepy.core.models_generic import Order, OrderUpdateEvent, Trade, UserTradeEvent
+from tradeforgepy.providers.topstepx.resync import UserStateResync
+
+from conftest import ok, ts_order
+
+NOW = datetime.now(timezone.utc)
+
+
+def trade(trade_id, minutes_ago=1):
+    ts = NOW - timedelta(minutes=minutes_ago)
+    return Trade(provider_trade_id=str(trade_id), provider_order_id="1", provider_account_id="1",
+                 provider_contract_id="CON.A", timestamp_utc=ts, side=OrderSide.BUY, quantity=1, price=100.0)
+
+
+def fill(trade_id, minutes_ago=1):
+    t = trade(trade_id, minutes_ago)
+    return UserTradeEvent(provider_account_id="1", provider_contract_id="CON.A", timestamp_utc=t.timestamp_utc, trade_data=t)
+
+
+class FakeApi:
+    def __init__(self, trades):
+        self.trades = trades
+
+    async def get_trade_history(self, account_id, start_time_utc, end_time_utc):
+        return [t for t in self.trades if start_time_utc <= t.timestamp_utc <= end_time_utc]
+
+
+def test_seen_trades_are_bounded_per_account():
+    resync = UserStateResync(FakeApi([]), "TopStepX", AccountStateStore(), max_seen_trades=3)
+    for i in range(10):
+        resync.observe(fill(i))
+    assert list(resync._seen_trades["1"]) == ["7", "8", "9"]
+
+
+async def test_resync_emits_only_fills_missed_during_the_gap():
+    resync = UserStateResync(FakeApi([trade(1, 3), trade(2, 2), trade(3, 1)]), "TopStepX", AccountStateStore())
+    resync.observe(fill(1, 3))
+    events = await resync.resync({"1": {UserDataType.USER_TRADE}}, since=NOW - timedelta(minutes=5))
+    assert [e.trade_data.provider_trade_id for e in events] == ["2", "3"]
+    assert all(e.is_synthetic for e in events)
+    assert await resync.resync({"1": {UserDataType.USER_TRADE}}, since=NOW - timedelta(minutes=5)) == []
+
+
+def order(order_id, status=OrderStatus.WORKING):
+    return Order(provider_order_id=order_id, provider_account_id="1", provider_contract_id="CON.A",
+                 order_type=OrderType.LIMIT, order_side=OrderSide.BUY, original_size=1, status=status,
+                 limit_price=100.0, created_at_utc=NOW - timedelta(minutes=10))
+
+
+class FakeOrderApi:
+    def __init__(self, open_orders, history):
+        self.open_orders, self.history = open_orders, history
+
+    async def get_open_orders(self, account_id):
+        return self.open_orders
+
+    async def get_order_history(self, account_id, start, end):
+        return self.history
+
+
+async def test_resync_diffs_orders_against_the_account_state():
+    state = AccountStateStore()
+    for o in (order("1"), order("2")):
+        state.apply(OrderUpdateEvent(provider_account_id="1", provider_contract_id="CON.A", timestamp_utc=NOW, order_data=o))
+    # During the gap order 1 filled, order 3 was placed and order 2 did not change.
+    api = FakeOrderApi([order("2"), order("3")], [order("1", OrderStatus.FILLED), order("2"), order("3")])
+    resync = UserStateResync(api, "TopStepX", state)
+
+    events = await resync.resync({"1": {UserDataType.ORDER_UPDATE}}, since=NOW - timedelta(minutes=5))
+    assert [(e.order_data.provider_order_id, e.order_data.status) for e in events] == [
+        ("3", OrderStatus.WORKING), ("1", OrderStatus.FILLED)
+    ]
+
+
+async def test_resync_with_account_state_tracking_still_reports_the_gap(make_provider):
+    provider = make_provider(track_account_state=True, resync_user_data=True)
+    provider.user_stream_handler = SimpleNamespace(is_feed_live=lambda data_type, account_id=None: True)
+    open_orders = [ts_order(1), ts_order(2)]
+    history = []
+
+    async def search_open_orders(request):
+        return ok(orders=open_orders)
+
+    async def search_orders(request):
+        return ok(orders=history)
+    provider.http_client.ts_search_open_orders = search_open_orders
+    provider.http_client.ts_search_orders = search_orders
+    await provider.get_open_orders(1)  # seeds the account state with orders 1 and 2
+
+    # During the gap order 1 filled and order 3 was placed.
+    open_orders[:] = [ts_order(2), ts_order(3)]
+    history[:] = [ts_order(1, status=2), ts_order(2), ts_order(3)]
+    events = await provider.user_state_resync.resync({"1": {UserDataType.ORDER_UPDATE}}, since=NOW - timedelta(minutes=5))
+    assert [(e.order_data.provider_order_id, e.order_data.status) for e in events] == [
+        ("3", OrderStatus.WORKING), ("1", OrderStatus.FILLED)
+    ]
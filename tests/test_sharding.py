@@ -0,0 +1,75 @@
+# tests/test_sharding.py
+from collections import Counter
+
+from tradeforgepy.core.enums import MarketDataType
+from tradeforgepy.providers.topstepx.sharding import ShardedMarketStream
+from tradeforgepy.streaming.hash_ring import ConsistentHashRing
+
+KEYS = [f"CON.F.US.C{i}.Z25" for i in range(2000)]
+
+
+def test_ring_placement_is_stable_and_roughly_even():
+    ring = ConsistentHashRing(range(4))
+    placement = {key: ring.get_node(key) for key in KEYS}
+    assert placement == {key: ConsistentHashRing(range(4)).get_node(key) for key in KEYS}
+    counts = Counter(placement.values())
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > len(KEYS) / 4 * 0.6
+
+
+def test_adding_or_removing_a_node_only_moves_its_keys():
+    ring = ConsistentHashRing(range(4))
+    before = {key: ring.get_node(key) for key in KEYS}
+    ring.add_node(4)
+    grown = {key: ring.get_node(key) for key in KEYS}
+    moved = [key for key in KEYS if grown[key] != before[key]]
+    assert all(grown[key] == 4 for key in moved)
+    assert 0 < len(moved) < len(KEYS) / 5 * 1.5
+
+    ring.remove_node(4)
+    assert {key: ring.get_node(key) for key in KEYS} == before
+
+
+class FakeShard:
+    def __init__(self, index):
+        self.stream_name = f"MarketStream_{index}"
+        self.subscriptions = {}
+        self.disconnected = False
+
+    async def subscribe_contract(self, contract_id, data_types):
+        self.subscriptions.setdefault(contract_id, set()).update(data_types)
+
+    async def unsubscribe_contract(self, contract_id, data_types):
+        self.subscriptions[contract_id].difference_update(data_types)
+        if not self.subscriptions[contract_id]:
+            del self.subscriptions[contract_id]
+
+    async def disconnect(self):
+        self.disconnected = True
+
+
+def carriers(stream, contract_id):
+    return [s.stream_name for s in stream.shards.values() if contract_id in s.subscriptions]
+
+
+async def test_resize_hands_moved_contracts_over_to_their_new_shard():
+    stream = ShardedMarketStream(FakeShard, 2)
+    contracts = KEYS[:200]
+    for cid in contracts:
+        await stream.subscribe_contract(cid, [MarketDataType.QUOTE, MarketDataType.DEPTH])
+    before = stream.shard_assignments()
+
+    moved = await stream.resize(3)
+    assert moved and set(moved.values()) == {"MarketStream_2"}
+    assert {cid for cid in contracts if before[cid] != stream.shard_assignments()[cid]} == set(moved)
+    for cid in contracts:
+        # Each contract is carried by exactly one shard, with all its data types.
+        assert carriers(stream, cid) == [stream.shard_for(cid).stream_name]
+        assert stream.shard_for(cid).subscriptions[cid] == {MarketDataType.QUOTE, MarketDataType.DEPTH}
+
+    removed = stream.shards[2]
+    moved_back = await stream.resize(2)
+    assert set(moved_back) == set(moved)
+    assert removed.disconnected and 2 not in stream.shards
+    assert stream.shard_assignments() == before
+    assert all(carriers(stream, cid) == [before[cid]] for cid in contracts)
@@ -0,0 +1,254 @@
+# tests/test_streams.py
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pysignalr.exceptions import AuthorizationError
+from pysignalr.messages import CompletionMessage
+
+from tradeforgepy.core.enums import OrderSide, OrderStatus, OrderType, StreamConnectionStatus, UserDataType
+from tradeforgepy.core.models_generic import Order, OrderUpdateEvent
+from tradeforgepy.providers.topstepx import mapper
+from tradeforgepy.providers.topstepx.streams import TopStepXMarketStreamInternal, TopStepXUserStreamInternal
+
+
+class FakeConnection:
+    def __init__(self):
+        self.handlers = {}
+        self.sent = []
+        self.opened = asyncio.Event()
+        self._closed = asyncio.Event()
+
+    def on(self, event, callback): self.handlers[event] = callback
+    def on_open(self, callback): self._on_open = callback
+    def on_close(self, callback): self._on_close = callback
+    def on_error(self, callback): self._on_error = callback
+
+    async def send(self, method, arguments, on_invocation=None):
+        self.sent.append((method, arguments, on_invocation))
+
+    async def run(self):
+        await self._on_open()
+        self.opened.set()
+        await self._closed.wait()
+
+    async def stop(self):
+        self._closed.set()
+
+
+class RejectingConnection(FakeConnection):
+    async def run(self):
+        raise AuthorizationError()
+
+
+def make_stream(rejected_sessions=0, instant_reconnect=True, **kwargs):
+    connections = []
+
+    def factory(stream, url):
+        connection = RejectingConnection() if len(connections) < rejected_sessions else FakeConnection()
+        connection.url = url
+        connections.append(connection)
+        return connection
+
+    async def ignore(*args):
+        pass
+
+    stream = TopStepXMarketStreamInternal(
+        hub_url="ws://hub", initial_token="token", event_callback=ignore, status_callback=ignore,
+        error_callback=ignore, stream_name="MarketStream", mapper=mapper, connection_factory=factory, **kwargs
+    )
+    if instant_reconnect:
+        stream._next_reconnect_delay = lambda: 0.0
+    return stream, connections
+
+
+async def wait_for_connection(connections, count):
+    while len(connections) < count:
+        await asyncio.sleep(0)
+    await asyncio.wait_for(connections[-1].opened.wait(), 1)
+
+
+async def test_cancelling_run_forever_stops_instead_of_reconnecting():
+    stream, connections = make_stream()
+    task = asyncio.create_task(stream.run_forever())
+    await wait_for_connection(connections, 1)
+
+    task.cancel()
+    await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), 1)
+    assert task.done()
+    assert len(connections) == 1
+
+
+async def test_cancelling_only_the_session_reconnects():
+    stream, connections = make_stream()
+    task = asyncio.create_task(stream.run_forever())
+    await wait_for_connection(connections, 1)
+
+    stream._cancel_session()
+    await asyncio.wait_for(wait_for_connection(connections, 2), 1)
+    assert not task.done()
+
+    await stream.disconnect()
+    await asyncio.wait_for(task, 1)
+
+
+async def test_a_rejected_token_is_handed_back_when_fetching_the_next_one():
+    asked = []
+
+    async def token_provider(rejected):
+        asked.append(rejected)
+        return f"token-{len(asked)}"
+
+    stream, connections = make_stream(rejected_sessions=1, token_provider=token_provider)
+    task = asyncio.create_task(stream.run_forever())
+    await asyncio.wait_for(wait_for_connection(connections, 2), 1)
+
+    # The first session's token was refused by the hub, so the next fetch names it.
+    assert asked == [None, "token-1"]
+    assert [c.url.rsplit("=", 1)[1] for c in connections] == ["token-1", "token-2"]
+    assert stream._rejected_token is None
+
+    await stream.disconnect()
+    await asyncio.wait_for(task, 1)
+
+
+async def test_refresh_token_clears_the_rejected_token_only_once_replaced():
+    asked = []
+
+    async def token_provider(rejected):
+        asked.append(rejected)
+        return "fresh"
+
+    stream, _ = make_stream(token_provider=token_provider)
+    stream._rejected_token = "stale"
+    await stream._refresh_token()
+    assert (asked, stream._current_token, stream._rejected_token) == (["stale"], "fresh", None)
+
+
+async def test_reconnect_delay_is_jittered_staggered_and_capped():
+    stream, _ = make_stream(instant_reconnect=False, reconnect_jitter=0.25, reconnect_stagger_sec=1.5)
+    for base in [2, 4, 8, 16, 32, 60, 60]:
+        assert base + 1.5 <= stream._next_reconnect_delay() <= base * 1.25 + 1.5
+
+    # Without jitter two streams that drop together stay apart by their stagger.
+    first, _ = make_stream(instant_reconnect=False, reconnect_jitter=0.0)
+    second, _ = make_stream(instant_reconnect=False, reconnect_jitter=0.0, reconnect_stagger_sec=0.75)
+    assert [first._next_reconnect_delay() for _ in range(3)] == [2.0, 4.0, 8.0]
+    assert [second._next_reconnect_delay() for _ in range(3)] == [2.75, 4.75, 8.75]
+
+    # A successful connection resets the backoff.
+    stream.connection = FakeConnection()
+    await stream._on_open_and_subscribe()
+    assert stream._reconnect_delay_sec == 2.0
+
+
+def make_user_stream(event_callback=None, error_callback=None, stream_mapper=mapper):
+    connection = FakeConnection()
+
+    async def ignore(*args):
+        pass
+
+    stream = TopStepXUserStreamInternal(
+        hub_url="ws://hub", initial_token="token", event_callback=event_callback or ignore, status_callback=ignore,
+        error_callback=error_callback or ignore, stream_name="UserStream", mapper=stream_mapper,
+        connection_factory=lambda s, url: connection
+    )
+    stream.connection = connection
+    stream.current_status = StreamConnectionStatus.CONNECTED
+    return stream, connection
+
+
+async def test_feed_is_live_only_after_the_hub_acknowledges_the_subscription():
+    stream, connection = make_user_stream()
+    await stream.subscribe_account("7", [UserDataType.ORDER_UPDATE, UserDataType.POSITION_UPDATE])
+    sent = {method: on_invocation for method, args, on_invocation in connection.sent}
+    assert set(sent) == {"SubscribeOrders", "SubscribePositions"}
+    assert not stream.is_feed_live(UserDataType.ORDER_UPDATE, "7")
+
+    # Still awaiting the completion, so nothing is sent twice.
+    await stream._send_pending_subscriptions()
+    assert len(connection.sent) == 2
+
+    await sent["SubscribeOrders"](CompletionMessage(invocation_id="1"))
+    await sent["SubscribePositions"](CompletionMessage(invocation_id="2", error="Not allowed"))
+    assert stream.is_feed_live(UserDataType.ORDER_UPDATE, "7")
+    assert not stream.is_feed_live(UserDataType.POSITION_UPDATE, "7")
+
+
+def order_event(order_id, synthetic=False):
+    order = Order(provider_order_id=order_id, provider_account_id="7", provider_contract_id="CON.A",
+                  order_type=OrderType.LIMIT, order_side=OrderSide.BUY, original_size=1,
+                  status=OrderStatus.WORKING, limit_price=100.0, created_at_utc=datetime.now(timezone.utc))
+    return OrderUpdateEvent(provider_account_id="7", provider_contract_id="CON.A", timestamp_utc=datetime.now(timezone.utc),
+                            order_data=order, is_synthetic=synthetic)
+
+
+def order_mapper():
+    def map_order(payload, stream_name):
+        if payload.get("bad"):
+            raise ValueError("unmappable order")
+        return order_event(payload["id"])
+    return SimpleNamespace(map_ts_order_update_to_generic_event=map_order)
+
+
+async def test_user_messages_are_handled_in_arrival_order_by_one_worker():
+    delivered, errors = [], []
+
+    async def on_event(event):
+        delivered.append(event.order_data.provider_order_id)
+
+    async def on_error(stream_name, error):
+        errors.append(error)
+
+    stream, connection = make_user_stream(on_event, on_error, order_mapper())
+    stream._register_specific_handlers()
+    on_order = connection.handlers["GatewayUserOrder"]
+    for payload in [{"id": "1"}, {"id": "2"}, {"bad": True}, {"id": "3"}, {"id": "4"}]:
+        await on_order([payload])
+    worker = stream._worker_task
+
+    await asyncio.wait_for(stream.wait_until_idle(), 1)
+    # A message that fails to map is reported and skipped; the rest keep their order.
+    assert delivered == ["1", "2", "3", "4"]
+    assert [str(e) for e in errors] == ["unmappable order"]
+    assert stream._worker_task is worker
+    await stream.disconnect()
+
+
+class SlowResync:
+    def __init__(self):
+        self.calls = []
+
+    def observe(self, event):
+        pass
+
+    async def resync(self, subscriptions, since):
+        self.calls.append((subscriptions, since))
+        # Slow enough that a live message handled concurrently would overtake the catch-up events.
+        await asyncio.sleep(0.05)
+        return [order_event("missed", synthetic=True)]
+
+
+async def test_resync_events_are_emitted_before_the_new_connections_messages():
+    delivered = []
+
+    async def on_event(event):
+        delivered.append(event.order_data.provider_order_id)
+
+    stream, connection = make_user_stream(on_event, stream_mapper=order_mapper())
+    stream.resync = SlowResync()
+    await stream.subscribe_account("7", [UserDataType.ORDER_UPDATE])
+    stream._register_specific_handlers()
+    on_order = connection.handlers["GatewayUserOrder"]
+
+    await on_order([{"id": "before"}])
+    await stream._update_status(StreamConnectionStatus.DISCONNECTED, "dropped")
+    disconnected_at = stream._disconnected_at
+    await stream._on_open_and_subscribe()
+    await on_order([{"id": "after"}])
+
+    await asyncio.wait_for(stream.wait_until_idle(), 1)
+    assert delivered == ["before", "missed", "after"]
+    assert stream.resync.calls == [({"7": {UserDataType.ORDER_UPDATE}}, disconnected_at)]
+    assert stream._disconnected_at is None
+    await stream.disconnect()
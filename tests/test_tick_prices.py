@@ -0,0 +1,64 @@
+# tests/test_tick_prices.py
+from decimal import Decimal
+
+import pytest
+
+from tradeforgepy.core.enums import OrderSide, OrderType
+from tradeforgepy.core.models_generic import PlaceOrderRequest
+from tradeforgepy.providers.topstepx.schemas_ts import TSContractModel
+from tradeforgepy.utils.tick_utils import TickScale
+
+from conftest import ok, ts_contract
+
+
+def test_tick_scale_round_trip():
+    scale = TickScale(0.25)
+    assert scale.to_ticks(100.25) == 401
+    assert scale.to_decimal(401) == Decimal("100.25")
+    with pytest.raises(ValueError):
+        scale.to_ticks(100.1)
+    assert scale.round_price(100.1) == 100.0
+
+
+def _provider_with_contract(make_provider):
+    provider = make_provider(use_contract_master=False)
+    calls = []
+
+    async def by_id(contract_id):
+        calls.append(contract_id)
+        return ok(contract=TSContractModel.model_validate(ts_contract(contract_id)))
+    provider.http_client.ts_get_contract_by_id = by_id
+    return provider, calls
+
+
+async def test_float_price_never_waits_for_a_contract_lookup(make_provider):
+    provider, calls = _provider_with_contract(make_provider)
+    assert await provider._to_ts_price("CON.F.US.ENQ.Z25", 100.1, None) == Decimal("100.1")
+    assert calls == []
+
+
+async def test_off_tick_float_price_is_rejected_once_the_scale_is_warm(make_provider):
+    provider, calls = _provider_with_contract(make_provider)
+    await provider.warm_tick_scales(["CON.F.US.ENQ.Z25"])
+    await provider.warm_tick_scales(["CON.F.US.ENQ.Z25"])
+    assert calls == ["CON.F.US.ENQ.Z25"]
+    assert await provider._to_ts_price("CON.F.US.ENQ.Z25", 100.25, None) == Decimal("100.25")
+    placed = []
+
+    async def place(request):
+        placed.append(request)
+        return ok(orderId=1)
+    provider.http_client.ts_place_order = place
+    request = PlaceOrderRequest(provider_account_id="1", provider_contract_id="CON.F.US.ENQ.Z25",
+                                order_type=OrderType.LIMIT, order_side=OrderSide.BUY, size=1, limit_price=100.1)
+    response = await provider.place_order(request)
+    assert not response.order_id_acknowledged
+    assert "not a multiple" in response.message
+    assert placed == []
+
+
+async def test_tick_prices_use_the_contract_scale(make_provider):
+    provider, calls = _provider_with_contract(make_provider)
+    assert await provider._to_ts_price("CON.F.US.ENQ.Z25", None, 401) == Decimal("100.25")
+    assert await provider._to_ts_price("CON.F.US.ENQ.Z25", None, 402) == Decimal("100.50")
+    assert len(calls) == 1
@@ -0,0 +1,104 @@
+# tests/test_topstepx_hub.py
+import argparse
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from tradeforgepy.core.enums import MarketDataType, StreamConnectionStatus
+from tradeforgepy.providers.topstepx import TopStepXProvider
+from tradeforgepy.testing import HubTraffic, TopStepXTestHub
+
+CONTRACT = "CON.F.US.EP.M25"
+
+
+async def wait_until(condition, timeout=5.0):
+    async def _poll():
+        while not condition():
+            await asyncio.sleep(0.02)
+    await asyncio.wait_for(_poll(), timeout)
+
+
+async def test_provider_streams_from_the_hub_and_resubscribes_after_a_drop():
+    hub = await TopStepXTestHub(HubTraffic(quotes_per_sec=200)).start()
+    provider = TopStepXProvider(hub.provider_settings(), resync_user_data=False, watch_feed_staleness=False)
+    quotes = []
+
+    async def on_event(event):
+        if event.event_type == MarketDataType.QUOTE:
+            quotes.append(event)
+
+    provider.on_event(on_event)
+    runner = None
+    try:
+        await provider.connect()
+        runner = asyncio.create_task(provider.run_forever())
+        await wait_until(lambda: provider.get_status() == StreamConnectionStatus.CONNECTED)
+        await provider.subscribe_market_data([CONTRACT], [MarketDataType.QUOTE])
+
+        await wait_until(lambda: len(quotes) >= 10)
+        assert hub.subscriptions("market") == {("quote", CONTRACT)}
+        assert {q.provider_contract_id for q in quotes} == {CONTRACT}
+
+        opened = hub.connections_opened
+        assert await hub.drop_connections() == 2
+        await wait_until(lambda: hub.connections_opened >= opened + 2)
+        # The new connection is subscribed again without the caller asking, and quotes resume.
+        received = len(quotes)
+        await wait_until(lambda: len(quotes) >= received + 10)
+        assert hub.subscriptions("market") == {("quote", CONTRACT)}
+    finally:
+        await provider.disconnect()
+        if runner:
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+        await hub.stop()
+
+
+async def test_muted_contract_stops_traffic_but_keeps_its_subscription():
+    hub = await TopStepXTestHub(HubTraffic(quotes_per_sec=200)).start()
+    provider = TopStepXProvider(hub.provider_settings(), resync_user_data=False, watch_feed_staleness=False)
+    runner = None
+    try:
+        await provider.connect()
+        runner = asyncio.create_task(provider.run_forever())
+        await wait_until(lambda: provider.get_status() == StreamConnectionStatus.CONNECTED)
+        await provider.subscribe_market_data([CONTRACT], [MarketDataType.QUOTE])
+        await wait_until(lambda: hub.messages_sent["GatewayQuote"] > 0)
+
+        hub.mute_contract(CONTRACT)
+        await asyncio.sleep(0.05)
+        sent = hub.messages_sent["GatewayQuote"]
+        await asyncio.sleep(0.1)
+        assert hub.messages_sent["GatewayQuote"] == sent
+        assert hub.subscriptions("market") == {("quote", CONTRACT)}
+    finally:
+        await provider.disconnect()
+        if runner:
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+        await hub.stop()
+
+
+def load_bench_streams():
+    path = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_streams.py"
+    spec = importlib.util.spec_from_file_location("bench_streams", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def test_stream_benchmark_runs_a_step_against_the_hub():
+    bench = load_bench_streams()
+    args = argparse.Namespace(
+        feed="quote", contracts=2, accounts=1, depth_levels=2, shards=1, queue_size=1000, no_latency=False,
+        stream_thread=False, start_rate=100.0, max_rate=100.0, growth=2.0, step_seconds=0.3,
+        settle_seconds=0.2, min_delivery=0.5, json_path=None,
+    )
+    results = await bench.run_benchmark(args)
+    assert len(results) == 1
+    assert results[0].offered_per_sec == 100.0
+    assert results[0].sent_per_sec > 0 and results[0].delivered_per_sec > 0
@@ -0,0 +1,115 @@
+# tests/test_watchdog.py
+import asyncio
+import time
+
+from tradeforgepy.streaming.watchdog import StalenessWatchdog
+
+KEY = ("CON.A", "QUOTE")
+
+
+async def test_shared_key_stays_watched_until_every_watcher_lets_go():
+    alerts = []
+
+    async def on_stale(staleness):
+        alerts.append(staleness.key)
+
+    watchdog = StalenessWatchdog(on_stale, tick_seconds=1.0, min_timeout=5.0, max_timeout=5.0)
+    t0 = time.monotonic()
+    try:
+        watchdog.watch(KEY, now=t0)          # old shard
+        watchdog.watch(KEY, now=t0)          # new shard after a resize
+        watchdog.unwatch(KEY)              # old shard drops the moved contract
+        assert watchdog.is_watched(KEY)
+
+        await watchdog.advance(now=t0 + 10.0)
+        assert alerts == [KEY]
+
+        watchdog.unwatch(KEY)
+        assert not watchdog.is_watched(KEY)
+        watchdog.unwatch(KEY)              # extra releases are harmless
+        watchdog.watch(KEY, now=t0 + 10.0)
+        watchdog.unwatch(KEY)
+        assert not watchdog.is_watched(KEY)
+    finally:
+        await watchdog.close()
+
+
+class Recorder:
+    def __init__(self):
+        self.stale, self.recovered = [], []
+
+    async def on_stale(self, staleness):
+        self.stale.append(staleness)
+
+    async def on_recovered(self, key, silent):
+        self.recovered.append((key, silent))
+
+
+def make_watchdog(recorder, **kwargs):
+    options = dict(tick_seconds=1.0, min_timeout=5.0, max_timeout=100.0, rate_multiple=10.0, alpha=1.0, warmup_samples=1)
+    options.update(kwargs)
+    return StalenessWatchdog(recorder.on_stale, recorder.on_recovered, **options)
+
+
+async def test_timeout_is_max_until_warm_then_a_multiple_of_the_learned_gap():
+    recorder = Recorder()
+    watchdog = make_watchdog(recorder, alpha=0.5, warmup_samples=3)
+    t0 = time.monotonic()
+    try:
+        watchdog.watch(KEY, now=t0)
+        for i in (1, 2):
+            watchdog.touch(KEY, now=t0 + i)
+        assert watchdog.snapshot(now=t0 + 2)[KEY]["timeout"] == 100.0
+        watchdog.touch(KEY, now=t0 + 3)
+        assert watchdog.snapshot(now=t0 + 3)[KEY]["timeout"] == 10.0
+        watchdog.touch(KEY, now=t0 + 3.1)  # EWMA 0.55s: 5.5s, still above min_timeout
+        assert abs(watchdog.snapshot(now=t0 + 3.1)[KEY]["timeout"] - 5.5) < 1e-9
+        watchdog.touch(KEY, now=t0 + 3.2)  # EWMA 0.325s: clamped to min_timeout
+        assert watchdog.snapshot(now=t0 + 3.2)[KEY]["timeout"] == 5.0
+
+        # Warming up moved the deadline from t0+100 forward to t0+8.2.
+        await watchdog.advance(now=t0 + 7.5)
+        assert recorder.stale == []
+        await watchdog.advance(now=t0 + 9.5)
+        assert [(s.key, s.timeout, s.stale_count) for s in recorder.stale] == [(KEY, 5.0, 1)]
+    finally:
+        await watchdog.close()
+
+
+async def test_touched_feeds_are_refiled_at_their_real_deadline():
+    recorder = Recorder()
+    watchdog = make_watchdog(recorder, max_timeout=40.0)
+    t0 = time.monotonic()
+    try:
+        watchdog.watch(KEY, now=t0)
+        watchdog.touch(KEY, now=t0 + 1)    # gap 1s: due at t0+11
+        watchdog.touch(KEY, now=t0 + 8)    # gap 7s: timeout 40s, the t0+11 slot still holds it
+        await watchdog.advance(now=t0 + 12)
+        assert recorder.stale == []
+        await watchdog.advance(now=t0 + 47)
+        assert recorder.stale == []
+        await watchdog.advance(now=t0 + 49)
+        assert [s.stale_count for s in recorder.stale] == [1]
+    finally:
+        await watchdog.close()
+
+
+async def test_silent_feed_realerts_with_doubling_delay_then_recovers():
+    recorder = Recorder()
+    watchdog = make_watchdog(recorder)
+    t0 = time.monotonic()
+    try:
+        watchdog.watch(KEY, now=t0)
+        watchdog.touch(KEY, now=t0 + 1)    # timeout 10s
+        for now, alerts in ((t0 + 12, 1), (t0 + 31, 1), (t0 + 33, 2), (t0 + 72, 2), (t0 + 74, 3)):
+            await watchdog.advance(now=now)
+            assert len(recorder.stale) == alerts, now - t0
+        assert [s.stale_count for s in recorder.stale] == [1, 2, 3]
+        assert watchdog.snapshot(now=t0 + 74)[KEY]["stale"]
+
+        watchdog.touch(KEY, now=t0 + 75)
+        await asyncio.sleep(0)
+        assert recorder.recovered == [(KEY, 74.0)]
+        assert watchdog.recoveries == 1 and not watchdog.snapshot(now=t0 + 75)[KEY]["stale"]
+    finally:
+        await watchdog.close()